@@ -0,0 +1,105 @@
+"""
+Size and speed of the snapshot archive against the raw ``.npy`` history.
+
+A 2D heat run (RK4, periodic) is stored once per archive setting (precision,
+compression, downsampling); each case reports the file size relative to the
+raw frames, the time to write the history, the time to read one frame at
+random and the largest error of the frames read back.
+
+Usage:
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --N 256 --frames 200 --chunk 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import Grid, TimeLoop, build_model, make_stepper
+from src.numerics.laplacian_nd import grid_coordinates
+from src.utils.snapshots import make_snapshot_sink
+
+CASES = [
+    ("npy", {}),
+    ("archive", {"precision": "exact", "compression": "zlib"}),
+    ("archive", {"precision": "exact", "compression": "lz4"}),
+    ("archive", {"precision": "float16"}),
+    ("archive", {"precision": "quantize16"}),
+    ("archive", {"precision": "quantize8"}),
+    ("archive", {"precision": "float16", "downsample": 2}),
+]
+
+
+def heat_history(N=128, frames=100, L=10.0):
+    """``frames`` snapshots of a spreading 2D Gaussian."""
+    x, dx = grid_coordinates(N, L)
+    X, Y = np.meshgrid(x, x, indexing="ij")
+    model = build_model("heat", {"alpha": 1.0}, Grid((N, N), (dx, dx), "periodic", "sparse", 2))
+    loop = TimeLoop(make_stepper("rk4", model), model.rhs, np.exp(-(X**2 + Y**2)).reshape(-1))
+    history = np.empty((frames, N, N))
+    for k in range(frames):
+        history[k] = loop.u.reshape(N, N)
+        loop.run(0.1 * dx**2, 5)
+    return history
+
+
+def measure(history, fmt, options, folder, chunk):
+    """(relative size, write seconds, seconds per random frame, max error) of one case."""
+    if fmt == "archive":
+        options = dict(options, chunk_frames=chunk)
+    try:
+        sink = make_snapshot_sink(fmt, os.path.join(folder, "snap"), history.shape[1:], **options)
+    except ImportError:
+        return None
+    start = time.perf_counter()
+    for k, frame in enumerate(history):
+        sink.append(frame, k)
+    reader = sink.reader()
+    write = time.perf_counter() - start
+    size = os.path.getsize(reader_path(folder, fmt)) / history.nbytes
+    order = np.random.default_rng(0).permutation(len(history))[:20]
+    start = time.perf_counter()
+    for k in order:
+        reader[int(k)]
+    read = (time.perf_counter() - start) / len(order)
+    step = options.get("downsample", 1)
+    error = max(float(np.max(np.abs(reader[k] - history[k, ::step, ::step]))) for k in order)
+    reader.close()
+    return size, write, read, error
+
+
+def reader_path(folder, fmt):
+    return os.path.join(folder, "snap.npy" if fmt == "npy" else "snap.snap")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot archive size and speed")
+    parser.add_argument("--N", type=int, default=128)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--chunk", type=int, default=8, help="frames per archive chunk")
+    args = parser.parse_args()
+
+    history = heat_history(args.N, args.frames)
+    print(f"{args.frames} frames of {args.N}x{args.N} ({history.nbytes / 2**20:.1f} MiB raw)")
+    header = f"{'case':>40} {'size':>7} {'write s':>8} {'read ms':>8} {'max error':>10}"
+    print(header)
+    print("-" * len(header))
+    for fmt, options in CASES:
+        name = fmt + "".join(f" {k}={v}" for k, v in options.items())
+        with tempfile.TemporaryDirectory() as folder:
+            result = measure(history, fmt, options, folder, args.chunk)
+        if result is None:
+            print(f"{name:>40}  (not installed)")
+            continue
+        size, write, read, error = result
+        print(f"{name:>40} {size:>7.1%} {write:>8.3f} {1e3 * read:>8.3f} {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare evolving an ensemble member by member against one batched run.
+
+Each case advances ``members`` Gaussian initial conditions (with different
+centres and alphas) by ``steps`` RK4 steps of the heat equation, once as a
+loop over single fields and once as an (n_grid, n_members) batch, and
+reports the throughput in member-steps per second.
+
+Usage:
+    python benchmarks/bench_ensemble.py
+    python benchmarks/bench_ensemble.py --dim 2 --N 128 --members 1 8 32
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.pde_systems import LinearPDESystem1D
+from src.core.time_integrators import RK4Stepper
+from src.numerics.operators import BACKENDS, make_laplacian
+
+
+def evolve(L_op, alpha, u0, dt, steps):
+    rhs = LinearPDESystem1D(L_op, alpha=alpha).rhs_func
+    stepper = RK4Stepper()
+    u = u0.copy()
+    for i in range(steps):
+        stepper.step(u, rhs, i * dt, dt, out=u)
+    return u
+
+
+def bench_case(dim, N, members, backend, steps, L=10.0):
+    dx = L / N
+    x = np.linspace(-L / 2, L / 2, N, endpoint=False)
+    grids = np.meshgrid(*([x] * dim), indexing="ij")
+    centres = np.linspace(-1.0, 1.0, members)
+    u0 = np.column_stack([np.exp(-sum((g - c) ** 2 for g in grids) / 0.5).ravel() for c in centres])
+    alpha = np.linspace(0.5, 1.0, members)
+    L_op = make_laplacian(dim, N, dx, backend=backend)
+    dt = 0.2 * dx**2 / dim
+
+    start = time.perf_counter()
+    looped = np.column_stack([evolve(L_op, alpha[m], u0[:, m], dt, steps) for m in range(members)])
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = evolve(L_op, alpha, u0, dt, steps)
+    t_batch = time.perf_counter() - start
+
+    return {
+        "members": members,
+        "loop_rate": members * steps / t_loop,
+        "batch_rate": members * steps / t_batch,
+        "speedup": t_loop / t_batch,
+        "max_abs_diff": float(np.max(np.abs(looped - batched))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched ensemble stepping")
+    parser.add_argument("--dim", type=int, default=1, choices=[1, 2])
+    parser.add_argument("--N", type=int, default=1024)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--members", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    header = f"{'backend':>8} {'members':>8} {'loop [m-steps/s]':>17} {'batch [m-steps/s]':>18} {'speedup':>8} {'max|diff|':>10}"
+    print(header)
+    print("-" * len(header))
+    for backend in args.backends:
+        for members in args.members:
+            r = bench_case(args.dim, args.N, members, backend, args.steps)
+            print(f"{backend:>8} {r['members']:>8} {r['loop_rate']:>17.1f} {r['batch_rate']:>18.1f} "
+                  f"{r['speedup']:>8.2f} {r['max_abs_diff']:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare the fused numba right-hand-side kernels against the NumPy ones.
+
+For each PDE the right-hand side is evaluated ``repeat`` times on an N x N
+periodic grid (writing into a preallocated ``out``) and the mean time per
+call is reported. Set NUMBA_NUM_THREADS to control the parallel kernels.
+
+Usage:
+    python benchmarks/bench_kernels.py
+    python benchmarks/bench_kernels.py --N 256 512 1024 --pdes nlse burgers
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.numerics.kernels import HAVE_NUMBA, KERNEL_PDES, make_kernel_rhs
+
+
+def time_rhs(rhs, u, repeat):
+    out = np.empty_like(u)
+    rhs(u, 0.0, out=out)  # warm-up (JIT compilation)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rhs(u, 0.0, out=out)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fused RHS kernels")
+    parser.add_argument("--N", type=int, nargs="+", default=[128, 256, 512])
+    parser.add_argument("--pdes", nargs="+", default=list(KERNEL_PDES), choices=KERNEL_PDES)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    if not HAVE_NUMBA:
+        sys.exit("numba is not installed")
+
+    header = f"{'pde':>8} {'N':>6} {'numpy [ms]':>11} {'numba [ms]':>11} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    rng = np.random.default_rng(0)
+    for pde in args.pdes:
+        for N in args.N:
+            u = rng.standard_normal(N * N)
+            if pde == "nlse":
+                u = u + 1j * rng.standard_normal(N * N)
+            h = 10.0 / N
+            t_np = time_rhs(make_kernel_rhs(pde, (N, N), (h, h), "numpy"), u, args.repeat)
+            t_nb = time_rhs(make_kernel_rhs(pde, (N, N), (h, h), "numba"), u, args.repeat)
+            print(f"{pde:>8} {N:>6} {1e3 * t_np:>11.3f} {1e3 * t_nb:>11.3f} {t_np / t_nb:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare the CSR and matrix-free stencil Laplacian backends.
+
+Times one application ``L @ u`` (CSR) against ``L.apply(u, out=buf)``
+(stencil) for 1D grids of N points and 2D grids of N x N points.
+
+Usage:
+    python benchmarks/bench_laplacian_backends.py
+    python benchmarks/bench_laplacian_backends.py --dims 2 --sizes 129 257 513
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.numerics.operators import make_laplacian
+
+DEFAULT_SIZES = (129, 257, 513, 1025, 2049, 4096)
+
+
+def best_time(func, repeat=5):
+    """Best-of-``repeat`` wall time per call, auto-scaling the loop count."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def bench_case(dim, N, L=10.0):
+    dx = L / N
+    n = N**dim
+    rng = np.random.default_rng(0)
+    u = rng.standard_normal(n)
+    out = np.empty_like(u)
+
+    csr = make_laplacian(dim, N, dx, backend="sparse")
+    stencil = make_laplacian(dim, N, dx, backend="stencil")
+
+    max_err = np.max(np.abs(csr @ u - stencil.apply(u, out=out)))
+    t_csr = best_time(lambda: csr @ u)
+    t_stencil = best_time(lambda: stencil.apply(u, out=out))
+
+    return {
+        "dim": dim,
+        "N": N,
+        "points": n,
+        "csr_ms": 1e3 * t_csr,
+        "stencil_ms": 1e3 * t_stencil,
+        "speedup": t_csr / t_stencil,
+        "csr_mbytes": (csr.data.nbytes + csr.indices.nbytes + csr.indptr.nbytes) / 2**20,
+        "max_abs_diff": max_err,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Laplacian backends")
+    parser.add_argument("--dims", type=int, nargs="+", default=[1, 2], choices=[1, 2])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    args = parser.parse_args()
+
+    header = f"{'dim':>3} {'N':>6} {'points':>10} {'csr [ms]':>10} {'stencil [ms]':>13} {'speedup':>8} {'csr [MB]':>9} {'max|diff|':>10}"
+    print(header)
+    print("-" * len(header))
+    for dim in args.dims:
+        for N in args.sizes:
+            r = bench_case(dim, N)
+            print(f"{r['dim']:>3} {r['N']:>6} {r['points']:>10} {r['csr_ms']:>10.3f} {r['stencil_ms']:>13.3f} "
+                  f"{r['speedup']:>8.2f} {r['csr_mbytes']:>9.1f} {r['max_abs_diff']:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Accuracy versus speed of single-precision runs (numerics.dtype: float32).
+
+The heat equation and the Schrödinger form of the NLSE are advanced the same
+number of steps in float64 and float32 (complex128 / complex64) with the
+same grid, backend and integrator. Reports the time per step of each
+precision, the speedup of float32, the largest float32 deviation from the
+float64 run relative to the field's maximum, and the drift of ∫|u|² dx over
+the run (conserved by the NLSE; the diagnostics accumulate it in float64 in
+both precisions).
+
+Subnormal numbers are slow on most CPUs. The initial Gaussian is flushed to
+zero below the normal range, but the cubic NLSE term keeps producing
+subnormals far out in the tails, which eats most of the float32 gain on
+wide domains (compare ``--L 20`` with ``--L 10``).
+
+Usage:
+    python benchmarks/bench_precision.py
+    python benchmarks/bench_precision.py --dim 2 --N 512 --steps 50 --backend spectral
+    python benchmarks/bench_precision.py --L 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import Grid, TimeLoop, build_model, make_stepper
+from src.numerics.laplacian_nd import grid_coordinates
+from src.numerics.precision import PRECISIONS, flush_subnormals
+from src.utils.diagnostic_manager import DiagnosticManager
+
+PROBLEMS = {
+    "heat": ({"alpha": 1.0}, "rk4"),
+    "nlse": ({"alpha": "0.5j", "beta": "-1j"}, "rk4"),
+}
+
+
+def run_problem(pde, dim=1, N=4096, steps=200, backend="stencil", dtype="float64", method=None, L=20.0):
+    """
+    Advance a Gaussian ``steps`` steps at precision ``dtype``.
+
+    Returns:
+        dict: ``u`` (final field), ``seconds`` (stepping wall time), ``mass``
+        (∫|u|² dx at start and end).
+    """
+    params, default_method = PROBLEMS[pde]
+    x, dx = grid_coordinates(N, L)
+    grid = Grid((N,) * dim, (dx,) * dim, "periodic", backend, 2, dtype)
+    model = build_model(pde, params, grid)
+    X = np.meshgrid(*([x] * dim), indexing="ij")
+    u = flush_subnormals(np.exp(-sum(g**2 for g in X)).reshape(-1).astype(model.dtype))
+    dt = 0.2 * dx**2 / (dim * abs(complex(model.coeff)))
+
+    stepper = make_stepper(method or default_method, model)
+    diagnostics = DiagnosticManager(dx=dx, dy=dx if dim == 2 else None, track=("mass",))
+    diagnostics.record(u, 0.0)
+    loop = TimeLoop(stepper, model.rhs_for(stepper), u)
+    loop.run(dt, 1)  # warm-up: workspaces, FFT plans
+    start = time.perf_counter()
+    loop.run(dt, steps)
+    seconds = time.perf_counter() - start
+    diagnostics.record(loop.u, loop.t)
+    return {"u": loop.u, "seconds": seconds, "mass": diagnostics.columns()["mass"]}
+
+
+def compare_precisions(pde, **options):
+    """float64 and float32 runs of ``pde`` (see run_problem) side by side."""
+    runs = {dtype: run_problem(pde, dtype=dtype, **options) for dtype in PRECISIONS}
+    ref, single = runs["float64"], runs["float32"]
+    scale = float(np.max(np.abs(ref["u"])))
+    return {
+        "pde": pde,
+        "seconds": {dtype: run["seconds"] for dtype, run in runs.items()},
+        "speedup": ref["seconds"] / single["seconds"],
+        "rel_error": float(np.max(np.abs(single["u"].astype(ref["u"].dtype) - ref["u"]))) / scale,
+        "mass_drift": {dtype: abs(run["mass"][-1] / run["mass"][0] - 1.0) for dtype, run in runs.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float32 versus float64 accuracy and speed")
+    parser.add_argument("--dim", type=int, default=1, choices=[1, 2])
+    parser.add_argument("--N", type=int, default=None, help="points per axis (default 65536 in 1D, 512 in 2D)")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--L", type=float, default=20.0, help="domain length (the Gaussian has unit width)")
+    parser.add_argument("--backend", default="stencil", choices=["sparse", "stencil", "spectral"])
+    parser.add_argument("--method", default=None, help="integrator (default rk4)")
+    parser.add_argument("--pde", nargs="+", default=list(PROBLEMS), choices=list(PROBLEMS))
+    args = parser.parse_args()
+
+    N = args.N or (65536 if args.dim == 1 else 512)
+    print(f"grid {(N,) * args.dim}, L={args.L}, {args.steps} steps, backend {args.backend}")
+    header = (f"{'pde':>5} {'f64 [ms/step]':>14} {'f32 [ms/step]':>14} {'speedup':>8} {'max rel err':>12} "
+              f"{'f64 mass drift':>15} {'f32 mass drift':>15}")
+    print(header)
+    print("-" * len(header))
+    for pde in args.pde:
+        row = compare_precisions(pde, dim=args.dim, N=N, steps=args.steps, backend=args.backend,
+                                 method=args.method, L=args.L)
+        ms = {dtype: 1e3 * s / args.steps for dtype, s in row["seconds"].items()}
+        print(f"{pde:>5} {ms['float64']:>14.3f} {ms['float32']:>14.3f} {row['speedup']:>8.2f} "
+              f"{row['rel_error']:>12.2e} {row['mass_drift']['float64']:>15.2e} {row['mass_drift']['float32']:>15.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Time stepping versus the direct long-time solvers (integrator methods expm
+and steady).
+
+A 2D heat problem du/dt = α ∇²u + f with a zero-mean Gaussian source is
+advanced to ``--t`` with explicit RK4 at its stability limit, jumped there in
+one Krylov step (expm_action), and solved for its equilibrium with each
+steady-state solver. Reports wall time, the work counters (matvecs, linear
+solves, CG iterations) and the distance of each result from the reference.
+
+Usage:
+    python benchmarks/bench_steady.py
+    python benchmarks/bench_steady.py --N 257 --t 2.0 --bc neumann
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.direct_solvers import expm_action, null_weights, steady_state
+from src.core.engine import Grid, TimeLoop, build_model, make_stepper
+from src.core.time_integrators import max_stable_dt
+from src.numerics.laplacian_nd import grid_coordinates
+from src.numerics.operators import spectral_radius_bound
+from src.utils.profiling import profiler
+
+
+def make_problem(N=128, L=10.0, bc="periodic", alpha=1.0):
+    """Heat model with a zero-mean Gaussian source and a Gaussian initial field."""
+    x, dx = grid_coordinates(N, L, bc)
+    X, Y = np.meshgrid(x, x, indexing="ij")
+    source = np.exp(-((X - 1) ** 2 + Y**2)).reshape(-1)
+    w = null_weights((N, N), bc)
+    if w is not None:
+        source -= np.dot(w, source) / np.sum(w)
+    u0 = np.exp(-(X**2 + Y**2)).reshape(-1)
+    grid = Grid((N, N), (dx, dx), bc, "sparse", 2)
+    return build_model("heat", {"alpha": alpha, "source": source}, grid), source, u0
+
+
+def timed(func):
+    """(result, seconds, profiler counters) of ``func()``."""
+    profiler.reset()
+    profiler.enable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+    finally:
+        profiler.disable()
+    return result, seconds, dict(profiler.counters)
+
+
+def compare(N=128, t=1.0, bc="periodic", solvers=("direct", "cg", "mg")):
+    """Rows (name, seconds, counters, error) for stepping, expm and the steady solvers."""
+    model, source, u0 = make_problem(N, bc=bc)
+    dt = 0.9 * max_stable_dt("rk4", model.coeff * spectral_radius_bound(model.L_op))
+    steps = int(np.ceil(t / dt))
+
+    def march():
+        loop = TimeLoop(make_stepper("rk4", model), model.rhs, u0.copy())
+        loop.run(t / steps, steps)
+        return loop.u
+
+    marched, *stats = timed(march)
+    rows = [("rk4", *stats, 0.0)]
+    jumped, *stats = timed(lambda: expm_action(model.L_op, u0, t, model.coeff, source))
+    rows.append(("expm", *stats, float(np.max(np.abs(jumped - marched)))))
+    reference = None
+    for solver in solvers:
+        u, *stats = timed(lambda: steady_state(model.L_op, source, u0, model.coeff, model.grid.shape, bc,
+                                               solver=solver))
+        reference = u if reference is None else reference
+        rows.append((f"steady/{solver}", *stats, float(np.max(np.abs(u - reference)))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time stepping versus expm and steady-state solvers")
+    parser.add_argument("--N", type=int, default=128, help="points per axis (2^k periodic, 2^k - 1 dirichlet, 2^k + 1 neumann)")
+    parser.add_argument("--t", type=float, default=1.0, help="end time of rk4 and expm")
+    parser.add_argument("--bc", default="periodic", choices=["periodic", "dirichlet", "neumann"])
+    parser.add_argument("--solvers", nargs="+", default=["direct", "cg", "mg"])
+    args = parser.parse_args()
+
+    print(f"grid {args.N}x{args.N} ({args.bc}), t = {args.t}")
+    header = f"{'method':>14} {'seconds':>9} {'matvecs':>8} {'solves':>7} {'CG its':>7} {'max diff':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, seconds, counters, error in compare(args.N, args.t, args.bc, args.solvers):
+        print(f"{name:>14} {seconds:>9.3f} {counters.get('matvecs', 0):>8} {counters.get('linear_solves', 0):>7} "
+              f"{counters.get('linear_iterations', 0):>7} {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Strong scaling of the domain-decomposed RK4 heat stepper.
+
+A fixed N x N (or N^3 with --dim 3) periodic problem is advanced ``steps``
+RK4 steps by the serial RK4Stepper with a StencilLaplacian right-hand side
+and by TiledRK4Stepper with an increasing number of tiles. Reports wall
+time, speedup and parallel efficiency relative to the serial run, and the
+largest difference to the serial result (0 when bit-identical).
+
+Usage:
+    python benchmarks/bench_tiled.py
+    python benchmarks/bench_tiled.py --N 2048 --tiles 1 2 4 8 16 32 --mode processes
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.domain_decomposition import TILE_MODES, TiledRK4Stepper
+from src.core.rhs_examples import make_linear_rhs
+from src.core.time_integrators import RK4Stepper
+from src.numerics.stencil_laplacian import StencilLaplacian
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strong-scaling benchmark of tiled RK4 stepping")
+    parser.add_argument("--dim", type=int, default=2, choices=[2, 3])
+    parser.add_argument("--N", type=int, default=1024)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--tiles", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", default="processes", choices=TILE_MODES)
+    args = parser.parse_args()
+
+    grid_shape = (args.N,) * args.dim
+    h = 10.0 / args.N
+    dt = 0.2 * h**2 / args.dim
+    u0 = np.random.default_rng(0).random(args.N**args.dim)
+
+    rhs = make_linear_rhs(StencilLaplacian(grid_shape, (h,) * args.dim), 1.0)
+    stepper, u_serial = RK4Stepper(), u0.copy()
+    start = time.perf_counter()
+    for i in range(args.steps):
+        stepper.step(u_serial, rhs, i * dt, dt, out=u_serial)
+    t_serial = time.perf_counter() - start
+
+    print(f"grid {grid_shape}, {args.steps} steps, {args.mode}, {os.cpu_count()} CPUs; serial {t_serial:.3f} s")
+    header = f"{'tiles':>6} {'time [s]':>9} {'speedup':>8} {'efficiency':>11} {'max|diff|':>10}"
+    print(header)
+    print("-" * len(header))
+    for tiles in args.tiles:
+        with TiledRK4Stepper(grid_shape, (h,) * args.dim, alpha=1.0, tiles=tiles, mode=args.mode) as tiled:
+            u = tiled.load(u0)
+            start = time.perf_counter()
+            tiled.advance(dt, args.steps)
+            elapsed = time.perf_counter() - start
+            diff = float(np.max(np.abs(u - u_serial)))
+        speedup = t_serial / elapsed
+        print(f"{tiles:>6} {elapsed:>9.3f} {speedup:>8.2f} {speedup / tiles:>11.2f} {diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
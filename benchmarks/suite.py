@@ -0,0 +1,290 @@
+"""
+Benchmark and performance-regression suite for the solver stack.
+
+Cases cover Laplacian construction, right-hand-side evaluation, single RK4
+steps, DiagnosticManager overhead, full ``run_simulation`` runs in 1D/2D
+across grid sizes, and animation rendering. Every case is timed as the
+best (and median) of ``repeat`` rounds, each round auto-scaled to take at
+least ``min_time`` seconds. Results are written to JSON together with
+machine/library metadata; comparing against a baseline file fails (exit
+code 1) when any case got slower than ``1 + threshold`` times its
+baseline.
+
+Usage:
+    python benchmarks/suite.py --output benchmarks/results/baseline.json
+    python benchmarks/suite.py --compare benchmarks/results/baseline.json --threshold 0.25
+    python benchmarks/suite.py --filter rhs_ --repeat 3
+    python benchmarks/suite.py --list
+"""
+
+import argparse
+import atexit
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "src"))  # as configured for pytest
+
+BENCHMARKS = {}
+
+
+def benchmark(name, **grid):
+    """
+    Register a case factory for every combination of the keyword value lists.
+    The factory does the setup and returns the zero-argument callable to time;
+    cases are named ``name[key=value,...]``.
+    """
+    def register(factory):
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            label = ",".join(f"{k}={v}" for k, v in params.items())
+            BENCHMARKS[f"{name}[{label}]" if label else name] = (factory, params)
+        return factory
+    return register
+
+
+def _field(n, dtype=float, seed=0):
+    rng = np.random.default_rng(seed)
+    u = rng.standard_normal(n)
+    return u + 1j * rng.standard_normal(n) if np.dtype(dtype).kind == "c" else u
+
+
+def _scratch_dir(prefix):
+    """Temporary output folder, removed when the suite exits."""
+    folder = tempfile.mkdtemp(prefix=prefix)
+    atexit.register(shutil.rmtree, folder, ignore_errors=True)
+    return folder
+
+
+def _base_config(folder, **overrides):
+    from src.utils.config_loader import apply_overrides, load_config
+
+    cfg = load_config(os.path.join(ROOT, "config.yaml"))
+    return apply_overrides(cfg, {"output.folder": folder, "output.save_animation": False,
+                                 "output.plot_profile": False, "output.save_diagnostics": False,
+                                 **overrides})
+
+
+# --- operator construction -------------------------------------------------
+
+@benchmark("laplacian_setup_1d", N=[4096, 65536])
+def laplacian_setup_1d(N):
+    from src.numerics.laplacian_1d import make_laplacian_1d
+    from src.numerics.laplacian_nd import clear_laplacian_cache
+
+    def run():
+        clear_laplacian_cache()
+        make_laplacian_1d(N, 10.0 / N)
+    return run
+
+
+@benchmark("laplacian_setup_2d", N=[64, 256])
+def laplacian_setup_2d(N):
+    from src.numerics.laplacian_2d import make_laplacian_2d
+    from src.numerics.laplacian_nd import clear_laplacian_cache
+
+    def run():
+        clear_laplacian_cache()
+        make_laplacian_2d(N, N, 10.0 / N, 10.0 / N)
+    return run
+
+
+# --- right-hand sides and steps -------------------------------------------
+
+@benchmark("rhs_heat", dim=[1, 2], backend=["sparse", "stencil", "spectral"])
+def rhs_heat(dim, backend):
+    from src.core.rhs_examples import make_linear_rhs
+    from src.numerics.operators import make_laplacian
+
+    N = 65536 if dim == 1 else 256
+    rhs = make_linear_rhs(make_laplacian(dim, N, 10.0 / N, backend=backend), alpha=1.0)
+    u = _field(N**dim)
+    out = np.empty_like(u)
+    return lambda: rhs(u, 0.0, out=out)
+
+
+@benchmark("rhs_nonlinear", pde=["nlse", "burgers"], kernels=["numpy", "numba"])
+def rhs_nonlinear(pde, kernels):
+    from src.numerics.kernels import HAVE_NUMBA, make_kernel_rhs
+
+    if kernels == "numba" and not HAVE_NUMBA:
+        return None
+    N = 256
+    rhs = make_kernel_rhs(pde, (N, N), (10.0 / N, 10.0 / N), backend=kernels)
+    u = _field(N * N, complex if pde == "nlse" else float)
+    out = np.empty_like(u)
+    rhs(u, 0.0, out=out)  # compile outside the timing
+    return lambda: rhs(u, 0.0, out=out)
+
+
+@benchmark("rk4_step", dim=[1, 2])
+def rk4_step(dim):
+    from src.core.rhs_examples import make_linear_rhs
+    from src.core.time_integrators import RK4Stepper
+    from src.numerics.operators import make_laplacian
+
+    N = 65536 if dim == 1 else 256
+    dx = 10.0 / N
+    rhs = make_linear_rhs(make_laplacian(dim, N, dx, backend="stencil"), alpha=1.0)
+    stepper, u = RK4Stepper(), _field(N**dim)
+    dt = 0.1 * dx**2 / dim
+    return lambda: stepper.step(u, rhs, 0.0, dt, out=u)
+
+
+# --- diagnostics -------------------------------------------------------------
+
+@benchmark("diagnostics_track", N=[256, 1024])
+def diagnostics_track(N):
+    from src.utils.diagnostic_manager import DiagnosticManager
+
+    u_ref = _field(N * N)
+    u = u_ref + 1e-3
+    manager = DiagnosticManager(dx=0.1, dy=0.1, u_ref=u_ref)
+    return lambda: manager.track_step(u, 0.0)
+
+
+# --- full runs -----------------------------------------------------------------
+
+@benchmark("run_simulation", dim=[1, 2], N=[128, 512])
+def run_simulation(dim, N):
+    from main import run_simulation as run
+
+    folder = _scratch_dir("bench_run_")
+    steps = 200 if dim == 1 else 20
+    dt = 0.2 * (10.0 / N) ** 2 / dim
+    cfg = _base_config(folder, **{"dimension": dim, "grid.N": N, "time.dt": dt, "time.steps": steps,
+                                  "integrator.method": "rk4", "numerics.backend": "stencil",
+                                  "output.save_every": 10})
+    return lambda: run(cfg)
+
+
+# --- animation -------------------------------------------------------------------
+
+@benchmark("render_animation", dim=[1, 2])
+def render_animation(dim):
+    from src.visualization.render import render_animation as render
+
+    N, n_frames = (512, 100) if dim == 1 else (128, 50)
+    x = np.linspace(-5, 5, N, endpoint=False)
+    X = np.meshgrid(*([x] * dim), indexing="ij")
+    frames = np.stack([np.exp(-sum(g**2 for g in X) / (0.5 + 0.05 * i)) for i in range(n_frames)])
+    path = os.path.join(_scratch_dir("bench_anim_"), "anim.gif")
+    return lambda: render(frames, path, x if dim == 1 else (x, x), dim=dim, max_frames=n_frames, dt=0.01)
+
+
+# --- runner -----------------------------------------------------------------------
+
+def time_case(func, repeat=5, min_time=0.2):
+    """Best and median time per call over ``repeat`` rounds of auto-scaled length."""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(1.2 * min_time / elapsed)))
+    rounds = [elapsed / number] + [t / number for t in timer.repeat(repeat=max(0, repeat - 1), number=number)]
+    return {"best": min(rounds), "median": float(np.median(rounds)), "number": number, "repeat": len(rounds)}
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import scipy
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "numpy": np.__version__, "scipy": scipy.__version__, "machine": platform.machine(),
+            "platform": platform.platform(), "cpu_count": os.cpu_count()}
+
+
+def run_suite(pattern=None, repeat=5, min_time=0.2, log=print):
+    """Time every registered case whose name contains ``pattern``; returns the results document."""
+    results = {}
+    for name, (factory, params) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        func = factory(**params)
+        if func is None:
+            log(f"{name:<50} skipped")
+            continue
+        results[name] = time_case(func, repeat=repeat, min_time=min_time)
+        log(f"{name:<50} {1e3 * results[name]['best']:>12.4f} ms")
+    return {"meta": metadata(), "results": results}
+
+
+def compare_results(current, baseline, threshold=0.25):
+    """
+    Compare two results documents case by case.
+
+    Returns:
+        list[dict]: One row per common case with ``ratio`` (current / baseline
+        best time) and ``status`` ("regression", "improvement" or "ok").
+    """
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = new["best"] / old["best"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 / (1 + threshold) else "ok"
+        rows.append({"name": name, "baseline": old["best"], "current": new["best"], "ratio": ratio, "status": status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--filter", help="Only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(name for name in BENCHMARKS if not args.filter or args.filter in name))
+        return 0
+
+    current = run_suite(args.filter, repeat=args.repeat, min_time=args.min_time)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.output}")
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    base_meta, meta = baseline.get("meta", {}), current["meta"]
+    if any(base_meta.get(key) != meta[key] for key in ("machine", "cpu_count", "python", "numpy")):
+        print("Warning: the baseline was recorded on a different machine or software stack")
+    rows = compare_results(current, baseline, args.threshold)
+    print(f"\n{'case':<50} {'baseline [ms]':>14} {'current [ms]':>13} {'ratio':>7}  status")
+    for row in rows:
+        print(f"{row['name']:<50} {1e3 * row['baseline']:>14.4f} {1e3 * row['current']:>13.4f} "
+              f"{row['ratio']:>7.2f}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than {1 + args.threshold:.2f}x baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,159 @@
-def run_simulation(cfg):
-    return main(cfg)
+def run_simulation(cfg, resume=False, observers=()):
+    """
+    Run ``main``; with a ``profiling`` section (enabled: true) the run is
+    profiled and a timing breakdown is written to the output folder.
+    """
+    prof_cfg = cfg.get("profiling") or {}
+    if not prof_cfg.get("enabled", False):
+        return main(cfg, resume=resume, observers=observers)
+    with profile_session(resolve_output_folder(cfg), cprofile=prof_cfg.get("cprofile", False),
+                         memory=prof_cfg.get("tracemalloc", False), top=prof_cfg.get("top", 20)):
+        return main(cfg, resume=resume, observers=observers)
 
 import os
-import yaml
+import time
 import numpy as np
-import matplotlib.pyplot as plt
 
 import argparse
-import csv
 
-from src.utils.diagnostic_manager import DiagnosticManager
+from src.utils.diagnostic_manager import DIAGNOSTICS, DiagnosticManager
 
-from src.utils.config_loader import load_config
+from src.utils.config_loader import apply_overrides, expand_ensemble, load_config
+from src.utils.snapshots import count_snapshots, make_snapshot_sink, recover_snapshots
+from src.utils.checkpoint import CHECKPOINT_NAME, config_hash, load_checkpoint, save_checkpoint, warm_start
+from src.utils.profiling import profile_session, profiler
+from src.utils.output_pipeline import OutputPipeline, detach
+from src.utils.result_cache import is_cacheable, open_result_cache
 
- 
-from src.visualization.animation_1d import animate_heat_solution
+# Plotting, animation and YAML output are imported on first use, so headless
+# runs (sweeps, benchmarks) only pay for numpy/scipy at startup.
 
 def maybe_plot_final(x, u0, u_final, folder):
-    plt.figure(figsize=(8, 4))
-    plt.plot(x, u0, label="Initial u₀", linestyle="--")
-    plt.plot(x, u_final, label="Final u", linewidth=2)
-    plt.xlabel("x")
-    plt.ylabel("u(x, t)")
-    plt.title("Initial vs Final Heat Profile")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(os.path.join(folder, "final_comparison.png"), dpi=300)
-    plt.close()
-
-def main(cfg):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(x, u0, label="Initial u₀", linestyle="--")
+    ax.plot(x, u_final, label="Final u", linewidth=2)
+    ax.set_xlabel("x")
+    ax.set_ylabel("u(x, t)")
+    ax.set_title("Initial vs Final Heat Profile")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(os.path.join(folder, "final_comparison.png"), dpi=300)
+
+def resolve_output_folder(cfg):
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), cfg["output"]["folder"]))
+
+def make_animation(cfg, folder, x, first_frame, expected_frames):
+    """StreamingAnimation for the ``output.animation`` settings, or None if disabled."""
+    out_cfg = cfg["output"]
+    if not out_cfg.get("save_animation", True):
+        return None
+    from src.visualization.render import StreamingAnimation
+
+    dim = cfg.get("dimension", 1)
+    anim_cfg = out_cfg.get("animation", {})
+    anim_fmt = anim_cfg.get("format", "gif")
+    anim_path = os.path.join(folder, "heat_diffusion.gif" if anim_fmt == "gif" else "heat_diffusion_frames")
+    return StreamingAnimation(anim_path, x if dim == 1 else (x, x), first_frame, dim=dim, fmt=anim_fmt,
+                              expected_frames=expected_frames,
+                              max_frames=anim_cfg.get("max_frames", 100), fps=anim_cfg.get("fps", 20),
+                              cmap=anim_cfg.get("cmap", "viridis"))
+
+def write_results(cfg, folder, x, u0, u, diagnostics_manager, pipeline=None):
+    """
+    Final profile plot and diagnostics files, as configured in ``output`` /
+    ``diagnostics``; written on the "plot" and "diagnostics" lanes of
+    ``pipeline`` if given (the caller closes it), otherwise right away.
+    """
+    out_cfg, diag_cfg = cfg["output"], cfg.get("diagnostics", {})
+    dim, N = cfg.get("dimension", 1), cfg["grid"]["N"]
+    frame_view = np.abs if np.iscomplexobj(u) else np.asarray
+    submit = pipeline.submit if pipeline is not None else lambda lane, func, *args: func(*args)
+
+    def plot():
+        # In 2D, compare the profiles along x through the centre of the domain.
+        centre_line = lambda v: frame_view(v) if dim == 1 else frame_view(v).reshape(N, N, -1)[:, N // 2].squeeze()
+        with profiler.phase("plot"):
+            maybe_plot_final(x, centre_line(u0), centre_line(u), folder)
+
+    def save_diagnostics():
+        with profiler.phase("diagnostics_io"):
+            fmt = diag_cfg.get("format", "csv")
+            diagnostics_manager.save(os.path.join(folder, f"diagnostics_tracked.{fmt}"), fmt=fmt)
+            if diag_cfg.get("save_yaml", True):
+                diagnostics_manager.save_yaml(os.path.join(folder, "diagnostics_summary.yaml"))
+
+    if out_cfg.get("plot_profile", True):
+        submit("plot", plot)
+    if out_cfg.get("save_diagnostics", True):
+        submit("diagnostics", save_diagnostics)
+
+def open_snapshot_sink(cfg, folder, x, frame_shape, dtype, capacity):
+    """Snapshot sink of the configured ``output.snapshot_format`` in ``folder``."""
+    out_cfg = cfg["output"]
+    fmt = out_cfg.get("snapshot_format", "npy")
+    # The compressed archive also records the grid axis and the configuration.
+    options = dict(out_cfg.get("archive", {}), spatial_ndim=cfg.get("dimension", 1), coordinates=x,
+                   metadata={"config": cfg}) if fmt == "archive" else {}
+    return make_snapshot_sink(fmt, os.path.join(folder, "snapshots"), frame_shape, dtype=dtype,
+                              capacity=capacity, **options)
+
+def replay_cached(cfg, entry, x, dx, n_members=None):
+    """
+    Produce the configured outputs (snapshots, animation, plot, diagnostics)
+    of a cached result without solving; returns its snapshots.
+    """
+    dim = cfg.get("dimension", 1)
+    folder = resolve_output_folder(cfg)
+    os.makedirs(folder, exist_ok=True)
+    frames, times = entry["frames"], entry["times"]
+    snapshots = open_snapshot_sink(cfg, folder, x, frames.shape[1:], frames.dtype, len(frames))
+    with profiler.phase("snapshots"):
+        for frame, t in zip(frames, times):
+            snapshots.append(frame, t)
+    frame_view = np.abs if np.iscomplexobj(frames) else np.asarray
+    animation = make_animation(cfg, folder, x, frame_view(frames[0]), len(frames))
+    if animation is not None:
+        with profiler.phase("animation"):
+            for frame, t in zip(frames, times):
+                animation.add(frame_view(frame), t)
+            animation.close()
+    diagnostics_manager = DiagnosticManager(dx=dx, dy=dx if dim == 2 else None, n_members=n_members,
+                                            every=cfg.get("diagnostics", {}).get("every", 1))
+    if entry["diagnostics"]:
+        diagnostics_manager.load_state(entry["diagnostics"])
+    if hasattr(snapshots, "add_table"):
+        snapshots.add_table("diagnostics", diagnostics_manager.columns())
+    write_results(cfg, folder, x, frames[0], entry["u"], diagnostics_manager)
+    return snapshots.reader()
+
+def main(cfg, resume=False, observers=()):
+    """
+    Run the simulation described by ``cfg`` and write the configured outputs.
+
+    Args:
+        cfg (dict): Configuration (see config.yaml).
+        resume (bool): Continue from the checkpoint in the output folder.
+        observers (Iterable[tuple]): ``(every, callback)`` pairs; ``callback(step, t, u,
+            diagnostics_manager)`` runs after every ``every``-th step (e.g. live progress,
+            see utils.live). An exception raised by a callback aborts the run.
+    Returns:
+        SnapshotReader: The stored snapshots.
+
+    With the result cache enabled (``cache`` section), a configuration whose
+    result is cached is not solved: the cached snapshots, which are all the
+    frames the run would store, are written to the configured snapshot sink
+    and the animation, plot and diagnostics are produced from them, so a hit
+    returns and writes the same as a miss. Only runs storing at most
+    ``cache.max_frames`` snapshots are cached.
+    """
+    setup_start = time.perf_counter()
     dim = cfg.get("dimension", 1)
-    init = cfg["initial_condition"]
     out_cfg = cfg["output"]
 
     pde_cfg = cfg["pde"]
@@ -39,89 +161,277 @@ def main(cfg):
 
     L = cfg["grid"]["L"]
     N = cfg["grid"]["N"]
-    dx = L / N
+    bc = cfg["grid"].get("bc", "periodic")
+    numerics_cfg = cfg.get("numerics", {})
+    backend = numerics_cfg.get("backend", "sparse")
+    order = numerics_cfg.get("order", 2)
+    kernels = numerics_cfg.get("kernels", "numpy")
+    tiles = numerics_cfg.get("tiles", 0)
+    precision = numerics_cfg.get("dtype", "float64")
+
+    from src.core.engine import ADAPTIVE_METHODS, Grid, TimeLoop, build_model, make_stepper, member_params
+    from src.core.time_integrators import max_stable_dt
+    from src.numerics.operators import spectral_radius_bound
+    from src.numerics.precision import flush_subnormals
+    from src.numerics.laplacian_nd import grid_coordinates
+
+    # An `ensemble` section evolves several members as one (n_grid, n_members)
+    # batch; each member is a copy of cfg with its own overrides applied.
+    member_cfgs = [apply_overrides(cfg, member) for member in expand_ensemble(cfg.get("ensemble"))]
+    n_members = len(member_cfgs) or None
+    pde_params = member_params([c["pde"] for c in member_cfgs]) if n_members else pde_cfg
+
+    x, dx = grid_coordinates(N, L, bc)
     dy = dx  # Assume square grid by default
 
-    from src.core.rhs_examples import make_linear_rhs
-    from src.core.time_integrators import rk4_step, euler_step
+    # Runs with the same physics settings are served from the result cache (if enabled).
+    cache = open_result_cache(cfg, os.path.dirname(os.path.abspath(__file__)))
+    cache_key = cache.key(cfg) if cache is not None and is_cacheable(cfg) else None
+    if cache_key is not None and not resume:
+        entry = cache.get(cache_key)
+        if entry is not None:
+            print(f"Using cached result {cache_key}")
+            return replay_cached(cfg, entry, x, dx, n_members)
+
     if dim == 1:
-        import numpy as _np
-        from src.numerics.laplacian_1d import make_laplacian_1d
         from src.initial_conditions.profiles_1d import gaussian_bump as ic_func
-        from src.core.pde_systems import LinearPDESystem1D
-
-        x = np.linspace(-L / 2, L / 2, N, endpoint=False)
-        lap = make_laplacian_1d(N, dx)
-        
-        ic_params = {k: v for k, v in init.items() if k != "type"}
-        u0 = ic_func(x, **ic_params)
-        u0 = u0.reshape(-1)
 
-        pde_system = LinearPDESystem1D(lap, alpha=pde_cfg["alpha"], step_func=None)
+        def profile_field(params):
+            shape = {k: v for k, v in params.items() if k in ("center", "width", "amplitude")}
+            return ic_func(x, **shape).reshape(-1)
 
     elif dim == 2:
-        from src.numerics.laplacian_2d import make_laplacian_2d
         from src.initial_conditions.gaussian_2d import gaussian_bump_2d as ic_func
-        from src.core.pde_systems import LinearPDESystem2D
 
-        x = np.linspace(-L / 2, L / 2, N, endpoint=False)
         y = x.copy()
         X, Y = np.meshgrid(x, y, indexing="ij")
-        lap = make_laplacian_2d(N, N, dx, dx)
-        u0 = ic_func(X, Y, center=(init["center"], init["center"]), width=init["width"], amplitude=init["amplitude"])
-        u0 = u0.reshape(-1)  
 
-        pde_system = LinearPDESystem2D(lap, alpha=pde_cfg["alpha"], step_func=None)
+        def profile(params, X=X, Y=Y):
+            return ic_func(X, Y, center=(params["center"], params["center"]), width=params["width"],
+                           amplitude=params["amplitude"])
+
+        def profile_field(params):
+            return profile(params).reshape(-1)
 
     else:
         raise ValueError(f"Unsupported dimension: {dim}")
 
-    if integrator_cfg["method"] == "rk4":
-        step_func = rk4_step
-    elif integrator_cfg["method"] == "euler":
-        step_func = euler_step
+    grid = Grid((N,) * dim, (dx, dy)[:dim], bc, backend, order, precision)
+    if "source" in pde_cfg:
+        # Constant forcing with the initial-condition profile; a zero-mean source has
+        # an equilibrium on periodic and Neumann grids (integrator.method: steady).
+        from src.core.direct_solvers import null_weights
+
+        source = profile_field(pde_cfg["source"])
+        weights = null_weights(grid.shape, bc)
+        if pde_cfg["source"].get("zero_mean", False) and weights is not None:
+            source -= np.dot(weights, source) / np.sum(weights)
+        pde_params = dict(pde_params, source=source)
+    model = build_model(pde_cfg.get("type", "heat"), pde_params, grid)
+
+    def initial_field(c):
+        return profile_field(c["initial_condition"])
+
+    u0 = np.column_stack([initial_field(c) for c in member_cfgs]) if n_members else initial_field(cfg)
+    u0 = u0.astype(model.dtype, copy=False)  # working precision; complex coefficients evolve a complex field
+    if cfg["initial_condition"].get("from_checkpoint"):
+        # Warm start, e.g. sweep runs branching off an equilibrated state.
+        u0 = warm_start(cfg["initial_condition"]["from_checkpoint"], u0.shape).astype(model.dtype, copy=False)
+    u0 = flush_subnormals(u0)  # e.g. far Gaussian tails, slow to compute with in float32
+
+    method = integrator_cfg["method"]
+    amr_cfg = cfg.get("amr", {})
+    if amr_cfg.get("enabled", False):
+        # Block-structured refinement with its own subcycled explicit stepping; the
+        # loop below sees the mesh averaged onto the base grid.
+        from src.core.amr import AMRStepper
+
+        if dim != 2 or n_members:
+            raise ValueError("amr requires dimension: 2 and no ensemble")
+        warm = cfg["initial_condition"].get("from_checkpoint")
+        initial = None if warm else lambda X, Y: profile(cfg["initial_condition"], X, Y)
+        stepper = AMRStepper(model, initial=initial, origin=x[0],
+                             **{k: v for k, v in amr_cfg.items() if k != "enabled"})
     else:
-        raise ValueError(f"Unsupported integrator method: {integrator_cfg['method']}")
-
-    dt = cfg["time"]["dt"]
-    steps = cfg["time"]["steps"]
-
-    u = u0.copy()
-    u_history = [u.copy()]
-    diagnostics = []
-    diagnostics_manager = DiagnosticManager(dx=dx, dy=dy if dim == 2 else None, u_ref=u0)
-
-    for step in range(steps):
-        rhs_func = pde_system.rhs_func
-        t = step * dt
-        u = step_func(u, rhs_func, t, dt)
-        u_history.append(u.copy())
-        diagnostics.append({
-            "step": step,
-            "min": u.min(),
-            "max": u.max(),
-            "mean": u.mean(),
-        })
-        diagnostics_manager.track_step(u, step)
-
-    output_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), out_cfg["folder"]))
+        stepper = make_stepper(method, model, dict(integrator_cfg, tiles=tiles,
+                                                   tile_mode=numerics_cfg.get("tile_mode", "processes"),
+                                                   batch_shape=(n_members,) if n_members else ()))
+    adaptive = method in ADAPTIVE_METHODS and not amr_cfg.get("enabled", False)  # amr ignores integrator.method
+
+    time_cfg = cfg["time"]
+    dt = time_cfg["dt"]
+    if "t_end" in time_cfg:
+        t_end = time_cfg["t_end"]
+        steps = max(1, int(round(t_end / dt)))
+        if not adaptive:
+            dt = t_end / steps
+    else:
+        steps = time_cfg["steps"]
+        t_end = steps * dt
+
+    explicit = method in ("euler", "rk4") and not amr_cfg.get("enabled", False)  # amr splits its steps itself
+    if explicit and cfg.get("validation", {}).get("check_stability", False):
+        dt_limit = max_stable_dt(method, np.max(np.abs(model.coeff)) * spectral_radius_bound(model.L_op))
+        if dt > dt_limit:
+            raise ValueError(f"dt={dt:g} exceeds the {method} stability limit {dt_limit:.3g}; "
+                             f"reduce time.dt or use an adaptive integrator (rk45, rk23)")
+
+    output_folder = resolve_output_folder(cfg)
     os.makedirs(output_folder, exist_ok=True)
 
-    if out_cfg.get("plot_profile", True):
-        maybe_plot_final(x if dim == 1 else X[:,0],
-                         u0 if dim == 1 else u0[:,u0.shape[1]//2],
-                         u_history[-1],
-                         output_folder)
+    # Checkpoints every `checkpoint_every` steps; resume continues from the last one.
+    checkpoint_every = int(time_cfg.get("checkpoint_every", 0))
+    checkpoint_path = os.path.join(output_folder, CHECKPOINT_NAME)
+    cfg_hash = config_hash(cfg)
+    checkpoint = None
+    if resume and os.path.exists(checkpoint_path):
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint["config_hash"] != cfg_hash:
+            raise ValueError(f"{checkpoint_path} was written for a different configuration "
+                             f"(hash {checkpoint['config_hash']}, current {cfg_hash})")
+        print(f"Resuming from step {checkpoint['step']} (t = {checkpoint['t']:.6g})")
 
-    if out_cfg.get("save_animation", True):
-        animate_heat_solution(x if dim == 1 else (x, y),
-                              u_history,
-                              dt=dt,
-                              save_path=os.path.join(output_folder, "heat_diffusion.gif"))
+    # Frames are streamed to disk every `save_every` steps (plus u0 and the final state).
+    save_every = max(1, int(out_cfg.get("save_every", 1)))
+    frame_shape = ((N,) if dim == 1 else (N, N)) + ((n_members,) if n_members else ())
+    snapshot_fmt = out_cfg.get("snapshot_format", "npy")
+    snapshot_root = os.path.join(output_folder, "snapshots")
+    previous_frames = recover_snapshots(snapshot_fmt, snapshot_root, checkpoint["snapshot"]["times"]) if checkpoint else None
+    snapshots = open_snapshot_sink(cfg, output_folder, x, frame_shape, u0.dtype, count_snapshots(steps, save_every))
 
-    if out_cfg.get("save_diagnostics", True):
-        diagnostics_manager.save_csv(os.path.join(output_folder, "diagnostics_tracked.csv"))
-        diagnostics_manager.save_yaml(os.path.join(output_folder, "diagnostics_summary.yaml"))
+    # The animation is rendered while the solver runs, from a subsample of the snapshots
+    # (showing |u| for complex fields).
+    frame_view = np.abs if np.iscomplexobj(u0) else np.asarray
+    animation = make_animation(cfg, output_folder, x, frame_view(u0), count_snapshots(steps, save_every))
+
+    # Snapshots, checkpoints, animation frames and the final files are written by
+    # background lanes while the solver continues (output.background_io).
+    pipeline = OutputPipeline(max_pending=out_cfg.get("max_pending", 8),
+                              background=out_cfg.get("background_io", True))
+
+    u = stepper.load(u0) if hasattr(stepper, "load") else u0.copy()
+    diag_cfg = cfg.get("diagnostics", {})
+    diagnostics_manager = DiagnosticManager(dx=dx, dy=dy if dim == 2 else None, u_ref=u0,
+                                            track=diag_cfg.get("track", DIAGNOSTICS),
+                                            every=diag_cfg.get("every", 1), n_members=n_members)
+    start_step, t_last = 0, 0.0
+    if checkpoint is None:
+        snapshots.append(u, 0.0)
+        if animation is not None:
+            animation.add(frame_view(u), 0.0)
+    else:
+        u[...] = checkpoint["u"]
+        start_step, t_last = checkpoint["step"], checkpoint["t"]
+        if hasattr(stepper, "load_state"):
+            stepper.load_state(checkpoint.get("stepper", {}), u)
+        diagnostics_manager.load_state(checkpoint["diagnostics"])
+        # Carry the frames stored before the interruption over into the new sink
+        # (in-memory snapshots of the interrupted run are lost).
+        if previous_frames is not None:
+            for frame, t in zip(previous_frames, previous_frames.times):
+                snapshots.append(frame, t)
+                if animation is not None:
+                    animation.add(frame_view(frame), t)
+            previous_frames.close()
+
+    def append_snapshot(frame, t):
+        with profiler.phase("snapshots"):
+            snapshots.append(frame, t)
+
+    def render_frame(frame, t, force=False):
+        with profiler.phase("animation"):
+            animation.add(frame_view(frame), t, force=force)
+
+    saved = {"t": snapshots.times[-1] if len(snapshots) else None}  # last frame handed to the snapshot lane
+
+    def save_snapshot(step, t):
+        frame = u.copy()
+        pipeline.submit("snapshots", append_snapshot, frame, t)
+        saved["t"] = t
+        profiler.count("history_bytes", u.nbytes)
+        if animation is not None:
+            pipeline.submit("animation", render_frame, frame, t)
+
+    stepper_stats = getattr(stepper, "stats", None)
+
+    def track_diagnostics(step, t):
+        # Integrator counters (adaptive steppers) are only gathered on recorded steps.
+        diagnostics_manager.record(u, t, **(stepper_stats() if stepper_stats else {}))
+
+    def checkpoint_task(u, step, t, stepper_state, diagnostics_state):
+        # Runs on the snapshot lane, after the appends submitted before it.
+        with profiler.phase("checkpoint"):
+            snapshots.flush()
+            save_checkpoint(checkpoint_path, u, step, t, cfg_hash, stepper=stepper_state,
+                            diagnostics=diagnostics_state, snapshot={"times": np.asarray(snapshots.times)})
+
+    def write_checkpoint(step, t):
+        pipeline.submit("snapshots", checkpoint_task, u.copy(), step, t,
+                        detach(stepper.state_dict()) if hasattr(stepper, "state_dict") else None,
+                        detach(diagnostics_manager.state_dict()))
+
+    # Implicit/exponential steppers own coeff*L and get the nonlinear remainder
+    # (None for the heat equation); explicit ones may use the fused kernels.
+    rhs_func = model.rhs_for(stepper)
+    if rhs_func is model.rhs:
+        rhs_func = model.kernel_rhs(kernels, numerics_cfg.get("threads")) or rhs_func
+    loop = TimeLoop(stepper, rhs_func, u, t=t_last, step=start_step)
+    loop.every(save_every, save_snapshot)
+    loop.every(diagnostics_manager.every, track_diagnostics)
+    loop.every(checkpoint_every, write_checkpoint)
+    for every, callback in observers:
+        loop.every(every, lambda step, t, callback=callback: callback(step, t, u, diagnostics_manager))
+    profiler.add_time("setup", time.perf_counter() - setup_start)
+
+    try:
+        if adaptive:
+            loop.run_until(t_end, stepper.dt_next if checkpoint is not None else dt)
+        else:
+            loop.run(dt, steps)
+    except BaseException:
+        # Interrupted or cancelled: finish the queued output (the last checkpoint and the
+        # snapshots it refers to) and stop the worker threads/processes before unwinding.
+        pipeline.close(raise_errors=False)
+        if animation is not None:
+            animation.close()
+        if hasattr(stepper, "close"):
+            stepper.close()
+        raise
+    t_last = loop.t
+
+    if hasattr(stepper, "close"):
+        u = u.copy()  # detach from the tiled stepper's shared memory before releasing it
+        stepper.close()
+
+    final = saved["t"] != t_last  # the final state still needs a frame
+
+    def finish_snapshots():
+        with profiler.phase("snapshots"):
+            if final:
+                snapshots.append(u, t_last)
+            if hasattr(snapshots, "add_table"):
+                snapshots.add_table("diagnostics", diagnostics_manager.columns())
+            snapshots.close()
+
+    def finish_animation():
+        if final or animation.last_rendered != animation.n_seen - 1:
+            render_frame(u, t_last, force=True)
+        with profiler.phase("animation"):
+            animation.close()  # waits for the writer thread to encode the remaining frames
+
+    try:
+        pipeline.submit("snapshots", finish_snapshots)
+        if animation is not None:
+            pipeline.submit("animation", finish_animation)
+        write_results(cfg, output_folder, x, u0, u, diagnostics_manager, pipeline)
+    except BaseException:
+        pipeline.close(raise_errors=False)
+        raise
+    pipeline.close()
+    u_history = snapshots.reader()
+    if cache_key is not None:
+        with profiler.phase("cache"):
+            cache.put(cache_key, u, u_history, u_history.times, diagnostics_manager.state_dict())
 
     return u_history
 
@@ -132,6 +442,13 @@ if __name__ == "__main__":
     parser.add_argument("--no-diagnostics", action="store_true", help="Disable saving diagnostics")
     parser.add_argument("--no-profile", action="store_true", help="Disable final profile plot")
     parser.add_argument("--pde", type=str, help="Override PDE type (e.g. heat, nlse, burgers)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint in the output folder")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse (and store) results of identical physics settings in the result cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a per-phase timing breakdown (profile.txt / profile.json) to the output folder")
+    parser.add_argument("--cprofile", action="store_true", help="With --profile: also capture cProfile statistics")
+    parser.add_argument("--tracemalloc", action="store_true", help="With --profile: also trace memory allocations")
     args = parser.parse_args()
 
     cfg = load_config(args.config)
@@ -143,5 +460,10 @@ if __name__ == "__main__":
         cfg["output"]["save_diagnostics"] = False
     if args.no_profile:
         cfg["output"]["plot_profile"] = False
+    if args.cache:
+        cfg.setdefault("cache", {}).update(enabled=True)
+    if args.profile or args.cprofile or args.tracemalloc:
+        cfg.setdefault("profiling", {}).update(enabled=True)
+        cfg["profiling"].update({k: True for k in ("cprofile", "tracemalloc") if getattr(args, k)})
 
-    main(cfg)
\ No newline at end of file
+    run_simulation(cfg, resume=args.resume)
\ No newline at end of file
@@ -1,8 +1,12 @@
-import streamlit as st
-import subprocess
-import yaml
 import os
 
+import streamlit as st
+
+from main import resolve_output_folder
+from src.numerics.laplacian_nd import grid_coordinates
+from src.utils.config_loader import apply_overrides, load_config
+from src.utils.live import LiveRun
+
 st.title("🧪 Utility PDE Simulator")
 
 
@@ -23,42 +27,63 @@ plot_profile = st.sidebar.checkbox("Save Final Plot", True)
 save_animation = st.sidebar.checkbox("Save GIF", True)
 save_diagnostics = st.sidebar.checkbox("Save Diagnostics", True)
 
-if st.button("Run Simulation"):
-    cfg = {
-        "simulation": {
-            "L": L,
-            "N": N,
-            "alpha": alpha,
-            "dt": dt,
-            "steps": steps
-        },
-        "initial_condition": {
-            "type": ic_type,
-            "center": center,
-            "width": width,
-            "amplitude": amplitude
-        },
-        "output": {
-            "folder": "figures",
-            "plot_profile": plot_profile,
-            "save_animation": save_animation,
-            "save_diagnostics": save_diagnostics
-        }
-    }
-
+live_every = st.sidebar.number_input("Live update every (steps)", 1, 1000, 10)
 
-    with open("config_gui.yaml", "w") as f:
-        yaml.dump(cfg, f)
+run_col, cancel_col = st.columns(2)
+run = st.session_state.get("live_run")
 
-    result = subprocess.run(["python3", "main.py", "--config=config_gui.yaml"], capture_output=True, text=True)
+if run_col.button("Run Simulation"):
+    # Runs in-process on a background thread; settings seen before are served
+    # from the result cache, so toggling outputs or returning to an earlier
+    # slider position is instant.
+    cfg = apply_overrides(load_config("config.yaml"), {
+        "dimension": 1,
+        "grid.L": L,
+        "grid.N": int(N),
+        "pde.type": "heat",
+        "pde.alpha": alpha,
+        "time.dt": dt,
+        "time.steps": int(steps),
+        "initial_condition": {"type": ic_type, "center": center, "width": width, "amplitude": amplitude},
+        "output.folder": "figures",
+        "output.plot_profile": plot_profile,
+        "output.save_animation": save_animation,
+        "output.save_diagnostics": save_diagnostics,
+        "cache.enabled": True,
+    })
+    if run is not None and not run.done:
+        run.cancel()
+    run = st.session_state.live_run = LiveRun(cfg, every=int(live_every)).start()
 
-    st.success("Simulation completed!")
-    st.text("Output:")
-    st.code(result.stdout)
+if cancel_col.button("Cancel", disabled=run is None or run.done):
+    run.cancel()
 
-    
-    if plot_profile and os.path.exists("figures/final_comparison.png"):
-        st.image("figures/final_comparison.png", caption="Final vs Initial Profile")
+if run is not None:
+    # Redraw the live field and the mass / L² curves until the run ends. A
+    # button press reruns this script, which ends the loop but not the run.
+    status, field_chart, curves_chart = st.empty(), st.empty(), st.empty()
+    grid = run.cfg["grid"]
+    x, _ = grid_coordinates(grid["N"], grid["L"], grid.get("bc", "periodic"))
+    while True:
+        finished = run.done
+        update = run.latest(timeout=0.1)
+        if update is not None:
+            status.text(f"step {update.step}, t = {update.t:.4f}")
+            field_chart.line_chart({"x": x, "u": update.u}, x="x", y="u")
+        curves = {name: [float(row[name]) for row in run.history if name in row] for name in ("mass", "l2_error")}
+        if any(curves.values()):
+            curves_chart.line_chart({name: values for name, values in curves.items() if values})
+        if finished:
+            break
 
-    if save_animation and os.path.exists("figures/heat_diffusion.gif"):
-        st.image("figures/heat_diffusion.gif", caption="GIF Preview", use_container_width=True)
\ No newline at end of file
+    if run.cancelled:
+        st.warning("Simulation cancelled.")
+    elif run.error is not None:
+        st.error(f"Simulation failed: {run.error}")
+    else:
+        st.success("Simulation completed!")
+        folder = resolve_output_folder(run.cfg)
+        if run.cfg["output"]["plot_profile"] and os.path.exists(os.path.join(folder, "final_comparison.png")):
+            st.image(os.path.join(folder, "final_comparison.png"), caption="Final vs Initial Profile")
+        if run.cfg["output"]["save_animation"] and os.path.exists(os.path.join(folder, "heat_diffusion.gif")):
+            st.image(os.path.join(folder, "heat_diffusion.gif"), caption="GIF Preview", use_container_width=True)
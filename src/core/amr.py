@@ -0,0 +1,483 @@
+"""
+amr.py
+------
+Block-structured adaptive mesh refinement for the 2D heat equation
+du/dt = α ∇²u on a periodic grid.
+
+The base N x N grid is split into square blocks of ``block_size`` cells.
+A block is refined into four children of the same size and half the cell
+width (a quadtree); the leaves form the mesh, and blocks sharing a face
+differ by at most one level (2:1 balance). Values are cell averages, with
+the points of the uniform grid as the centres of the base cells, so
+
+- prolongation to the children (minmod-limited linear reconstruction) and
+  restriction (averaging 2x2 children) both conserve Σ u h² exactly;
+- each level advances by explicit Euler steps on the face fluxes α ∂u/∂n,
+  and level l + 1 takes TIME_RATIO = 4 substeps per step of level l, which
+  keeps dt / h² (and so the stability margin) equal on all levels;
+- the coarse side of every coarse-fine face is corrected with the fluxes the
+  fine side integrated over its substeps (refluxing), so the total mass is
+  conserved to round-off.
+
+Fine ghost cells next to a coarser block are interpolated linearly along and
+across the face, and linearly in time between the coarse states before and
+after its step; coarse ghost cells next to finer blocks average the fine
+cells behind them.
+
+``AMRStepper`` wraps a ``BlockMesh`` in the stepper protocol. The field it
+exchanges with the time loop is the conservative average of the mesh on the
+base grid, so snapshots and DiagnosticManager (e.g. its mass) see the
+composite solution at the resolution of ``grid.N`` (``amr`` config section).
+"""
+
+import numpy as np
+
+from src.utils.profiling import profiler
+
+INDICATORS = ("gradient", "curvature")
+# Substeps of level l + 1 per step of level l: explicit diffusion needs dt ∝ h².
+TIME_RATIO = 4
+FACES = ((0, -1), (0, 1), (1, -1), (1, 1))  # (axis, side)
+
+
+def _minmod(a, b):
+    return np.where(a * b > 0, np.sign(a) * np.minimum(np.abs(a), np.abs(b)), 0.0)
+
+
+def prolong(padded):
+    """
+    Conservative linear reconstruction of a (B, B) block on the (2B, 2B) grid of
+    half the cell width, from the block with one layer of ghost cells
+    ``padded``. Slopes are minmod-limited; every 2x2 group averages to its parent.
+    """
+    c = padded[1:-1, 1:-1]
+    sx = _minmod(c - padded[:-2, 1:-1], padded[2:, 1:-1] - c) / 4
+    sy = _minmod(c - padded[1:-1, :-2], padded[1:-1, 2:] - c) / 4
+    fine = np.empty((2 * c.shape[0], 2 * c.shape[1]), dtype=c.dtype)
+    for a, ox in enumerate((-sx, sx)):
+        for b, oy in enumerate((-sy, sy)):
+            fine[a::2, b::2] = c + ox + oy
+    return fine
+
+
+def restrict(fine, r=2):
+    """Averages of the r x r cell groups of ``fine`` (conservative coarsening)."""
+    n, m = fine.shape
+    return fine.reshape(n // r, r, m // r, r).mean(axis=(1, 3))
+
+
+def block_indicator(padded, kind="gradient"):
+    """
+    Largest undivided first (gradient) or second (curvature) difference in a
+    padded block, or per block of a stack (..., B + 2, B + 2).
+    """
+    if kind not in INDICATORS:
+        raise ValueError(f"Unknown amr.indicator: {kind!r} (expected one of {INDICATORS})")
+    c = padded[..., 1:-1, 1:-1]
+    up, down = padded[..., 2:, 1:-1], padded[..., :-2, 1:-1]
+    right, left = padded[..., 1:-1, 2:], padded[..., 1:-1, :-2]
+    if kind == "gradient":
+        diff = np.maximum(np.abs(up - down), np.abs(right - left)) / 2
+    else:
+        diff = np.abs(up - 2 * c + down) + np.abs(right - 2 * c + left)
+    return diff.max(axis=(-2, -1))
+
+
+def _edge(axis, side):
+    """Index of the cells of a block along face (axis, side)."""
+    index = [slice(None), slice(None)]
+    index[axis] = -1 if side > 0 else 0
+    return tuple(index)
+
+
+def _ghost_index(axis, side):
+    """Index of the ghost cells of a padded block beyond face (axis, side)."""
+    index = [slice(1, -1), slice(1, -1)]
+    index[axis] = -1 if side > 0 else 0
+    return tuple(index)
+
+
+class BlockMesh:
+    """
+    Quadtree of square blocks over a periodic N x N grid of cell width ``h``.
+    Leaves are keyed by (level, i, j), the block position on the level's
+    lattice of (N / block_size) · 2**level blocks per axis.
+
+    Args:
+        N (int): Base cells per axis (a multiple of ``block_size``).
+        h (float): Base cell width.
+        block_size (int): Cells per block and axis (a multiple of 2**max_level).
+        max_level (int): Finest level; its cells are h / 2**max_level wide.
+        origin (float): Centre of the first base cell (on both axes).
+    """
+
+    def __init__(self, N, h, block_size=16, max_level=2, origin=0.0):
+        if N % block_size:
+            raise ValueError(f"amr.block_size={block_size} must divide grid.N={N}")
+        if block_size % 2**max_level:
+            raise ValueError(f"amr.block_size={block_size} must be a multiple of 2**max_level={2**max_level}")
+        self.N, self.h, self.B = N, h, block_size
+        self.max_level = max_level
+        self.origin = origin
+        self.leaves = {}  # (level, i, j) -> (B, B) cell averages
+        self._windows = {}  # level -> (t0, dt, leaf states at t0) of the step in progress
+        self._registers = {}  # (coarse key, axis, side) -> flux correction along the face
+        self._topology = {}  # level -> neighbour tables (see _level_topology); reset on regrid
+
+    @classmethod
+    def from_uniform(cls, u, h, **options):
+        """Mesh of level-0 blocks holding the (N, N) field ``u``."""
+        u = np.asarray(u, dtype=float)
+        mesh = cls(u.shape[0], h, **options)
+        B = mesh.B
+        for i in range(mesh.n_blocks(0)):
+            for j in range(mesh.n_blocks(0)):
+                mesh.leaves[(0, i, j)] = u[i * B:(i + 1) * B, j * B:(j + 1) * B].copy()
+        return mesh
+
+    def n_blocks(self, level):
+        """Blocks per axis on ``level``."""
+        return self.N // self.B * 2**level
+
+    @property
+    def finest_level(self):
+        return max(key[0] for key in self.leaves)
+
+    @property
+    def n_cells(self):
+        return len(self.leaves) * self.B**2
+
+    def counts(self):
+        """Number of leaves per level."""
+        counts = {}
+        for level, _, _ in self.leaves:
+            counts[level] = counts.get(level, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def mass(self):
+        """Σ u h² over all leaves."""
+        return sum(u.sum() * (self.h / 2**key[0]) ** 2 for key, u in self.leaves.items())
+
+    def cell_centres(self, key):
+        """(X, Y) coordinates of the cell centres of block ``key``."""
+        level, i, j = key
+        h = self.h / 2**level
+        offsets = (np.arange(self.B) + 0.5) * h + self.origin - self.h / 2
+        return np.meshgrid(i * self.B * h + offsets, j * self.B * h + offsets, indexing="ij")
+
+    def sample(self, func):
+        """Set every leaf to ``func(X, Y)`` at its cell centres."""
+        for key in self.leaves:
+            self.leaves[key] = np.asarray(func(*self.cell_centres(key)), dtype=float)
+
+    def to_uniform(self, level=0):
+        """
+        The mesh on the uniform grid of ``level``: finer leaves are restricted,
+        coarser ones repeated, so Σ u h² is kept exactly.
+        """
+        n = self.N * 2**level
+        out = np.empty((n, n))
+        for (l, i, j), u in self.leaves.items():
+            if l >= level:
+                patch = restrict(u, 2 ** (l - level)) if l > level else u
+            else:
+                r = 2 ** (level - l)
+                patch = np.repeat(np.repeat(u, r, axis=0), r, axis=1)
+            size = patch.shape[0]
+            out[i * size:(i + 1) * size, j * size:(j + 1) * size] = patch
+        return out
+
+    # --- neighbours and ghost cells -------------------------------------------------
+
+    def neighbour(self, key, axis, side):
+        """
+        What lies across face (axis, side) of leaf ``key``: ("same", leaf),
+        ("coarse", leaf one level up) or ("fine", (the two leaves touching the face)).
+        """
+        level, i, j = key
+        pos = [i, j]
+        pos[axis] = (pos[axis] + side) % self.n_blocks(level)
+        other = (level, *pos)
+        if other in self.leaves:
+            return "same", other
+        parent = (level - 1, pos[0] // 2, pos[1] // 2)
+        if level > 0 and parent in self.leaves:
+            return "coarse", parent
+        children = []
+        for t in (0, 1):
+            child = [2 * pos[0], 2 * pos[1]]
+            child[axis] += 0 if side > 0 else 1
+            child[1 - axis] += t
+            children.append((level + 1, *child))
+        return "fine", tuple(children)
+
+    def _coarse_state(self, key, t):
+        """Leaf ``key`` interpolated linearly to time ``t`` within its step in progress."""
+        window = self._windows.get(key[0])
+        if window is None or t is None:
+            return self.leaves[key]
+        t0, dt, old = window
+        theta = (t - t0) / dt
+        return old[key] + theta * (self.leaves[key] - old[key])
+
+    def _level_topology(self, level):
+        """
+        Leaves of ``level`` (sorted keys), index arrays (destination, source) of
+        their same-level neighbours per face, and the (n, key, axis, side, kind,
+        other) entries of the faces that border another level.
+        """
+        topology = self._topology.get(level)
+        if topology is None:
+            keys = sorted(key for key in self.leaves if key[0] == level)
+            index = {key: n for n, key in enumerate(keys)}
+            same, interfaces = {}, []
+            for axis, side in FACES:
+                dst, src = [], []
+                for n, key in enumerate(keys):
+                    kind, other = self.neighbour(key, axis, side)
+                    if kind == "same":
+                        dst.append(n)
+                        src.append(index[other])
+                    else:
+                        interfaces.append((n, key, axis, side, kind, other))
+                same[(axis, side)] = (np.array(dst, dtype=int), np.array(src, dtype=int))
+            topology = self._topology[level] = (keys, same, interfaces)
+        return topology
+
+    def _ghost(self, key, axis, side, t, kind=None, other=None):
+        if kind is None:
+            kind, other = self.neighbour(key, axis, side)
+        B = self.B
+        if kind == "same":
+            return self.leaves[other][_edge(axis, -side)]
+        if kind == "fine":
+            # Average of the 2x2 fine cells behind each ghost cell.
+            rows = slice(0, 2) if side > 0 else slice(-2, None)
+            strips = [self.leaves[c][rows, :] if axis == 0 else self.leaves[c][:, rows].T for c in other]
+            return restrict(np.concatenate(strips, axis=1))[0]
+        # Coarse neighbour: linear along the face, then between the inner fine cell
+        # (h/2 from the face) and the coarse cell centre (h from it).
+        level = key[0]
+        coarse = self._coarse_state(other, t)
+        pos = key[1:]
+        line = ((pos[axis] * B + (B if side > 0 else -1)) % (self.n_blocks(level) * B) // 2) % B
+        values = coarse[line, :] if axis == 0 else coarse[:, line]
+        tangential = pos[1 - axis] * B + np.arange(B)
+        m = (tangential // 2) % B
+        slope = np.empty_like(values)
+        slope[1:-1] = (values[2:] - values[:-2]) / 2
+        slope[0], slope[-1] = values[1] - values[0], values[-1] - values[-2]
+        across = values[m] + np.where(tangential % 2, 0.25, -0.25) * slope[m]
+        return (self.leaves[key][_edge(axis, side)] + 2 * across) / 3
+
+    def padded(self, key, t=None):
+        """Leaf ``key`` with one layer of face ghost cells (neighbours at time ``t``)."""
+        u = self.leaves[key]
+        p = np.zeros((self.B + 2, self.B + 2), dtype=u.dtype)
+        p[1:-1, 1:-1] = u
+        for axis, side in FACES:
+            p[_ghost_index(axis, side)] = self._ghost(key, axis, side, t)
+        return p
+
+    def padded_level(self, level, t=None):
+        """
+        The leaves of ``level`` stacked as U (n, B, B) and with ghost cells as
+        P (n, B + 2, B + 2), plus the level topology (see _level_topology).
+        """
+        keys, same, interfaces = topology = self._level_topology(level)
+        B = self.B
+        U = np.stack([self.leaves[key] for key in keys]) if keys else np.empty((0, B, B))
+        P = np.zeros((len(keys), B + 2, B + 2))
+        P[:, 1:-1, 1:-1] = U
+        for (axis, side), (dst, src) in same.items():
+            P[(dst,) + _ghost_index(axis, side)] = U[(src,) + _edge(axis, -side)]
+        for n, key, axis, side, kind, other in interfaces:
+            P[(n,) + _ghost_index(axis, side)] = self._ghost(key, axis, side, t, kind, other)
+        return U, P, topology
+
+    # --- time stepping ---------------------------------------------------------------
+
+    def advance(self, alpha, dt, t=0.0):
+        """Advance the mesh by one base step ``dt`` (finer levels subcycle)."""
+        self._advance(0, t, dt, alpha, self.finest_level)
+        self._windows.clear()
+
+    def _advance(self, level, t, dt, alpha, finest):
+        h = self.h / 2**level
+        B = self.B
+        U, P, (keys, _, interfaces) = self.padded_level(level, t)
+        gx = alpha / h * (P[:, 1:, 1:-1] - P[:, :-1, 1:-1])  # α ∂u/∂x on the B + 1 faces along axis 1
+        gy = alpha / h * (P[:, 1:-1, 1:] - P[:, 1:-1, :-1])
+        new = U + dt / h * (gx[:, 1:] - gx[:, :-1] + gy[:, :, 1:] - gy[:, :, :-1])
+        for n, key, axis, side, kind, other in interfaces:
+            flux = gx[n, -1 if side > 0 else 0] if axis == 0 else gy[n, :, -1 if side > 0 else 0]
+            if kind == "fine":
+                self._registers[(key, axis, side)] = -dt * flux
+            else:
+                # Two fine faces make up each coarse face: add their mean flux · dt.
+                m = ((key[2 - axis] * B + np.arange(B)) // 2) % B
+                np.add.at(self._registers[(other, axis, -side)], m, dt * flux / 2)
+        self._windows[level] = (t, dt, {key: self.leaves[key] for key in keys})
+        self.leaves.update(zip(keys, new))
+        if level < finest:
+            for s in range(TIME_RATIO):
+                self._advance(level + 1, t + s * dt / TIME_RATIO, dt / TIME_RATIO, alpha, finest)
+        for key in keys:
+            for axis, side in FACES:
+                correction = self._registers.pop((key, axis, side), None)
+                if correction is not None:
+                    self.leaves[key][_edge(axis, side)] += side * correction / h
+
+    # --- regridding ------------------------------------------------------------------
+
+    def refine_block(self, key):
+        """Replace leaf ``key`` by its four children (conservative prolongation)."""
+        level, i, j = key
+        fine = prolong(self.padded(key))
+        del self.leaves[key]
+        self._topology.clear()
+        B = self.B
+        for a in (0, 1):
+            for b in (0, 1):
+                self.leaves[(level + 1, 2 * i + a, 2 * j + b)] = fine[a * B:(a + 1) * B, b * B:(b + 1) * B].copy()
+
+    def coarsen_block(self, parent):
+        """Replace the four children of ``parent`` by their average."""
+        level, i, j = parent
+        children = [[(level + 1, 2 * i + a, 2 * j + b) for b in (0, 1)] for a in (0, 1)]
+        self.leaves[parent] = restrict(np.block([[self.leaves[c] for c in row] for row in children]))
+        for row in children:
+            for c in row:
+                del self.leaves[c]
+        self._topology.clear()
+
+    def regrid(self, refine_tol, coarsen_tol, indicator="gradient"):
+        """
+        Refine the leaves whose indicator (relative to max |u|) exceeds
+        ``refine_tol`` and merge groups of four sibling leaves that all stay
+        below ``coarsen_tol``, keeping 2:1 balance.
+
+        Returns:
+            (int, int): Numbers of refined and coarsened blocks.
+        """
+        scale = max(np.max(np.abs(u)) for u in self.leaves.values()) or 1.0
+        score = {}
+        for level in range(self.finest_level + 1):
+            _, P, (keys, _, _) = self.padded_level(level)
+            score.update(zip(keys, block_indicator(P, indicator) / scale))
+        refine = {key for key, s in score.items() if s > refine_tol and key[0] < self.max_level}
+        pending = list(refine)
+        while pending:  # coarser face neighbours of refined blocks are refined as well
+            key = pending.pop()
+            for axis, side in FACES:
+                kind, other = self.neighbour(key, axis, side)
+                if kind == "coarse" and other not in refine:
+                    refine.add(other)
+                    pending.append(other)
+        for key in sorted(refine):  # coarse levels first, so neighbours stay balanced
+            self.refine_block(key)
+
+        coarsened = 0
+        parents = {(level - 1, i // 2, j // 2) for level, i, j in self.leaves if level > 0}
+        for parent in sorted(parents, reverse=True):
+            level, i, j = parent
+            children = [(level + 1, 2 * i + a, 2 * j + b) for a in (0, 1) for b in (0, 1)]
+            if not all(c in score and c in self.leaves and score[c] < coarsen_tol for c in children):
+                continue
+            if any(self.neighbour(c, axis, side)[0] == "fine" for c in children for axis, side in FACES):
+                continue
+            self.coarsen_block(parent)
+            coarsened += 1
+        return len(refine), coarsened
+
+
+class AMRStepper:
+    """
+    Stepper for the heat equation on a ``BlockMesh``. The field passed to and
+    returned by ``step`` is the base grid; the mesh lives in the stepper. Each
+    step is split into as many base steps as the explicit stability limit
+    h² / (4 α) requires, and the mesh is regridded every ``regrid_every`` base
+    steps.
+
+    Args:
+        model (PDEModel): Heat model on a periodic 2D grid with a real scalar α.
+        initial (callable, optional): u(X, Y), sampled on the new leaves while the
+            initial mesh is refined (otherwise the first field is prolonged).
+        origin (float): Coordinate of the first grid point (centre of the first base cell).
+        block_size (int): Cells per block and axis.
+        max_level (int): Finest refinement level.
+        refine_tol (float): Refine where the indicator exceeds this fraction of max |u|.
+        coarsen_tol (float, optional): Coarsen where it stays below this (default refine_tol / 4).
+        indicator (str): One of INDICATORS.
+        regrid_every (int): Base steps between regrids.
+        cfl (float): Base step as a fraction of the stability limit.
+    """
+    handles_linear_part = True
+
+    def __init__(self, model, initial=None, origin=0.0, block_size=16, max_level=2, refine_tol=0.02,
+                 coarsen_tol=None, indicator="gradient", regrid_every=4, cfl=0.8):
+        grid = model.grid
+        if model.name != "heat" or model.nonlinear is not None:
+            raise ValueError(f"amr only covers the heat equation without a source, not pde.type={model.name}")
+        if len(grid.shape) != 2 or grid.bc != "periodic":
+            raise ValueError("amr requires dimension: 2 and grid.bc=periodic")
+        if np.ndim(model.coeff) or np.iscomplexobj(model.coeff) or model.coeff <= 0:
+            raise ValueError("amr requires a single real, positive pde.alpha (no ensembles)")
+        if indicator not in INDICATORS:
+            raise ValueError(f"Unknown amr.indicator: {indicator!r} (expected one of {INDICATORS})")
+        self.alpha = float(model.coeff)
+        self.h = grid.spacing[0]
+        self.options = {"block_size": block_size, "max_level": max_level, "origin": origin}
+        self.initial = initial
+        self.refine_tol = refine_tol
+        self.coarsen_tol = refine_tol / 4 if coarsen_tol is None else coarsen_tol
+        self.indicator = indicator
+        self.regrid_every = max(1, int(regrid_every))
+        self.dt_max = cfl * self.h**2 / (4 * self.alpha)
+        self.mesh = None
+        self.n_steps = 0
+
+    def load(self, u0):
+        """Build and refine the initial mesh from ``u0``; returns its base-grid average."""
+        n = int(round(np.sqrt(u0.size)))
+        self.mesh = BlockMesh.from_uniform(u0.reshape(n, n).real, self.h, **self.options)
+        for _ in range(self.mesh.max_level):
+            refined, _ = self.mesh.regrid(self.refine_tol, 0.0, self.indicator)
+            if self.initial is not None:
+                self.mesh.sample(self.initial)
+            if not refined:
+                break
+        return self.mesh.to_uniform().reshape(u0.shape).astype(u0.dtype)
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if self.mesh is None:
+            self.load(u)
+        n = max(1, int(np.ceil(dt / self.dt_max)))
+        for s in range(n):
+            self.mesh.advance(self.alpha, dt / n, t + s * dt / n)
+            self.n_steps += 1
+            if self.n_steps % self.regrid_every == 0:
+                with profiler.phase("regrid"):
+                    self.mesh.regrid(self.refine_tol, self.coarsen_tol, self.indicator)
+        result = self.mesh.to_uniform().reshape(u.shape)
+        if out is None:
+            return result.astype(u.dtype)
+        out[...] = result
+        return out
+
+    def stats(self):
+        """Mesh size, recorded as diagnostics columns."""
+        return {"amr_cells": self.mesh.n_cells, "amr_finest_level": self.mesh.finest_level}
+
+    def state_dict(self):
+        """Leaf keys and values, for checkpoints."""
+        keys = list(self.mesh.leaves)
+        return {"keys": np.array(keys), "values": np.stack([self.mesh.leaves[k] for k in keys]),
+                "n_steps": self.n_steps}
+
+    def load_state(self, state, u=None):
+        """Restore a ``state_dict``."""
+        self.mesh = BlockMesh(int(round(np.sqrt(u.size))), self.h, **self.options)
+        self.mesh.leaves = {tuple(int(v) for v in key): values.copy()
+                            for key, values in zip(state["keys"], state["values"])}
+        self.n_steps = int(state["n_steps"])
@@ -1,17 +1,17 @@
-from utils.diagnostic_manager import DiagnosticManager
+from src.core.engine import integrate
+
 class BasePDESystem:
     def __init__(self, rhs_func, step_func, diagnostic_manager=None):
         self.rhs_func = rhs_func
         self.step_func = step_func
         self.diagnostic_manager = diagnostic_manager
 
-    def evolve(self, u0, dt, steps):
-        u = u0.copy()
-        u_history = [u.copy()]
-
-        for step in range(steps):
-            t = step * dt
-            u = self.step_func(u, self.rhs_func, t, dt)
-            u_history.append(u.copy())
-
-        return u_history
\ No newline at end of file
+    def evolve(self, u0, dt, steps, sink=None, save_every=1):
+        """
+        Advance u0 by ``steps`` steps of ``step_func``, storing every
+        ``save_every``-th state (plus u0 and the final state) in ``sink``
+        (in memory by default); every new state is passed to the
+        ``diagnostic_manager``, if any. Returns a reader over the stored frames.
+        """
+        return integrate(self.step_func, self.rhs_func, u0, dt, steps, sink=sink, save_every=save_every,
+                         diagnostics=self.diagnostic_manager)
@@ -0,0 +1,340 @@
+"""
+direct_solvers.py
+-----------------
+Reach a late time or the equilibrium of a linear problem
+
+    du/dt = alpha L u + f
+
+without marching through the intermediate steps.
+
+``expm_action`` evaluates u(t) = exp(t alpha L) u0 (plus the contribution of
+a constant source f) with a shift-and-invert Krylov method (van den Eshof &
+Hochbruck 2006): the Arnoldi basis is built with solves of I - gamma L,
+gamma = |alpha| t / 10, whose LU factorization comes from the cache shared
+with the implicit integrators. Unlike polynomial Krylov or explicit stepping,
+the number of solves (typically 5-15) depends neither on t nor on the grid
+resolution. The spectral backend applies its exact exponential instead.
+
+``steady_state`` solves alpha L u = -f. On periodic and Neumann grids L
+has the constants as null space: the source must have zero weighted mean
+(otherwise the mean grows forever) and the free constant is fixed so that
+the conserved weighted mean of u0 is kept. Small problems are solved with a
+sparse LU factorization of the system bordered by that constraint; large 2D/3D
+grids use conjugate gradients preconditioned by geometric multigrid
+(numerics.multigrid) or, with pyamg installed, algebraic multigrid.
+
+``KrylovPropagator`` and ``SteadyStateSolver`` expose both through the
+stepper protocol (integrator methods ``expm`` and ``steady``).
+"""
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from src.core.implicit_integrators import as_sparse, lu_solve, operator_fingerprint, shifted_factorization
+from src.numerics.multigrid import MultigridPreconditioner, amg_preconditioner, coarsens
+from src.utils.profiling import profiler
+
+STEADY_SOLVERS = ("auto", "direct", "cg", "mg", "amg")
+
+
+def _columns(u, alpha):
+    """(column, alpha) pairs of a field or an (n_grid, n_members) batch with per-member alpha."""
+    if u.ndim == 1:
+        return [(slice(None), alpha)]
+    alphas = np.broadcast_to(alpha, u.shape[1:])
+    return [((slice(None),) + k, alphas[k]) for k in np.ndindex(*u.shape[1:])]
+
+
+def _si_expv(solve, v, t, alpha, gamma, krylov_dim=30, tol=1e-8):
+    """
+    exp(t alpha M) v from the Krylov space of Z = (I - gamma M)^{-1}, with
+    ``solve(b)`` = Z b. In that space M ≈ (I - H⁻¹) / gamma for the Arnoldi
+    Hessenberg matrix H of Z. The basis is extended until two successive
+    approximations agree to ``tol``; if ``krylov_dim`` vectors do not suffice
+    the step is split into substeps, which reuse the same factorization.
+    """
+    w = np.array(v, dtype=np.result_type(v, np.float64, alpha))
+    n = w.size
+    m = min(krylov_dim, n)
+    t_done = 0.0
+    while t_done < t:
+        beta = np.linalg.norm(w)
+        if beta == 0.0:
+            break
+        V = np.empty((m, n), dtype=w.dtype)
+        H = np.zeros((m + 1, m), dtype=w.dtype)
+        V[0] = w / beta
+        tau, y, prev = t - t_done, None, None
+        for j in range(m):
+            p = solve(V[j])
+            profiler.count("linear_solves")
+            for i in range(j + 1):  # modified Gram-Schmidt
+                H[i, j] = np.vdot(V[i], p)
+                p -= H[i, j] * V[i]
+            H[j + 1, j] = np.linalg.norm(p)
+            k = j + 1
+            Mk = (np.eye(k) - np.linalg.inv(H[:k, :k])) / gamma
+            y = scipy.linalg.expm(tau * alpha * Mk)[:, 0]
+            invariant = abs(H[j + 1, j]) <= 1e-12 * np.linalg.norm(H[:k, j])
+            if invariant or (prev is not None and np.linalg.norm(y[:-1] - prev) + abs(y[-1]) <= tol):
+                break
+            prev = y
+            if k < m:
+                V[k] = p / H[j + 1, j]
+        else:
+            # Not converged: shrink the substep until the last two approximations agree.
+            while tau > 1e-12 * t:
+                tau /= 2
+                y = scipy.linalg.expm(tau * alpha * Mk)[:, 0]
+                y_prev = scipy.linalg.expm(tau * alpha * (np.eye(k - 1) - np.linalg.inv(H[:k - 1, :k - 1])) / gamma)
+                if np.linalg.norm(y[:-1] - y_prev[:, 0]) + abs(y[-1]) <= tol:
+                    break
+        w = beta * (y @ V[:k])
+        t_done += tau
+    return w
+
+
+def expm_action(L_op, u0, t, alpha=1.0, source=None, krylov_dim=30, tol=1e-8):
+    """
+    State at time ``t`` of du/dt = alpha L u + f, starting from ``u0``.
+
+    Args:
+        L_op: Laplacian (CSR matrix, StencilLaplacian or SpectralLaplacian).
+        u0 (np.ndarray): Flattened field or (n_grid, n_members) batch.
+        t (float): Time span.
+        alpha (float, complex or np.ndarray): Coefficient of L; one per member for batches.
+        source (np.ndarray, optional): Constant source f on the grid (shared by all members).
+        krylov_dim (int): Largest Krylov basis per substep.
+        tol (float): Relative error tolerance per substep.
+    Returns:
+        np.ndarray: u(t), with the precision of ``u0``.
+    """
+    u0 = np.asarray(u0)
+    if source is None and hasattr(L_op, "exp_apply"):
+        return L_op.exp_apply(u0, np.asarray(alpha) * t)
+    out = np.empty(u0.shape, dtype=np.result_type(u0, 1j if np.iscomplexobj(alpha) else 0.0))
+    if t == 0:
+        out[...] = u0
+        return out
+    A = as_sparse(L_op).astype(np.float64)
+    fingerprint = operator_fingerprint(A)
+    n = u0.shape[0]
+    for column, a in _columns(u0, alpha):
+        gamma = abs(a) * t / 10  # shift of the resolvent (I - gamma L)^{-1}
+        lu = shifted_factorization(A, gamma, fingerprint)
+        v = u0[column]
+        if source is None:
+            out[column] = _si_expv(lambda b: lu_solve(lu, b), v, t, a, gamma, krylov_dim, tol)
+            continue
+        # Affine problem as a linear one on [u; s] with ds/dt = 0 and s(0) = 1:
+        # M = [[L, f / a], [0, 0]], so I - gamma M is block upper triangular.
+        shifted_source = gamma * source / a
+
+        def solve(b, lu=lu, shifted_source=shifted_source):
+            x = np.empty_like(b)
+            x[:n] = lu_solve(lu, b[:n] + b[n] * shifted_source)
+            x[n] = b[n]
+            return x
+        out[column] = _si_expv(solve, np.append(v, 1.0), t, a, gamma, krylov_dim, tol)[:n]
+    return out
+
+
+def null_weights(grid_shape, bc="periodic"):
+    """
+    Left null vector w of the Laplacian (wᵀ L = 0) on ``grid_shape``: ones on
+    periodic grids, trapezoidal weights on Neumann grids, None for Dirichlet.
+    ``diag(w) L`` is symmetric, and wᵀu is conserved by du/dt = alpha L u.
+    """
+    if bc == "dirichlet":
+        return None
+    w = np.ones(())
+    for n in grid_shape:
+        wi = np.ones(n)
+        if bc == "neumann":
+            wi[[0, -1]] = 0.5
+        w = np.multiply.outer(w, wi)
+    return w.reshape(-1)
+
+
+def pcg(A, b, precondition=None, tol=1e-10, maxiter=None, project=None):
+    """
+    Preconditioned conjugate gradients for a symmetric positive (semi-)definite
+    ``A`` and a consistent right-hand side ``b`` (real or complex).
+
+    Args:
+        project (callable, optional): Removes the null-space component of a vector in
+            place; applied to the residuals of singular systems, where round-off
+            would otherwise build up a component CG cannot reduce.
+    Returns:
+        (np.ndarray, int): Solution and number of iterations.
+    """
+    precondition = precondition or (lambda r: r)
+    project = project or (lambda r: r)
+    x = np.zeros_like(b)
+    r = project(b.copy())
+    z = precondition(r)
+    p = z.copy()
+    rz = np.vdot(r, z)
+    b_norm = np.linalg.norm(b)
+    maxiter = maxiter or 10 * b.size
+    for it in range(maxiter):
+        if np.linalg.norm(r) <= tol * b_norm:
+            return x, it
+        Ap = A @ p
+        step = rz / np.vdot(p, Ap)
+        x += step * p
+        r -= step * Ap
+        project(r)
+        z = precondition(r)
+        rz, rz_prev = np.vdot(r, z), rz
+        p *= rz / rz_prev
+        p += z
+    raise RuntimeError(f"CG did not converge in {maxiter} iterations (residual {np.linalg.norm(r) / b_norm:.2e})")
+
+
+def steady_state(L_op, source=None, u0=None, alpha=1.0, grid_shape=None, bc="periodic", solver="auto",
+                 tol=1e-10, maxiter=None):
+    """
+    Equilibrium u of du/dt = alpha L u + f, i.e. the solution of alpha L u = -f.
+
+    Args:
+        L_op: Laplacian (CSR matrix or an operator with ``tocsr()``).
+        source (np.ndarray, optional): Constant source f; None for f = 0.
+        u0 (np.ndarray, optional): Initial field (or batch); on periodic and Neumann
+            grids the result keeps its conserved weighted mean (zero if omitted).
+        alpha (float, complex or np.ndarray): Coefficient of L; one per member for batches.
+        grid_shape (tuple[int], optional): Points per axis; needed by the mg solver and for
+            Neumann weights. Defaults to a 1D grid.
+        bc (str): Boundary condition the operator was built with.
+        solver (str): One of STEADY_SOLVERS; "auto" factorizes 1D problems and
+            uses mg (or plain cg on grids that do not coarsen) otherwise.
+        tol (float): Relative residual tolerance of the iterative solvers.
+        maxiter (int, optional): Iteration cap of the iterative solvers.
+    Returns:
+        np.ndarray: Equilibrium with the shape of ``u0`` (or of ``source``).
+    Raises:
+        ValueError: For an unknown solver, or a source with nonzero mean on a
+            periodic / Neumann grid (no equilibrium exists).
+    """
+    if solver not in STEADY_SOLVERS:
+        raise ValueError(f"Unknown steady-state solver: {solver!r} (expected one of {STEADY_SOLVERS})")
+    A = as_sparse(L_op).astype(np.float64)
+    n = A.shape[0]
+    grid_shape = tuple(grid_shape or (n,))
+    f = np.zeros(n) if source is None else np.asarray(source).reshape(n)
+    w = null_weights(grid_shape, bc)
+    if w is not None and abs(np.vdot(w, f)) > 1e-10 * np.sum(w) * max(np.max(np.abs(f)), 1e-300):
+        raise ValueError("A source with nonzero mean has no steady state on a periodic or Neumann grid "
+                         "(the mean grows linearly in time); remove its mean")
+    if u0 is None:
+        u0 = np.zeros(n, dtype=f.dtype)
+    u0 = np.asarray(u0)
+
+    if solver == "auto":
+        # Banded 1D systems factorize cheaply; in 2D/3D the fill-in of LU grows
+        # quickly and multigrid-preconditioned CG needs ~10 iterations at any size.
+        solver = "direct" if len(grid_shape) == 1 else "mg" if coarsens(grid_shape, bc) else "cg"
+    # Symmetric positive semi-definite form B u = W f / alpha with B = -W L.
+    W = sp.diags(np.ones(n) if w is None else w)
+    B = (-(W @ A)).tocsr()
+    solve = _direct_solver(B, w) if solver == "direct" else _iterative_solver(B, w, grid_shape, bc, solver,
+                                                                               tol, maxiter)
+    is_complex = np.iscomplexobj(f) or np.iscomplexobj(alpha)
+    out = np.empty(u0.shape, dtype=np.result_type(u0, 1j if is_complex else 0.0))
+    for column, a in _columns(u0, alpha):
+        u = solve(W @ f / a)
+        if w is not None:
+            u += (np.vdot(w, u0[column]) - np.vdot(w, u)) / np.sum(w)
+        out[column] = u
+    return out
+
+
+def _direct_solver(B, w):
+    if w is None:
+        lu = spla.splu(B.tocsc())
+        return lambda b: lu_solve(lu, b)
+    # Bordered system [[B, w], [wᵀ, 0]]: nonsingular, and its solution has wᵀu = 0.
+    n = B.shape[0]
+    border = sp.csr_matrix(w.reshape(-1, 1))
+    K = sp.bmat([[B, border], [border.T, None]], format="csc")
+    lu = spla.splu(K)
+    return lambda b: lu_solve(lu, np.append(b, 0.0))[:n]
+
+
+def _iterative_solver(B, w, grid_shape, bc, solver, tol, maxiter):
+    precondition = None
+    if solver == "mg":
+        precondition = MultigridPreconditioner(B, grid_shape, bc)
+    elif solver == "amg":
+        precondition = amg_preconditioner(B)
+
+    def remove_mean(r):
+        r -= np.mean(r)  # B is symmetric, so its range is orthogonal to the constants
+        return r
+
+    def solve(b):
+        u, iterations = pcg(B, b, precondition, tol=tol, maxiter=maxiter,
+                            project=None if w is None else remove_mean)
+        profiler.count("linear_iterations", iterations)
+        return u
+    return solve
+
+
+class KrylovPropagator:
+    """
+    Stepper advancing a linear (or affine, with a constant source) model by
+    ``expm_action`` over each step, so ``dt`` is limited by output needs only.
+    """
+    handles_linear_part = True
+
+    def __init__(self, L_op, alpha=1.0, source=None, krylov_dim=30, tol=1e-8):
+        self.L_op = L_op
+        self.alpha = alpha
+        self.source = source
+        self.krylov_dim = krylov_dim
+        self.tol = tol
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        result = expm_action(self.L_op, u, dt, self.alpha, self.source, self.krylov_dim, self.tol)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+
+class SteadyStateSolver:
+    """
+    Stepper that jumps to the equilibrium on its first step; later steps keep
+    it (the equilibrium only depends on the conserved mean of the state).
+
+    Args:
+        L_op: Laplacian.
+        alpha (float or np.ndarray): Coefficient of L.
+        grid_shape (tuple[int]): Points per axis.
+        bc (str): Boundary condition.
+        source (np.ndarray, optional): Constant source f.
+        solver (str): One of STEADY_SOLVERS.
+        tol (float): Relative residual tolerance of the iterative solvers.
+    """
+    handles_linear_part = True
+
+    def __init__(self, L_op, alpha=1.0, grid_shape=None, bc="periodic", source=None, solver="auto", tol=1e-10):
+        self.L_op = L_op
+        self.alpha = alpha
+        self.grid_shape = grid_shape
+        self.bc = bc
+        self.source = source
+        self.solver = solver
+        self.tol = tol
+        self.solution = None
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if self.solution is None or self.solution.shape != u.shape:
+            self.solution = steady_state(self.L_op, self.source, u, self.alpha, self.grid_shape, self.bc,
+                                         solver=self.solver, tol=self.tol)
+        if out is None:
+            return self.solution.astype(u.dtype)
+        out[...] = self.solution
+        return out
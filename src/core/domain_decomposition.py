@@ -0,0 +1,253 @@
+"""
+domain_decomposition.py
+-----------------------
+Multi-core RK4 stepping of the heat equation du/dt = α ∇²u on periodic grids
+by domain decomposition.
+
+The grid is cut into strips (tiles) along axis 0 and each tile is advanced by
+its own worker, a spawned process (default) or a thread. The field and the two RK4
+stage buffers live in one ``multiprocessing.shared_memory`` block, so a worker
+reads the halo rows of its neighbours directly from the shared stage it
+depends on; a barrier after every stage makes those rows valid before anyone
+reads them (4 barriers per step). Slopes and the RK4 accumulator are private
+to each worker.
+
+Every row is computed with the same arithmetic as ``RK4Stepper`` driving a
+``StencilLaplacian`` right-hand side, so the tiled result matches the serial
+one bit for bit, for any number of tiles.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.numerics.stencil_laplacian import StencilLaplacian
+
+TILE_MODES = ("processes", "threads")
+_CTRL = 3  # control words ahead of the fields: steps, dt, stop flag
+_START_TIMEOUT = 120  # seconds for spawned workers to import and reach the first barrier
+
+
+def tile_bounds(n_rows, tiles):
+    """(start, stop) rows of each tile; sizes differ by at most one row."""
+    edges = np.linspace(0, n_rows, tiles + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+
+def _views(buffer, field_shape, dtype):
+    """Control words plus the u / stage_a / stage_b arrays laid out in ``buffer``."""
+    ctrl = np.ndarray((_CTRL,), dtype=np.float64, buffer=buffer)
+    size = int(np.prod(field_shape))
+    fields = np.ndarray((3 * size,), dtype=dtype, buffer=buffer, offset=ctrl.nbytes)
+    return (ctrl,) + tuple(fields[i * size:(i + 1) * size].reshape(field_shape) for i in range(3))
+
+
+def _attach(name):
+    """
+    Open the stepper's shared-memory block in a worker. Spawned workers are
+    handed the parent's resource tracker, which already owns the block's cleanup.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _run_tile(ctrl, u, stage_a, stage_b, lap, alpha, start, stop, gate, sync):
+    """Advance rows [start, stop) whenever the gate opens, until the stop flag is set."""
+    k = np.empty((stop - start,) + u.shape[1:], dtype=u.dtype)
+    acc = np.empty_like(k)
+    u_t, a_t, b_t = u[start:stop], stage_a[start:stop], stage_b[start:stop]
+
+    def slope(v):
+        lap.apply_rows(v, k, start, stop)
+        np.multiply(k, alpha, out=k)
+
+    while True:
+        gate.wait()
+        steps, dt, stop_flag = int(ctrl[0]), float(ctrl[1]), ctrl[2]
+        if stop_flag:
+            return
+        half = 0.5 * dt
+        for _ in range(steps):
+            slope(u)                        # k1
+            np.copyto(acc, k)
+            np.multiply(k, half, out=a_t)
+            a_t += u_t
+            sync.wait()
+
+            slope(stage_a)                  # k2
+            np.multiply(k, half, out=b_t)
+            b_t += u_t
+            k *= 2
+            acc += k
+            sync.wait()
+
+            slope(stage_b)                  # k3 (stage_a is free again)
+            np.multiply(k, dt, out=a_t)
+            a_t += u_t
+            k *= 2
+            acc += k
+            sync.wait()
+
+            slope(stage_a)                  # k4
+            acc += k
+            acc *= dt / 6.0
+            u_t += acc
+            sync.wait()
+        gate.wait()
+
+
+def _tile_worker(shm_name, buffer, field_shape, dtype, grid_shape, spacing, alpha, start, stop, gate, sync):
+    shm = _attach(shm_name) if shm_name else None
+    ctrl, u, stage_a, stage_b = _views(shm.buf if shm else buffer, field_shape, dtype)
+    lap = StencilLaplacian(grid_shape, spacing)
+    try:
+        _run_tile(ctrl, u, stage_a, stage_b, lap, alpha, start, stop, gate, sync)
+    except threading.BrokenBarrierError:
+        pass  # another worker failed or the stepper was closed
+    except BaseException:
+        gate.abort()
+        sync.abort()
+        raise
+    finally:
+        del ctrl, u, stage_a, stage_b
+        if shm is not None:
+            shm.close()
+
+
+def _shutdown(ctrl, gate, sync, workers, shm):
+    ctrl[2] = 1.0
+    try:
+        gate.wait(timeout=10)
+    except threading.BrokenBarrierError:
+        sync.abort()  # release workers stuck between stages
+    for worker in workers:
+        worker.join(timeout=10)
+        if isinstance(worker, multiprocessing.process.BaseProcess) and worker.is_alive():
+            worker.terminate()
+    if shm is not None:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # views are still referenced; the mapping goes away with them
+        shm.unlink()
+
+
+class TiledRK4Stepper:
+    """
+    Classic RK4 for du/dt = α ∇²u on a periodic grid, advanced by ``tiles``
+    workers that each own a strip of rows (see module docstring).
+
+    Follows the stepper protocol with ``handles_linear_part = True``: the
+    right-hand side passed to ``step`` is ignored. ``load(u0)`` returns the
+    shared field itself; stepping that array in place (``out=u``) avoids
+    copying the field in and out on every step.
+
+    Args:
+        grid_shape (tuple): Grid shape, e.g. (N0, N1) or (N0, N1, N2); tiles split axis 0.
+        spacing (tuple): Grid spacing per axis.
+        alpha (float or np.ndarray): Diffusion coefficient; an array gives one value per
+            ensemble member (trailing axis of ``batch_shape``).
+        tiles (int, optional): Number of workers (default: CPU count, at most one per row).
+        mode (str): "processes" (spawned, so scripts need an ``if __name__ == "__main__":``
+            guard) or "threads".
+        batch_shape (tuple): Trailing ensemble axes of the field.
+        dtype: Field dtype.
+    """
+    handles_linear_part = True
+
+    def __init__(self, grid_shape, spacing, alpha=1.0, tiles=None, mode="processes", batch_shape=(), dtype=np.float64):
+        if mode not in TILE_MODES:
+            raise ValueError(f"Unknown tile mode: {mode!r} (expected one of {TILE_MODES})")
+        self.grid_shape = tuple(int(n) for n in grid_shape)
+        self.spacing = tuple(float(h) for h in spacing)
+        StencilLaplacian(self.grid_shape, self.spacing)  # validate the grid early
+        self.tiles = max(1, min(int(tiles or os.cpu_count() or 1), self.grid_shape[0]))
+        self.mode = mode
+        dtype = np.dtype(dtype)
+        field_shape = self.grid_shape + tuple(batch_shape)
+        nbytes = 8 * _CTRL + 3 * int(np.prod(field_shape)) * dtype.itemsize
+
+        if mode == "processes":
+            # Spawned, not forked: the parent may already run threads (numba, output lanes, a GUI)
+            # whose locks a forked child would inherit in a held state.
+            ctx = multiprocessing.get_context("spawn")
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            buffer, make_barrier, make_worker = shm.buf, ctx.Barrier, ctx.Process
+        else:
+            shm = None
+            buffer, make_barrier, make_worker = bytearray(nbytes), threading.Barrier, threading.Thread
+        ctrl, self._field = _views(buffer, field_shape, dtype)[:2]
+        self._ctrl = ctrl
+        self._gate = make_barrier(self.tiles + 1)
+        sync = make_barrier(self.tiles)
+
+        alpha = np.asarray(alpha, dtype=float) if np.ndim(alpha) else float(alpha)
+        workers = []
+        for start, stop in tile_bounds(self.grid_shape[0], self.tiles):
+            workers.append(make_worker(
+                target=_tile_worker, daemon=True,
+                args=(shm.name if shm else None, None if shm else buffer, field_shape, dtype,
+                      self.grid_shape, self.spacing, alpha, start, stop, self._gate, sync)))
+            workers[-1].start()
+        # The finalizer also keeps ``sync`` alive: started processes drop their arguments, and a
+        # collected barrier would unlink its semaphores before the spawned workers open them.
+        self._finalizer = weakref.finalize(self, _shutdown, ctrl, self._gate, sync, workers, shm)
+        n_grid = int(np.prod(self.grid_shape))
+        self.u = self._field.reshape((n_grid,) + tuple(batch_shape))
+        # Handshake (a zero-step advance): fail instead of hanging if a worker dies while starting.
+        deadline = time.monotonic() + _START_TIMEOUT
+        while self._gate.n_waiting < self.tiles:
+            if time.monotonic() > deadline or not all(worker.is_alive() for worker in workers):
+                self._gate.abort()  # lets the started workers exit
+                self.close()
+                raise RuntimeError("Tile workers failed to start; see their tracebacks above (scripts using "
+                                   "tile_mode: processes need an `if __name__ == \"__main__\":` guard)")
+            time.sleep(0.005)
+        self.advance(0.0, 0)
+
+    def load(self, u0):
+        """Copy ``u0`` into the shared field and return that field (flattened like ``u0``)."""
+        np.copyto(self.u, np.reshape(u0, self.u.shape))
+        return self.u
+
+    def advance(self, dt, steps=1):
+        """Advance the shared field by ``steps`` steps of size ``dt``."""
+        if not self._finalizer.alive:
+            raise ValueError("The tiled stepper has been closed")
+        self._ctrl[:2] = steps, dt
+        try:
+            self._gate.wait()
+            self._gate.wait()
+        except threading.BrokenBarrierError:
+            self.close()
+            raise RuntimeError("A tile worker failed; see its traceback above") from None
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if u is not self.u:
+            self.load(u)
+        self.advance(dt)
+        if out is None:
+            return self.u.copy()
+        if out is not self.u:
+            np.copyto(out, self.u)
+        return out
+
+    def __call__(self, u, rhs_func, t, dt):
+        return self.step(u, rhs_func, t, dt)
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
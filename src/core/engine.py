@@ -0,0 +1,448 @@
+"""
+engine.py
+---------
+The time-stepping engine behind every solver entry point (``main``,
+``BasePDESystem.evolve`` and the legacy heat-solver functions).
+
+A problem du/dt = c ∇²u + N(u, t) is described by a ``PDEModel`` built from
+the ``PDE_TYPES`` registry, and ``INTEGRATORS`` maps method names to stepper
+factories. ``TimeLoop`` advances the field in place and calls hooks
+(snapshots, diagnostics, checkpoints, ...) every ``every`` steps. The hot
+loop only steps, advances the clock and tests the hook strides; anything
+costlier, such as the counters of adaptive steppers, is gathered by the hook
+that needs it, on the steps it fires.
+
+Registering a new PDE type:
+
+    @register_pde("allen_cahn")
+    def allen_cahn(L_op, params, grid):
+        ...
+        return PDEModel("allen_cahn", L_op, grid, coeff=eps, nonlinear=N)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from src.core.exponential_integrators import EXPONENTIAL_METHODS
+from src.core.implicit_integrators import IMPLICIT_METHODS
+from src.core.rhs_examples import (make_burgers_nonlinear_rhs, make_linear_rhs, make_nlse_nonlinear_rhs,
+                                   make_source_rhs)
+from src.core.time_integrators import BogackiShampine23, DormandPrince45, EulerStepper, RK4Stepper
+from src.numerics.operators import make_laplacian
+from src.numerics.precision import cast_precision, real_dtype, working_dtype
+from src.utils.profiling import profiler
+from src.utils.snapshots import MemorySink, count_snapshots
+
+Grid = namedtuple("Grid", "shape spacing bc backend order dtype", defaults=("float64",))
+Grid.__doc__ = ("Square grid: shape (N,) * dim, spacing per axis, boundary condition, Laplacian backend and order, "
+                "and the working precision (numerics.dtype).")
+
+PDE_TYPES = {}
+INTEGRATORS = {}
+ADAPTIVE_METHODS = ("rk45", "rk23")
+
+
+def register_pde(name):
+    """Register ``builder(L_op, params, grid) -> PDEModel`` under ``name``."""
+    def register(builder):
+        PDE_TYPES[name] = builder
+        return builder
+    return register
+
+
+def register_integrator(*names):
+    """
+    Register ``factory(model, options) -> stepper`` under each of ``names``;
+    ``options["method"]`` tells the factory which name was requested.
+    """
+    def register(factory):
+        for name in names:
+            INTEGRATORS[name] = factory
+        return factory
+    return register
+
+
+class PDEModel:
+    """
+    du/dt = coeff · L u + N(u, t) on ``grid``.
+
+    Explicit integrators step the full ``rhs``; integrators that own the
+    linear part (``handles_linear_part``) get ``nonlinear`` only, which is
+    None for linear problems.
+
+    Args:
+        name (str): PDE type.
+        L_op: Laplacian operator.
+        grid (Grid): Grid the operator was built for.
+        coeff (float, complex or np.ndarray): Coefficient of L; an array gives one value per member.
+        nonlinear (callable, optional): N(u, t, out=None).
+        params (dict, optional): Further physical parameters (e.g. beta), as used by the fused kernels.
+    """
+
+    def __init__(self, name, L_op, grid, coeff=1.0, nonlinear=None, params=None):
+        self.name = name
+        self.L_op = L_op
+        self.grid = grid
+        self.coeff = coeff
+        self.nonlinear = nonlinear
+        self.params = params or {}
+        self.rhs = self._full_rhs()
+
+    @property
+    def dtype(self):
+        """Field dtype: the grid precision, complex if any coefficient is complex."""
+        values = [self.coeff] + list(self.params.values())
+        return working_dtype(self.grid.dtype, any(np.iscomplexobj(v) for v in values))
+
+    def _full_rhs(self):
+        linear = make_linear_rhs(self.L_op, alpha=self.coeff)
+        nonlinear = self.nonlinear
+        if nonlinear is None:
+            return linear
+        scratch = {}
+
+        def rhs(u, t, out=None):
+            out = linear(u, t, out=out)
+            buf = scratch.get("buf")
+            if buf is None or buf.shape != out.shape or buf.dtype != out.dtype:
+                buf = scratch["buf"] = np.empty_like(out)
+            out += nonlinear(u, t, out=buf)
+            return out
+        return rhs
+
+    def rhs_for(self, stepper):
+        """The right-hand side ``stepper`` expects: the nonlinear remainder or the full rhs."""
+        return self.nonlinear if getattr(stepper, "handles_linear_part", False) else self.rhs
+
+    def kernel_rhs(self, kernels="numpy", threads=None):
+        """
+        The fused numba right-hand side when ``kernels`` selects it and the model
+        fits the kernels (periodic, second order, real coefficients), else None.
+        ``kernels="numba"`` on a grid the kernels do not cover raises ValueError;
+        "auto" quietly keeps the NumPy right-hand side.
+        """
+        if kernels == "numpy":
+            return None  # without importing numba
+        from src.numerics.kernels import KERNEL_PDES, make_kernel_rhs, resolve_kernel_backend, set_kernel_threads
+
+        grid = self.grid
+        if kernels == "numba" and not (grid.bc == "periodic" and grid.order == 2):
+            raise ValueError("numerics.kernels=numba requires grid.bc=periodic and numerics.order=2")
+        fits = (self.name in KERNEL_PDES and np.isrealobj(self.coeff)
+                and all(np.ndim(v) == 0 and np.isrealobj(v) for v in self.params.values()))
+        if kernels == "numba" and not fits:
+            raise ValueError(f"numerics.kernels=numba does not cover pde.type={self.name} with these parameters")
+        if not fits or resolve_kernel_backend(kernels) != "numba":
+            return None
+        set_kernel_threads(threads)
+        coeff_name = "nu" if self.name == "burgers" else "alpha"
+        return make_kernel_rhs(self.name, grid.shape, grid.spacing, backend="numba",
+                               **{coeff_name: self.coeff}, **self.params)
+
+    def propagate(self, u0, t):
+        """exp(t · coeff · L) u0 of a linear model (exact on the spectral backend, Krylov otherwise)."""
+        from src.core.pde_systems import propagate_linear
+
+        if self.nonlinear is not None:
+            raise ValueError(f"Exact propagation only applies to linear PDEs, not pde.type={self.name}")
+        return propagate_linear(self.L_op, self.coeff, u0, t)
+
+
+def coefficient(value):
+    """Scalar or per-member coefficient; strings such as "0.5j" give complex values."""
+    if isinstance(value, str):
+        return complex(value.replace(" ", ""))
+    if np.ndim(value):
+        return np.array([coefficient(v) for v in value])
+    return value
+
+
+def member_params(pde_cfgs):
+    """
+    Per-member ``pde`` sections of an ensemble merged into one parameter dict
+    with an array of n_members values per key.
+    """
+    types = {c.get("type", "heat") for c in pde_cfgs}
+    if len(types) > 1:
+        raise ValueError(f"Ensemble members must share pde.type, got {sorted(types)}")
+    keys = [k for k in pde_cfgs[0] if k not in ("type", "source")]  # the source field is shared
+    return {k: coefficient([c[k] for c in pde_cfgs]) for k in keys}
+
+
+def build_model(pde_type, params, grid):
+    """
+    Build the Laplacian for ``grid`` and the ``PDEModel`` registered as ``pde_type``.
+
+    Args:
+        pde_type (str): Key of PDE_TYPES.
+        params (dict): The ``pde`` config section (coefficients may be per-member arrays);
+            ``source`` is a field on the grid.
+        grid (Grid): Grid description.
+    """
+    if pde_type not in PDE_TYPES:
+        raise ValueError(f"Unknown PDE type: {pde_type!r} (expected one of {tuple(PDE_TYPES)})")
+    L_op = make_laplacian(len(grid.shape), grid.shape[0], *grid.spacing,
+                          backend=grid.backend, bc=grid.bc, order=grid.order, dtype=real_dtype(grid.dtype))
+    params = {k: v if k == "source" else coefficient(v) for k, v in params.items() if k != "type"}
+    return PDE_TYPES[pde_type](L_op, params, grid)
+
+
+@register_pde("heat")
+def heat(L_op, params, grid):
+    """du/dt = α ∇²u (+ f with a constant source field ``params["source"]``)"""
+    source = params.get("source")
+    if source is None:
+        return PDEModel("heat", L_op, grid, coeff=params.get("alpha", 1.0))
+    source = cast_precision(source, grid.dtype).reshape(-1)
+    return PDEModel("heat", L_op, grid, coeff=params.get("alpha", 1.0),
+                    nonlinear=make_source_rhs(source), params={"source": source})
+
+
+@register_pde("nlse")
+def nlse(L_op, params, grid):
+    """du/dt = α ∇²u + β |u|² u (complex α, β such as "0.5j" give the Schrödinger form)"""
+    beta = params.get("beta", 1.0)
+    return PDEModel("nlse", L_op, grid, coeff=params.get("alpha", 1.0),
+                    nonlinear=make_nlse_nonlinear_rhs(beta), params={"beta": beta})
+
+
+@register_pde("burgers")
+def burgers(L_op, params, grid):
+    """du/dt = ν ∇²u - u (∂ₓu + ∂ᵧu) on a periodic 2D grid"""
+    if len(grid.shape) != 2:
+        raise ValueError("pde.type=burgers is two-dimensional (set dimension: 2)")
+    nu = params.get("nu", 0.1)
+    if np.ndim(nu):
+        raise ValueError("pde.type=burgers does not support ensembles")
+    if grid.backend == "spectral":
+        from src.numerics.spectral import make_spectral_gradient_2d as make_gradient
+    else:
+        from src.numerics.gradient_2d import make_gradient_2d as make_gradient
+    grad = make_gradient(*grid.shape, *grid.spacing)
+    return PDEModel("burgers", L_op, grid, coeff=nu,
+                    nonlinear=make_burgers_nonlinear_rhs(grad, int(np.prod(grid.shape))))
+
+
+def make_stepper(method, model, options=None):
+    """
+    Stepper for integrator ``method`` on ``model``.
+
+    Args:
+        method (str): Key of INTEGRATORS.
+        model (PDEModel): Problem to integrate.
+        options (dict, optional): Integrator settings (rtol, atol, dt_max) and,
+            for rk4, ``tiles`` / ``tile_mode`` / ``batch_shape`` of the tiled stepper.
+    """
+    if method not in INTEGRATORS:
+        raise ValueError(f"Unsupported integrator method: {method}")
+    return INTEGRATORS[method](model, dict(options or {}, method=method))
+
+
+@register_integrator("euler")
+def _euler(model, options):
+    return EulerStepper()
+
+
+@register_integrator("rk4")
+def _rk4(model, options):
+    tiles = options.get("tiles")
+    if not tiles:
+        return RK4Stepper()
+    # Domain-decomposed RK4: strips of rows advanced by `tiles` workers on shared memory.
+    from src.core.domain_decomposition import TiledRK4Stepper
+
+    grid = model.grid
+    if grid.bc != "periodic" or grid.order != 2:
+        raise ValueError("numerics.tiles requires grid.bc=periodic and numerics.order=2")
+    if model.nonlinear is not None:
+        raise ValueError(f"numerics.tiles only covers the heat equation, not pde.type={model.name}")
+    return TiledRK4Stepper(grid.shape, grid.spacing, alpha=model.coeff, tiles=tiles,
+                           mode=options.get("tile_mode", "processes"),
+                           batch_shape=options.get("batch_shape", ()), dtype=model.dtype)
+
+
+@register_integrator(*ADAPTIVE_METHODS)
+def _adaptive(model, options):
+    cls = DormandPrince45 if options.get("method", "rk45") == "rk45" else BogackiShampine23
+    return cls(rtol=options.get("rtol", 1e-6), atol=options.get("atol", 1e-9),
+               dt_max=options.get("dt_max", np.inf))
+
+
+@register_integrator(*IMPLICIT_METHODS)
+def _implicit(model, options):
+    return IMPLICIT_METHODS[options["method"]](model.L_op, alpha=model.coeff)
+
+
+@register_integrator(*(name for name in EXPONENTIAL_METHODS if name != "exact"))
+def _exponential(model, options):
+    return EXPONENTIAL_METHODS[options["method"]](model.L_op, alpha=model.coeff)
+
+
+@register_integrator("exact")
+def _exact(model, options):
+    if model.nonlinear is not None:
+        raise ValueError(f"integrator exact only solves linear PDEs, not pde.type={model.name}")
+    return ExactPropagator(model)
+
+
+def _linear_model_source(model, method):
+    """The constant source of a linear (or affine) model; rejects nonlinear models."""
+    if model.nonlinear is not None and "source" not in model.params:
+        raise ValueError(f"integrator {method} only solves linear PDEs, not pde.type={model.name}")
+    return model.params.get("source")
+
+
+@register_integrator("expm")
+def _expm(model, options):
+    from src.core.direct_solvers import KrylovPropagator
+
+    source = _linear_model_source(model, "expm")
+    return KrylovPropagator(model.L_op, alpha=model.coeff, source=source,
+                            krylov_dim=options.get("krylov_dim", 30), tol=options.get("tol", 1e-8))
+
+
+@register_integrator("steady")
+def _steady(model, options):
+    from src.core.direct_solvers import SteadyStateSolver
+
+    source = _linear_model_source(model, "steady")
+    return SteadyStateSolver(model.L_op, alpha=model.coeff, grid_shape=model.grid.shape, bc=model.grid.bc,
+                             source=source, solver=options.get("solver", "auto"), tol=options.get("tol", 1e-10))
+
+
+class ExactPropagator:
+    """
+    Stepper for linear models that reaches every time directly from the first
+    state it is given, exp((t - t0) · coeff · L) u0, so no error accumulates.
+    """
+    handles_linear_part = True
+
+    def __init__(self, model):
+        self.model = model
+        self.u0 = None
+        self.t0 = 0.0
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if self.u0 is None:
+            self.u0, self.t0 = u.copy(), t
+        result = self.model.propagate(self.u0, t + dt - self.t0)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+
+def as_stepper(step_func):
+    """Adapt a legacy ``step_func(u, rhs, t, dt) -> u_new`` to the stepper protocol."""
+    if hasattr(step_func, "step"):
+        return step_func
+
+    class _FunctionStepper:
+        @staticmethod
+        def step(u, rhs_func, t, dt, out=None):
+            result = step_func(u, rhs_func, t, dt)
+            if out is None:
+                return result
+            out[...] = np.reshape(result, out.shape)
+            return out
+    return _FunctionStepper()
+
+
+class TimeLoop:
+    """
+    Advance ``u`` in place with ``stepper`` and call the hooks at their strides.
+
+    Hooks are ``callback(step, t)`` with ``step`` the number of steps taken so
+    far (counting from the start of the run, also when resuming) and ``t`` the
+    time reached; they read the state from ``loop.u``.
+
+    Args:
+        stepper: Stepper following the ``step(u, rhs, t, dt, out=None)`` protocol.
+        rhs (callable or None): Right-hand side passed to the stepper.
+        u (np.ndarray): State, updated in place.
+        t (float): Time of ``u``.
+        step (int): Steps already taken (when resuming).
+    """
+
+    def __init__(self, stepper, rhs, u, t=0.0, step=0):
+        self.stepper = stepper
+        self.rhs = rhs
+        self.u = u
+        self.t = t
+        self.step = step
+        self.hooks = []
+
+    def every(self, n, callback):
+        """Call ``callback(step, t)`` after every ``n``-th step; n <= 0 disables it."""
+        if n and n > 0:
+            self.hooks.append((int(n), callback))
+        return callback
+
+    def _fire(self):
+        step, t = self.step, self.t
+        for n, callback in self.hooks:
+            if step % n == 0:
+                callback(step, t)
+
+    def run(self, dt, steps):
+        """Take fixed steps of size ``dt`` until ``steps`` steps are done (t = step · dt)."""
+        advance, rhs, u = self.stepper.step, self.rhs, self.u
+        start = self.step
+        for step in range(start, steps):
+            t = step * dt
+            with profiler.phase("step"):
+                advance(u, rhs, t, dt, out=u)
+            self.step, self.t = step + 1, t + dt
+            if self.hooks:
+                self._fire()
+        profiler.count("steps", max(0, steps - start))
+        return u
+
+    def run_until(self, t_end, dt):
+        """
+        Step an adaptive stepper (exposing ``dt_last`` / ``dt_next``) from the
+        current time to exactly ``t_end``, starting with a trial step ``dt``.
+        """
+        stepper, rhs, u = self.stepper, self.rhs, self.u
+        start = self.step
+        while self.t < t_end:
+            remaining = t_end - self.t
+            with profiler.phase("step"):
+                stepper.step(u, rhs, self.t, min(dt, remaining), out=u)
+            self.t = t_end if stepper.dt_last == remaining else self.t + stepper.dt_last
+            self.step += 1
+            dt = stepper.dt_next
+            if self.hooks:
+                self._fire()
+        profiler.count("steps", self.step - start)
+        return u
+
+
+def integrate(stepper, rhs, u0, dt, steps, sink=None, save_every=1, diagnostics=None):
+    """
+    Take ``steps`` fixed steps from a copy of ``u0`` and store u0, every
+    ``save_every``-th state and the final state in ``sink`` (in memory by
+    default); every state after u0 is passed to ``diagnostics.track_step``.
+
+    Returns:
+        SnapshotReader: The stored frames.
+    """
+    u = np.array(u0, copy=True)
+    sink = MemorySink(u.shape, u.dtype, capacity=count_snapshots(steps, save_every)) if sink is None else sink
+    sink.append(u, 0.0)
+    loop = TimeLoop(as_stepper(stepper), rhs, u)
+
+    def store(step, t):
+        with profiler.phase("snapshots"):
+            sink.append(u, t)
+        profiler.count("history_bytes", u.nbytes)
+
+    save_every = max(1, int(save_every))
+    loop.every(save_every, store)
+    if diagnostics is not None:
+        loop.every(1, lambda step, t: diagnostics.track_step(u, t))
+    loop.run(dt, steps)
+    if steps % save_every:
+        store(steps, loop.t)
+    return sink.reader()
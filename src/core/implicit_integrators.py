@@ -0,0 +1,299 @@
+"""
+implicit_integrators.py
+-----------------------
+Implicit and implicit-explicit (IMEX) time steppers for stiff diffusion.
+
+The stiff linear part ``alpha * L_op`` is treated implicitly; an optional
+non-stiff remainder ``rhs_func(u, t)`` (e.g. the nonlinear terms of the NLSE
+or Burgers equations) is treated explicitly. Every scheme here only needs
+solves with ``I - c * L_op`` for a fixed ``c``, which are LU-factorized once
+with ``scipy.sparse.linalg.splu`` and kept in a module-level LRU cache keyed
+on the operator contents and ``c``. Steppers on the same grid, dt and alpha
+(including those built by later runs in the same process) share the
+factorization.
+
+All steppers follow the explicit stepper interface
+``step(u, rhs_func, t, dt, out=None)``, where ``rhs_func`` is the explicit
+part only and may be None for a purely linear problem.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from src.core.time_integrators import as_inplace_rhs
+from src.numerics.operators import apply_operator
+from src.utils.profiling import profiler
+
+FACTORIZATION_CACHE_SIZE = 16
+_factorizations = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def as_sparse(L_op):
+    """CSR form of ``L_op`` (matrix-free operators must provide ``tocsr()``)."""
+    if sp.issparse(L_op):
+        return L_op.tocsr()
+    tocsr = getattr(L_op, "tocsr", None)
+    if tocsr is None:
+        raise TypeError(f"Implicit integrators need an assembled operator; {type(L_op).__name__} has no tocsr()")
+    return tocsr()
+
+
+def operator_fingerprint(A):
+    """Content hash of a sparse matrix, used as factorization cache key."""
+    A = A.tocsr()
+    h = hashlib.sha1()
+    h.update(repr((A.shape, A.dtype.str)).encode())
+    for arr in (A.indptr, A.indices, A.data):
+        h.update(np.ascontiguousarray(arr).view(np.uint8))
+    return h.hexdigest()
+
+
+def shifted_factorization(A, coeff, fingerprint=None):
+    """
+    Cached ``splu`` factorization of ``I - coeff * A``.
+
+    Args:
+        A (sparse matrix): Square operator.
+        coeff (float): Shift coefficient (e.g. theta * dt * alpha).
+        fingerprint (str, optional): Precomputed operator_fingerprint(A).
+    Returns:
+        scipy.sparse.linalg.SuperLU
+    """
+    key = (fingerprint or operator_fingerprint(A), float(coeff))
+    lu = _factorizations.get(key)
+    if lu is not None:
+        _factorizations.move_to_end(key)
+        _cache_stats["hits"] += 1
+        return lu
+    _cache_stats["misses"] += 1
+    M = (sp.identity(A.shape[0], dtype=A.dtype, format="csc") - coeff * A).tocsc()
+    lu = spla.splu(M)
+    _factorizations[key] = lu
+    while len(_factorizations) > FACTORIZATION_CACHE_SIZE:
+        _factorizations.popitem(last=False)
+    return lu
+
+
+def clear_factorization_cache():
+    _factorizations.clear()
+    _cache_stats.update(hits=0, misses=0)
+
+
+def factorization_cache_info():
+    return {"size": len(_factorizations), **_cache_stats}
+
+
+def lu_solve(lu, b, out=None):
+    """Solve with a real LU factor, splitting complex right-hand sides."""
+    if np.iscomplexobj(b):
+        x = lu.solve(np.ascontiguousarray(b.real)) + 1j * lu.solve(np.ascontiguousarray(b.imag))
+    else:
+        x = lu.solve(b)
+    if out is None:
+        return x
+    out[...] = x
+    return out
+
+
+class _ImplicitStepper:
+    """
+    Shared setup for steppers that solve with ``I - c * alpha * L_op``.
+
+    Args:
+        L_op: Laplacian (CSR matrix or operator with ``tocsr()``).
+        alpha (float or np.ndarray): Diffusion coefficient, or one per ensemble
+            member for a batch ``u`` of shape (n_grid, n_members).
+    """
+    handles_linear_part = True
+
+    def __init__(self, L_op, alpha=1.0):
+        if np.iscomplexobj(alpha):
+            raise ValueError(f"{type(self).__name__} factorizes real operators and needs a real alpha; "
+                             f"use an explicit or spectral integrator for complex coefficients")
+        self.L_op = L_op
+        self.A = as_sparse(L_op)
+        self.alpha = alpha
+        self._fingerprint = operator_fingerprint(self.A)
+        self._rhs_func = None
+        self._rhs_inplace = None
+        self.nfev = 0
+        self.nsolve = 0
+
+    def __call__(self, u, rhs_func, t, dt):
+        return self.step(u, rhs_func, t, dt)
+
+    def _factor(self, c, alpha=None):
+        alpha = self.alpha if alpha is None else alpha
+        return shifted_factorization(self.A, c * alpha, self._fingerprint)
+
+    def _explicit(self, rhs_func, u, t, out):
+        """out = rhs_func(u, t), or zeros when there is no explicit part."""
+        if rhs_func is None:
+            out[...] = 0.0
+            return out
+        if rhs_func is not self._rhs_func:
+            self._rhs_func = rhs_func
+            self._rhs_inplace = as_inplace_rhs(rhs_func)
+        self.nfev += 1
+        profiler.count("rhs_evals")
+        return self._rhs_inplace(u, t, out=out)
+
+    def _linear(self, u, out):
+        """out = alpha * L_op @ u"""
+        apply_operator(self.L_op, u, out=out)
+        out *= self.alpha
+        return out
+
+    def _solve(self, c, b, out):
+        self.nsolve += 1
+        profiler.count("linear_solves")
+        if np.ndim(self.alpha) == 0:
+            return lu_solve(self._factor(c), b, out=out)
+        # Per-member alpha: one factorization per distinct value, shared by its members.
+        alphas = np.asarray(self.alpha)
+        for alpha in np.unique(alphas):
+            members = np.flatnonzero(alphas == alpha)
+            out[:, members] = lu_solve(self._factor(c, alpha), b[:, members])
+        return out
+
+
+class ThetaStepper(_ImplicitStepper):
+    """
+    Theta method for du/dt = alpha L u + N(u, t), with N explicit:
+
+        (I - θ dt αL) u_{n+1} = u_n + (1 - θ) dt αL u_n + dt N(u_n, t_n)
+
+    θ = 1 is backward Euler, θ = 1/2 is Crank-Nicolson.
+    """
+
+    def __init__(self, L_op, alpha=1.0, theta=1.0):
+        super().__init__(L_op, alpha=alpha)
+        self.theta = theta
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if out is None:
+            out = np.empty_like(u)
+        b = self._explicit(rhs_func, u, t, np.empty_like(u))
+        b *= dt
+        b += u
+        if self.theta != 1.0:
+            Lu = self._linear(u, np.empty_like(u))
+            Lu *= (1.0 - self.theta) * dt
+            b += Lu
+        return self._solve(self.theta * dt, b, out)
+
+
+class BackwardEulerStepper(ThetaStepper):
+    """Backward (implicit) Euler; first order, L-stable."""
+
+    def __init__(self, L_op, alpha=1.0):
+        super().__init__(L_op, alpha=alpha, theta=1.0)
+
+
+class CrankNicolsonStepper(ThetaStepper):
+    """Crank-Nicolson; second order, A-stable."""
+
+    def __init__(self, L_op, alpha=1.0):
+        super().__init__(L_op, alpha=alpha, theta=0.5)
+
+
+class BDF2Stepper(_ImplicitStepper):
+    """
+    Second-order backward differentiation (SBDF2 when an explicit part is given):
+
+        (I - 2/3 dt αL) u_{n+1} = (4 u_n - u_{n-1}) / 3 + 2/3 dt (2 N_n - N_{n-1})
+
+    The first step, and any step that does not continue the previous one
+    with the same dt, is a backward Euler step.
+    """
+
+    def __init__(self, L_op, alpha=1.0):
+        super().__init__(L_op, alpha=alpha)
+        self.reset()
+
+    def reset(self):
+        """Drop the stored history so the next step restarts with backward Euler."""
+        self._u_prev = None
+        self._n_prev = None
+        self._resume = None
+
+    def state_dict(self):
+        """Previous step (u_{n-1}, N_{n-1}, t_n, dt), for checkpoints; empty before the first step."""
+        if self._resume is None:
+            return {}
+        _, t_next, dt = self._resume
+        return {"u_prev": self._u_prev, "n_prev": self._n_prev, "t_next": t_next, "dt": dt}
+
+    def load_state(self, state, u=None):
+        """Restore a ``state_dict`` so that stepping ``u`` continues the two-step history."""
+        self.reset()
+        if state and u is not None:
+            self._u_prev, self._n_prev = np.array(state["u_prev"]), np.array(state["n_prev"])
+            self._resume = (id(u), float(state["t_next"]), float(state["dt"]))
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if out is None:
+            out = np.empty_like(u)
+        n_curr = self._explicit(rhs_func, u, t, np.empty_like(u))
+        u_curr = u.copy()
+
+        if self._continues(u, t, dt):
+            b = 4.0 * u_curr - self._u_prev
+            b /= 3.0
+            b += (2.0 / 3.0) * dt * (2.0 * n_curr - self._n_prev)
+            self._solve(2.0 / 3.0 * dt, b, out)
+        else:
+            b = u_curr + dt * n_curr
+            self._solve(dt, b, out)
+
+        self._u_prev, self._n_prev = u_curr, n_curr
+        self._resume = (id(out), t + dt, dt)
+        return out
+
+    def _continues(self, u, t, dt):
+        """True if this call picks up the output of the previous step with the same dt."""
+        if self._resume is None:
+            return False
+        u_id, t_next, dt_prev = self._resume
+        return u_id == id(u) and dt == dt_prev and abs(t - t_next) <= 1e-8 * dt
+
+
+class IMEXStepper(_ImplicitStepper):
+    """
+    IMEX Runge-Kutta ARS(2,2,2) (Ascher, Ruuth & Spiteri 1997): implicit,
+    L-stable treatment of alpha L and second-order explicit treatment of
+    the remainder. Both implicit stages share one factorization of
+    (I - γ dt αL) with γ = 1 - 1/√2.
+    """
+    gamma = 1.0 - 1.0 / np.sqrt(2.0)
+    delta = 1.0 - 1.0 / (2.0 * (1.0 - 1.0 / np.sqrt(2.0)))
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        if out is None:
+            out = np.empty_like(u)
+        g, d = self.gamma, self.delta
+
+        n1 = self._explicit(rhs_func, u, t, np.empty_like(u))
+        b = u + (g * dt) * n1
+        u2 = self._solve(g * dt, b, np.empty_like(u))
+
+        n2 = self._explicit(rhs_func, u2, t + g * dt, np.empty_like(u))
+        Lu2 = self._linear(u2, np.empty_like(u))
+        np.multiply(n1, d * dt, out=b)
+        b += u
+        b += ((1.0 - d) * dt) * n2
+        b += ((1.0 - g) * dt) * Lu2
+        return self._solve(g * dt, b, out)
+
+
+IMPLICIT_METHODS = {
+    "backward_euler": BackwardEulerStepper,
+    "crank_nicolson": CrankNicolsonStepper,
+    "bdf2": BDF2Stepper,
+    "imex": IMEXStepper,
+}
@@ -1,33 +1,82 @@
 import numpy as np
 
-from src.utils.diagnostic_manager import DiagnosticManager
 from src.core.base_pde_system import BasePDESystem
+from src.numerics.operators import apply_operator
 
 class ExplicitPDESystem2D(BasePDESystem):
     def __init__(self, rhs_func, step_func=None, diagnostic_manager=None):
         super().__init__(rhs_func, step_func=step_func, diagnostic_manager=diagnostic_manager)
 
+def propagate_linear(L_op, alpha, u0, t):
+    """
+    Solution u(t) = exp(t α L) u0 of du/dt = α L u in a single jump: exact for
+    a SpectralLaplacian, a shift-and-invert Krylov approximation (to ~1e-8)
+    for finite-difference operators.
+    """
+    exp_apply = getattr(L_op, "exp_apply", None)
+    if exp_apply is None:
+        from src.core.direct_solvers import expm_action
+
+        return expm_action(L_op, u0, t, alpha)
+    return exp_apply(u0, alpha * t)
+
+def _steady_state(system, grid_shape, source, u0, bc, solver):
+    from src.core.direct_solvers import steady_state
+
+    return steady_state(system.L_op, source, u0, system.alpha, grid_shape, bc, solver=solver)
+
 class LinearPDESystem2D(BasePDESystem):
+    """
+    du/dt = alpha L u. ``u`` may be a single flattened field or an ensemble
+    batch of shape (n_grid, n_members), in which case L is applied to all
+    members at once and ``alpha`` may give one coefficient per member.
+    """
     def __init__(self, L_op, alpha=1.0, step_func=None, diagnostic_manager=None):
         self.L_op = L_op
-        self.alpha = alpha
+        self.alpha = np.asarray(alpha, dtype=float) if np.ndim(alpha) else alpha
 
-        def rhs_func(u_flat, t):
-            return self.alpha * (self.L_op @ u_flat)
+        def rhs_func(u_flat, t, out=None):
+            out = apply_operator(self.L_op, u_flat, out=out)
+            out *= self.alpha
+            return out
 
         super().__init__(rhs_func, step_func=step_func, diagnostic_manager=diagnostic_manager)
 
+    def propagate(self, u0, t):
+        """Jump straight to time t with the exp(t α L) propagator (see propagate_linear)."""
+        return propagate_linear(self.L_op, self.alpha, u0, t)
+
+    def steady_state(self, grid_shape, source=None, u0=None, bc="periodic", solver="auto"):
+        """
+        Equilibrium of du/dt = alpha L u + source on the (Nx, Ny) grid ``grid_shape``,
+        keeping the conserved mean of ``u0`` (see direct_solvers.steady_state).
+        """
+        return _steady_state(self, grid_shape, source, u0, bc, solver)
+
 def make_linear_rhs(operator, alpha=1.0):
-    def rhs(u, t):
-        return alpha * (operator @ u)
+    def rhs(u, t, out=None):
+        out = apply_operator(operator, u, out=out)
+        out *= alpha
+        return out
     return rhs
 
 class LinearPDESystem1D(BasePDESystem):
+    """1D counterpart of LinearPDESystem2D; accepts the same batched ``u`` and per-member ``alpha``."""
     def __init__(self, L_op, alpha=1.0, step_func=None, diagnostic_manager=None):
         self.L_op = L_op
-        self.alpha = alpha
+        self.alpha = np.asarray(alpha, dtype=float) if np.ndim(alpha) else alpha
+
+        def rhs_func(u_flat, t, out=None):
+            out = apply_operator(self.L_op, u_flat, out=out)
+            out *= self.alpha
+            return out
+
+        super().__init__(rhs_func, step_func=step_func, diagnostic_manager=diagnostic_manager)
 
-        def rhs_func(u_flat, t):
-            return self.alpha * (self.L_op @ u_flat)
+    def propagate(self, u0, t):
+        """Jump straight to time t with the exp(t α L) propagator (see propagate_linear)."""
+        return propagate_linear(self.L_op, self.alpha, u0, t)
 
-        super().__init__(rhs_func, step_func=step_func, diagnostic_manager=diagnostic_manager)
\ No newline at end of file
+    def steady_state(self, source=None, u0=None, bc="periodic", solver="auto"):
+        """Equilibrium of du/dt = alpha L u + source (see LinearPDESystem2D.steady_state)."""
+        return _steady_state(self, (self.L_op.shape[0],), source, u0, bc, solver)
@@ -1,19 +1,91 @@
 import numpy as np
 
+from src.numerics.operators import apply_operator
+
+
+def _scratch_like(cache, out):
+    s = cache.get("buf")
+    if s is None or s.shape != out.shape or s.dtype != out.dtype:
+        s = cache["buf"] = np.empty_like(out)
+    return s
+
+
+def make_nlse_nonlinear_rhs(beta=1.0):
+    """
+    Nonlinear part of the NLSE-type RHS, N(u) = β |u|² u.
+
+    Used on its own as the explicit term of IMEX integrators, with
+    α ∇²u treated implicitly.
+    """
+    def rhs(u_flat, t, out=None):
+        if out is None:
+            out = np.empty_like(u_flat)
+        np.conjugate(u_flat, out=out)
+        out *= u_flat
+        out *= u_flat
+        out *= beta
+        return out
+    return rhs
+
+
 def make_nlse_rhs(L_op, alpha=1.0, beta=1.0):
-    def rhs(u_flat, t):
-        u = u_flat.reshape(L_op.shape[0], 1)
-        linear_term = alpha * (L_op @ u)
-        nonlinear_term = beta * np.abs(u)**2 * u
-        return (linear_term + nonlinear_term).flatten()
+    """
+    Cubic nonlinear RHS: du/dt = α ∇²u + β |u|² u
+
+    The returned rhs(u, t, out=None) writes into ``out`` when given and
+    reuses one scratch buffer for the nonlinear term.
+    """
+    nonlinear = make_nlse_nonlinear_rhs(beta)
+    scratch = {}
+
+    def rhs(u_flat, t, out=None):
+        if out is None:
+            out = np.empty(u_flat.shape, dtype=np.result_type(u_flat, L_op.dtype))
+        apply_operator(L_op, u_flat, out=out)
+        out *= alpha
+        out += nonlinear(u_flat, t, out=_scratch_like(scratch, out))
+        return out
+    return rhs
+
+def make_source_rhs(source):
+    """
+    Constant forcing f of du/dt = α ∇²u + f, shared by all members of a
+    (n_grid, n_members) batch. Used as the explicit part of the heat equation
+    with a source (``pde.source``).
+    """
+    def rhs(u_flat, t, out=None):
+        if out is None:
+            out = np.empty(u_flat.shape, dtype=np.result_type(u_flat, source))
+        out[...] = source.reshape(source.shape + (1,) * (u_flat.ndim - 1))
+        return out
     return rhs
 
 def make_linear_rhs(operator, alpha=1.0):
     """
     Generic linear RHS for PDEs of the form du/dt = α * (operator @ u)
     """
-    def rhs(u, t):
-        return alpha * (operator @ u)
+    def rhs(u, t, out=None):
+        out = apply_operator(operator, u, out=out)
+        out *= alpha
+        return out
+    return rhs
+
+def make_burgers_nonlinear_rhs(grad_func, n_points):
+    """
+    Advective part of the Burgers'-style RHS, N(u) = -u · ∇u.
+
+    Parameters:
+        grad_func: function u_flat → (∂u/∂x, ∂u/∂y)
+        n_points: number of grid points (Nx*Ny)
+    """
+    def rhs(u_flat, t, out=None):
+        grad_x, grad_y = grad_func(u_flat.reshape(n_points, 1))
+        if out is None:
+            out = np.empty(u_flat.shape, dtype=np.result_type(u_flat, grad_x))
+        np.add(grad_x.reshape(u_flat.shape), grad_y.reshape(u_flat.shape), out=out)
+        out *= u_flat  # crude estimate of u · ∇u
+        np.negative(out, out=out)
+        return out
     return rhs
 
 def make_burgers_rhs(L_op, grad_func, nu=0.1):
@@ -21,17 +93,21 @@ def make_burgers_rhs(L_op, grad_func, nu=0.1):
     Burgers'-style PDE: du/dt = -u · ∇u + ν ∇²u
 
     Parameters:
-        L_op: Laplacian matrix (Nx*Ny x Nx*Ny)
+        L_op: Laplacian operator (Nx*Ny x Nx*Ny), CSR matrix or matrix-free stencil
         grad_func: function u_flat → (∂u/∂x, ∂u/∂y)
         nu: viscosity
 
     Returns:
-        rhs(u, t)
-    """
-    def rhs(u_flat, t):
-        u = u_flat.reshape(L_op.shape[0], 1)
-        grad_x, grad_y = grad_func(u)
-        nonlinear = u * grad_x + u * grad_y  # crude estimate of u · ∇u
-        linear = nu * (L_op @ u)
-        return (-nonlinear + linear).flatten()
-    return rhs
\ No newline at end of file
+        rhs(u, t, out=None)
+    """
+    nonlinear = make_burgers_nonlinear_rhs(grad_func, L_op.shape[0])
+    scratch = {}
+
+    def rhs(u_flat, t, out=None):
+        if out is None:
+            out = np.empty(u_flat.shape, dtype=np.result_type(u_flat, L_op.dtype))
+        apply_operator(L_op, u_flat, out=out)
+        out *= nu
+        out += nonlinear(u_flat, t, out=_scratch_like(scratch, out))
+        return out
+    return rhs
@@ -1,14 +1,351 @@
+import inspect
+
+import numpy as np
+
+from src.utils.profiling import profiler
+
+
+def accepts_out(rhs_func):
+    """True if ``rhs_func`` can be called as ``rhs_func(u, t, out=buffer)``."""
+    try:
+        params = inspect.signature(rhs_func).parameters
+    except (TypeError, ValueError):
+        return False
+    return "out" in params
+
+
+def as_inplace_rhs(rhs_func):
+    """
+    Adapt a right-hand side to the ``rhs(u, t, out=None)`` protocol.
+
+    Functions that already accept ``out`` are returned unchanged; legacy
+    ``rhs(u, t)`` functions are wrapped so their result is copied into ``out``.
+    """
+    if accepts_out(rhs_func):
+        return rhs_func
+
+    def rhs(u, t, out=None):
+        result = rhs_func(u, t)
+        if out is None:
+            return result
+        out[...] = np.reshape(result, out.shape)
+        return out
+
+    return rhs
+
+
+class _Stepper:
+    """
+    Base class for explicit one-step methods holding a reusable workspace.
+
+    ``step(u, rhs_func, t, dt, out=None)`` advances ``u`` by one step; ``out``
+    may be ``u`` itself for a fully in-place update. Calling the stepper
+    directly (``stepper(u, rhs_func, t, dt)``) matches the legacy
+    ``step_func`` signature and returns a new array.
+    """
+    n_buffers = 0
+
+    def __init__(self):
+        self._workspace = None
+        self._rhs_func = None
+        self._rhs_inplace = None
+
+    def __call__(self, u, rhs_func, t, dt):
+        return self.step(u, rhs_func, t, dt)
+
+    def _prepare(self, u, rhs_func, out):
+        if rhs_func is not self._rhs_func:
+            self._rhs_func = rhs_func
+            self._rhs_inplace = as_inplace_rhs(rhs_func)
+        ws = self._workspace
+        if ws is None or ws[0].shape != u.shape or ws[0].dtype != u.dtype:
+            ws = self._workspace = tuple(np.empty_like(u) for _ in range(self.n_buffers))
+        if out is None:
+            out = np.empty_like(u)
+        return self._rhs_inplace, ws, out
+
+
+class EulerStepper(_Stepper):
+    """Forward Euler: u_{n+1} = u_n + dt * f(u_n, t_n)."""
+    n_buffers = 1
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        f, (k,), out = self._prepare(u, rhs_func, out)
+        f(u, t, out=k)
+        profiler.count("rhs_evals")
+        k *= dt
+        np.add(u, k, out=out)
+        return out
+
+
+class RK4Stepper(_Stepper):
+    """
+    Classic fourth-order Runge-Kutta using three workspace buffers
+    (current stage slope, stage input, weighted accumulator).
+    """
+    n_buffers = 3
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        f, (k, stage, acc), out = self._prepare(u, rhs_func, out)
+        half = 0.5 * dt
+
+        f(u, t, out=k)                      # k1
+        np.copyto(acc, k)
+        np.multiply(k, half, out=stage)
+        stage += u
+
+        f(stage, t + half, out=k)           # k2
+        np.multiply(k, half, out=stage)
+        stage += u
+        k *= 2
+        acc += k
+
+        f(stage, t + half, out=k)           # k3
+        np.multiply(k, dt, out=stage)
+        stage += u
+        k *= 2
+        acc += k
+
+        f(stage, t + dt, out=k)             # k4
+        acc += k
+
+        acc *= dt / 6.0
+        np.add(u, acc, out=out)
+        profiler.count("rhs_evals", 4)
+        return out
+
+
 def euler_step(u, rhs_func, t, dt, diagnostics_fn=None):
+    """Compatibility wrapper around EulerStepper; returns a new array."""
     if diagnostics_fn:
         diagnostics_fn(u, t)
-    return u + dt * rhs_func(u, t)
+    return EulerStepper().step(u, rhs_func, t, dt)
 
 
 def rk4_step(u, rhs_func, t, dt, diagnostics_fn=None):
+    """Compatibility wrapper around RK4Stepper; returns a new array."""
     if diagnostics_fn:
         diagnostics_fn(u, t)
-    k1 = rhs_func(u, t)
-    k2 = rhs_func(u + 0.5 * dt * k1, t + 0.5 * dt)
-    k3 = rhs_func(u + 0.5 * dt * k2, t + 0.5 * dt)
-    k4 = rhs_func(u + dt * k3, t + dt)
-    return u + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
\ No newline at end of file
+    return RK4Stepper().step(u, rhs_func, t, dt)
+
+
+# Largest stable |dt * λ| on the negative real axis for the fixed-step methods.
+STABILITY_INTERVALS = {
+    "euler": 2.0,
+    "rk4": 2.785293563405282,
+}
+
+
+def max_stable_dt(method, spectral_radius):
+    """
+    Largest stable time step of an explicit fixed-step ``method`` for a
+    linear problem whose eigenvalues lie in [-spectral_radius, 0].
+    """
+    if method not in STABILITY_INTERVALS:
+        raise ValueError(f"No stability interval known for method {method!r}")
+    if spectral_radius <= 0:
+        return np.inf
+    return STABILITY_INTERVALS[method] / spectral_radius
+
+
+class EmbeddedRKStepper:
+    """
+    Adaptive explicit Runge-Kutta method with an embedded error estimate.
+
+    Subclasses define the Butcher tableau (``c``, ``a``, ``b``, ``b_hat``) and
+    ``order`` (of the propagated solution). Step sizes are chosen by a PI
+    controller on the weighted RMS error
+    ``||err / (atol + rtol * max(|u_n|, |u_{n+1}|))||``; steps with a norm
+    above one are rejected and retried with a smaller ``dt``.
+
+    ``step(u, rhs_func, t, dt, out=None)`` tries ``dt`` first and returns the
+    accepted solution; the step actually taken is ``dt_last`` and the
+    controller's proposal for the next step is ``dt_next``. Counters
+    ``n_accept``, ``n_reject`` and ``nfev`` accumulate over the lifetime of
+    the stepper. Methods with the FSAL property reuse the last stage of an
+    accepted step when the next call continues from its output.
+    """
+    c = a = b = b_hat = ()
+    order = None
+    fsal = True
+
+    def __init__(self, rtol=1e-6, atol=1e-9, dt_min=1e-12, dt_max=np.inf,
+                 safety=0.9, fac_min=0.2, fac_max=5.0, max_rejects=50):
+        self.rtol = rtol
+        self.atol = atol
+        self.dt_min = dt_min
+        self.dt_max = dt_max
+        self.safety = safety
+        self.fac_min = fac_min
+        self.fac_max = fac_max
+        self.max_rejects = max_rejects
+        # PI gains (Gustafsson); the embedded error estimate is O(dt^order).
+        self.beta_i = 0.7 / self.order
+        self.beta_p = 0.4 / self.order
+        self.e = tuple(bi - bh for bi, bh in zip(self.b, self.b_hat))
+
+        self.n_accept = 0
+        self.n_reject = 0
+        self.nfev = 0
+        self.dt_last = None
+        self.dt_next = None
+        self._err_prev = 1.0
+        self._workspace = None
+        self._rhs_func = None
+        self._rhs_inplace = None
+        self._fsal_from = None
+
+    def __call__(self, u, rhs_func, t, dt):
+        return self.step(u, rhs_func, t, dt)
+
+    def stats(self):
+        """Accepted/rejected step and RHS evaluation counters."""
+        return {"n_accept": self.n_accept, "n_reject": self.n_reject, "nfev": self.nfev}
+
+    def reset(self):
+        """Forget the FSAL stage and controller history (e.g. after modifying u externally)."""
+        self._fsal_from = None
+        self._err_prev = 1.0
+
+    def state_dict(self):
+        """Step-size controller state and counters, for checkpoints."""
+        return {"n_accept": self.n_accept, "n_reject": self.n_reject, "nfev": self.nfev,
+                "dt_last": self.dt_last, "dt_next": self.dt_next, "err_prev": self._err_prev}
+
+    def load_state(self, state, u=None):
+        """Restore a ``state_dict``; the next step starts a fresh FSAL chain."""
+        self.n_accept, self.n_reject, self.nfev = (int(state[k]) for k in ("n_accept", "n_reject", "nfev"))
+        self.dt_last, self.dt_next = float(state["dt_last"]), float(state["dt_next"])
+        self._err_prev = float(state["err_prev"])
+        self._fsal_from = None
+
+    def _continues(self, u, t):
+        """True if this call picks up the output of the previous accepted step."""
+        if self._fsal_from is None:
+            return False
+        u_id, t_next, dt_prev = self._fsal_from
+        return u_id == id(u) and abs(t - t_next) <= 1e-8 * dt_prev
+
+    def _prepare(self, u, rhs_func):
+        if rhs_func is not self._rhs_func:
+            self._rhs_func = rhs_func
+            self._rhs_inplace = as_inplace_rhs(rhs_func)
+            self._fsal_from = None
+        ws = self._workspace
+        if ws is None or ws["stage"].shape != u.shape or ws["stage"].dtype != u.dtype:
+            real = np.empty(0, dtype=u.dtype).real.dtype
+            ws = self._workspace = {
+                "k": [np.empty_like(u) for _ in self.c],
+                "stage": np.empty_like(u),
+                "tmp": np.empty_like(u),
+                "new": np.empty_like(u),
+                "scale": np.empty(u.shape, dtype=real),
+                "ratio": np.empty(u.shape, dtype=real),
+            }
+            self._fsal_from = None
+        return self._rhs_inplace, ws
+
+    def _combine(self, u, k, weights, dt, out, tmp):
+        """out = u + dt * sum_j weights[j] * k[j] without temporaries."""
+        np.copyto(out, u)
+        for w, kj in zip(weights, k):
+            if w != 0.0:
+                np.multiply(kj, dt * w, out=tmp)
+                out += tmp
+
+    def _attempt(self, f, u, t, dt, ws):
+        k, stage, tmp, new = ws["k"], ws["stage"], ws["tmp"], ws["new"]
+        last = len(self.c) - 1
+        for i in range(1, len(self.c)):
+            target = new if (self.fsal and i == last) else stage
+            self._combine(u, k, self.a[i - 1], dt, target, tmp)
+            f(target, t + self.c[i] * dt, out=k[i])
+            self.nfev += 1
+            profiler.count("rhs_evals")
+        if not self.fsal:
+            self._combine(u, k, self.b, dt, new, tmp)
+
+        # Weighted RMS norm of the embedded error estimate.
+        err = stage
+        np.multiply(k[0], dt * self.e[0], out=err)
+        for w, kj in zip(self.e[1:], k[1:]):
+            if w != 0.0:
+                np.multiply(kj, dt * w, out=tmp)
+                err += tmp
+        scale, ratio = ws["scale"], ws["ratio"]
+        np.abs(u, out=scale)
+        np.abs(new, out=ratio)
+        np.maximum(scale, ratio, out=scale)
+        scale *= self.rtol
+        scale += self.atol
+        np.abs(err, out=ratio)
+        ratio /= scale
+        flat = ratio.reshape(-1)
+        return float(np.sqrt(np.dot(flat, flat) / max(flat.size, 1)))
+
+    def step(self, u, rhs_func, t, dt, out=None):
+        f, ws = self._prepare(u, rhs_func)
+        k = ws["k"]
+        if self._continues(u, t):
+            k[0], k[-1] = k[-1], k[0]
+        else:
+            f(u, t, out=k[0])
+            self.nfev += 1
+            profiler.count("rhs_evals")
+
+        dt = min(dt, self.dt_max)
+        rejected = 0
+        while True:
+            err = self._attempt(f, u, t, dt, ws)
+            if err <= 1.0:  # NaN/inf compare False and are rejected
+                break
+            self.n_reject += 1
+            rejected += 1
+            if rejected > self.max_rejects or dt <= self.dt_min:
+                raise RuntimeError(f"Step size control failed at t={t:.6g} (dt={dt:.3g}, error norm={err:.3g})")
+            factor = self.safety * err ** (-1.0 / self.order) if np.isfinite(err) else self.fac_min
+            dt = max(dt * min(1.0, max(self.fac_min, factor)), self.dt_min)
+
+        self.n_accept += 1
+        self.dt_last = dt
+        err = max(err, 1e-10)
+        factor = self.safety * err ** (-self.beta_i) * self._err_prev ** self.beta_p
+        factor = min(self.fac_max if rejected == 0 else 1.0, max(self.fac_min, factor))
+        self.dt_next = min(dt * factor, self.dt_max)
+        self._err_prev = err
+
+        if out is None:
+            out = np.empty_like(u)
+        np.copyto(out, ws["new"])
+        if self.fsal:
+            self._fsal_from = (id(out), t + dt, dt)
+        return out
+
+
+class DormandPrince45(EmbeddedRKStepper):
+    """Dormand-Prince 5(4) pair (as in MATLAB ode45 / scipy RK45)."""
+    order = 5
+    c = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+    a = (
+        (1 / 5,),
+        (3 / 40, 9 / 40),
+        (44 / 45, -56 / 15, 32 / 9),
+        (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+        (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+        (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+    )
+    b = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0)
+    b_hat = (5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40)
+
+
+class BogackiShampine23(EmbeddedRKStepper):
+    """Bogacki-Shampine 3(2) pair (as in MATLAB ode23 / scipy RK23)."""
+    order = 3
+    c = (0.0, 1 / 2, 3 / 4, 1.0)
+    a = (
+        (1 / 2,),
+        (0.0, 3 / 4),
+        (2 / 9, 1 / 3, 4 / 9),
+    )
+    b = (2 / 9, 1 / 3, 4 / 9, 0.0)
+    b_hat = (7 / 24, 1 / 4, 1 / 3, 1 / 8)
@@ -4,14 +4,27 @@ def make_gradient_2d(Nx, Ny, dx, dy):
     """
     Returns a function that computes the gradient of a flattened u field
     using central differences and periodic boundaries.
+
+    The differences are taken between shifted slices written straight into
+    the output arrays, avoiding the temporary copies of np.roll.
+    See numerics.spectral.make_spectral_gradient_2d for the FFT variant.
     """
     def gradient(u_flat):
-        u = u_flat.reshape(Nx, Ny)
+        u = np.asarray(u_flat).reshape(Nx, Ny)
+        dudx = np.empty_like(u)
+        dudy = np.empty_like(u)
 
         # Central difference (periodic BCs)
-        dudx = (np.roll(u, -1, axis=0) - np.roll(u, 1, axis=0)) / (2 * dx)
-        dudy = (np.roll(u, -1, axis=1) - np.roll(u, 1, axis=1)) / (2 * dy)
+        np.subtract(u[2:], u[:-2], out=dudx[1:-1])
+        np.subtract(u[1:2], u[-1:], out=dudx[:1])
+        np.subtract(u[:1], u[-2:-1], out=dudx[-1:])
+        dudx *= 1.0 / (2 * dx)
+
+        np.subtract(u[:, 2:], u[:, :-2], out=dudy[:, 1:-1])
+        np.subtract(u[:, 1:2], u[:, -1:], out=dudy[:, :1])
+        np.subtract(u[:, :1], u[:, -2:-1], out=dudy[:, -1:])
+        dudy *= 1.0 / (2 * dy)
 
-        return dudx.flatten()[:, None], dudy.flatten()[:, None]
+        return dudx.reshape(-1, 1), dudy.reshape(-1, 1)
 
-    return gradient
\ No newline at end of file
+    return gradient
@@ -0,0 +1,169 @@
+"""
+kernels.py
+----------
+Optional compiled-kernel tier for right-hand sides on periodic grids.
+
+With numba installed, the Laplacian, the central-difference gradient and
+the nonlinearity are fused into a single loop over grid points, compiled
+with ``numba.njit(parallel=True)`` and parallelized over grid rows with
+``prange`` (no temporaries, one pass over memory). Without numba the same
+right-hand sides are assembled from the NumPy building blocks
+(StencilLaplacian, make_gradient_2d and the rhs_examples builders).
+
+Supported right-hand sides (periodic, second-order stencils):
+    "heat":    du/dt = α ∇²u                      (1D, 2D)
+    "nlse":    du/dt = α ∇²u + β |u|² u           (1D, 2D; real or complex u)
+    "burgers": du/dt = ν ∇²u - u (∂₀u + ∂₁u)      (2D)
+
+Fields are flattened C-ordered arrays of ``grid_shape`` (for 2D, axis 0 is
+the "x" axis of make_gradient_2d), optionally with a trailing ensemble axis.
+"""
+
+import warnings
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pure NumPy fallback
+    numba = None
+
+HAVE_NUMBA = numba is not None
+KERNEL_BACKENDS = ("numpy", "numba", "auto")
+KERNEL_PDES = ("heat", "nlse", "burgers")
+
+
+def resolve_kernel_backend(name="numpy"):
+    """
+    Map a configured kernel backend to the one that will actually run:
+    "auto" picks numba when installed, and "numba" falls back to "numpy"
+    (with a warning) when it is not.
+    """
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend: {name!r} (expected one of {KERNEL_BACKENDS})")
+    if name == "auto":
+        return "numba" if HAVE_NUMBA else "numpy"
+    if name == "numba" and not HAVE_NUMBA:
+        warnings.warn("numba is not installed; using the NumPy kernels", RuntimeWarning, stacklevel=2)
+        return "numpy"
+    return name
+
+
+def set_kernel_threads(n_threads):
+    """Limit the threads used by parallel numba kernels (no-op without numba)."""
+    if HAVE_NUMBA and n_threads:
+        numba.set_num_threads(min(int(n_threads), numba.config.NUMBA_NUM_THREADS))
+
+
+if HAVE_NUMBA:
+    _jit = numba.njit(parallel=True, cache=True)
+
+    @_jit
+    def _fused_1d(u, a, b, c0, out):
+        """out = a ∇²u + b |u|² u on a periodic 1D grid (c0 = 1/h²)."""
+        n = u.shape[0]
+        for i in numba.prange(n):
+            im = i - 1 if i > 0 else n - 1
+            ip = i + 1 if i < n - 1 else 0
+            v = u[i]
+            out[i] = a * c0 * (u[im] + u[ip] - 2.0 * v) + b * (v.conjugate() * v) * v
+
+    @_jit
+    def _fused_2d(u, a, b, c0, c1, out):
+        """out = a ∇²u + b |u|² u on a periodic 2D grid (c = 1/h² per axis)."""
+        n0, n1 = u.shape
+        for i in numba.prange(n0):
+            im = i - 1 if i > 0 else n0 - 1
+            ip = i + 1 if i < n0 - 1 else 0
+            for j in range(n1):
+                jm = j - 1 if j > 0 else n1 - 1
+                jp = j + 1 if j < n1 - 1 else 0
+                v = u[i, j]
+                lap = c0 * (u[im, j] + u[ip, j] - 2.0 * v) + c1 * (u[i, jm] + u[i, jp] - 2.0 * v)
+                out[i, j] = a * lap + b * (v.conjugate() * v) * v
+
+    @_jit
+    def _burgers_2d(u, nu, c0, c1, g0, g1, out):
+        """out = ν ∇²u - u (∂₀u + ∂₁u) with central differences (g = 1/(2h) per axis)."""
+        n0, n1 = u.shape
+        for i in numba.prange(n0):
+            im = i - 1 if i > 0 else n0 - 1
+            ip = i + 1 if i < n0 - 1 else 0
+            for j in range(n1):
+                jm = j - 1 if j > 0 else n1 - 1
+                jp = j + 1 if j < n1 - 1 else 0
+                v = u[i, j]
+                lap = c0 * (u[im, j] + u[ip, j] - 2.0 * v) + c1 * (u[i, jm] + u[i, jp] - 2.0 * v)
+                adv = g0 * (u[ip, j] - u[im, j]) + g1 * (u[i, jp] - u[i, jm])
+                out[i, j] = nu * lap - v * adv
+
+
+def _numba_rhs(pde, grid_shape, spacing, coeff, beta=0.0):
+    """rhs(u, t, out=None) calling the fused kernel once per ensemble member."""
+    inv_h2 = tuple(1.0 / h**2 for h in spacing)
+    inv_2h = tuple(0.5 / h for h in spacing)
+    ndim = len(grid_shape)
+    if pde == "burgers":
+        kernel = lambda v, c, o: _burgers_2d(v, c, inv_h2[0], inv_h2[1], inv_2h[0], inv_2h[1], o)
+    elif ndim == 1:
+        kernel = lambda v, c, o: _fused_1d(v, c, beta, inv_h2[0], o)
+    else:
+        kernel = lambda v, c, o: _fused_2d(v, c, beta, inv_h2[0], inv_h2[1], o)
+
+    def rhs(u_flat, t, out=None):
+        u_flat = np.asarray(u_flat)
+        if out is None:
+            out = np.empty(u_flat.shape, dtype=np.result_type(u_flat, 0.0))
+        v = u_flat.reshape(grid_shape + u_flat.shape[1:])
+        o = out.reshape(v.shape)
+        if v.ndim == ndim:
+            kernel(v, coeff, o)
+        else:
+            coeffs = np.broadcast_to(coeff, v.shape[ndim:])
+            for k in np.ndindex(*v.shape[ndim:]):
+                kernel(v[(Ellipsis,) + k], float(coeffs[k]), o[(Ellipsis,) + k])
+        return out
+
+    return rhs
+
+
+def _numpy_rhs(pde, grid_shape, spacing, coeff, beta=0.0):
+    from src.core.rhs_examples import make_burgers_rhs, make_linear_rhs, make_nlse_rhs
+    from src.numerics.gradient_2d import make_gradient_2d
+    from src.numerics.stencil_laplacian import StencilLaplacian
+
+    L_op = StencilLaplacian(grid_shape, spacing)
+    if pde == "heat":
+        return make_linear_rhs(L_op, alpha=coeff)
+    if pde == "nlse":
+        return make_nlse_rhs(L_op, alpha=coeff, beta=beta)
+    return make_burgers_rhs(L_op, make_gradient_2d(*grid_shape, *spacing), nu=coeff)
+
+
+def make_kernel_rhs(pde, grid_shape, spacing, backend="numpy", alpha=1.0, beta=1.0, nu=0.1):
+    """
+    Build rhs(u, t, out=None) for one of KERNEL_PDES.
+
+    Args:
+        pde (str): "heat", "nlse" or "burgers".
+        grid_shape (tuple): (N,) or (N0, N1).
+        spacing (tuple): Grid spacing per axis.
+        backend (str): "numpy", "numba" or "auto" (see resolve_kernel_backend).
+        alpha (float or np.ndarray): Diffusion coefficient (heat, nlse); may be per member.
+        beta (float): Nonlinear coefficient (nlse).
+        nu (float or np.ndarray): Viscosity (burgers); may be per member.
+    Returns:
+        callable: rhs(u, t, out=None)
+    """
+    if pde not in KERNEL_PDES:
+        raise ValueError(f"Unknown kernel PDE: {pde!r} (expected one of {KERNEL_PDES})")
+    grid_shape = tuple(int(n) for n in grid_shape)
+    spacing = tuple(float(h) for h in spacing)
+    if pde == "burgers" and len(grid_shape) != 2:
+        raise ValueError("The Burgers kernel is two-dimensional")
+    if len(grid_shape) not in (1, 2):
+        raise ValueError(f"Unsupported dimension: {len(grid_shape)}")
+    coeff = nu if pde == "burgers" else alpha
+    beta = beta if pde == "nlse" else 0.0
+    build = _numba_rhs if resolve_kernel_backend(backend) == "numba" else _numpy_rhs
+    return build(pde, grid_shape, spacing, coeff, beta)
@@ -1,10 +1,17 @@
 import numpy as np
-import scipy.sparse as sp
-
-def make_laplacian_1d(N, dx):
-    lap = sp.lil_matrix((N, N))
-    for i in range(N):
-        lap[i, i] = -2.0
-        lap[i, (i - 1) % N] = 1.0
-        lap[i, (i + 1) % N] = 1.0
-    return lap.tocsr() / dx**2
+
+from src.numerics.laplacian_nd import laplacian_matrix
+
+
+def make_laplacian_1d(N, dx, bc="periodic", order=2, dtype=np.float64):
+    """
+    1D Laplacian of shape (N, N) as a cached CSR matrix.
+
+    Args:
+        N (int): Number of grid points.
+        dx (float): Grid spacing.
+        bc (str): "periodic", "dirichlet" or "neumann".
+        order (int): Stencil accuracy order (2, 4 or 6).
+        dtype: Value type of the matrix.
+    """
+    return laplacian_matrix((N,), (dx,), bc=bc, order=order, dtype=dtype)
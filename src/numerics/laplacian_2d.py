@@ -1,35 +1,16 @@
 import numpy as np
-import scipy.sparse as sp
 
-def make_laplacian_2d(Nx, Ny, dx, dy):
+from src.numerics.laplacian_nd import laplacian_matrix
+
+
+def make_laplacian_2d(Nx, Ny, dx, dy, bc="periodic", order=2, dtype=np.float64):
     """
-    Construct the 2D Laplacian using Kronecker sums with periodic boundary conditions.
+    Construct the 2D Laplacian as the Kronecker sum kron(Iy, Dx) + kron(Dy, Ix).
+
+    The flattened field is indexed with x fastest, i.e. it is an (Ny, Nx)
+    array in C order. The matrix is cached and shared between calls.
 
     Returns:
         L (csr_matrix): Sparse Laplacian matrix of shape (Nx*Ny, Nx*Ny)
     """
-    Ix = sp.eye(Nx, format="csr")
-    Iy = sp.eye(Ny, format="csr")
-
-    # Use LIL for safe element assignment
-    Dx = sp.lil_matrix((Nx, Nx))
-    for i in range(Nx):
-        Dx[i, i] = -2.0
-        Dx[i, (i + 1) % Nx] = 1.0
-        Dx[i, (i - 1) % Nx] = 1.0
-    Dx /= dx**2
-
-    Dy = sp.lil_matrix((Ny, Ny))
-    for j in range(Ny):
-        Dy[j, j] = -2.0
-        Dy[j, (j + 1) % Ny] = 1.0
-        Dy[j, (j - 1) % Ny] = 1.0
-    Dy /= dy**2
-
-    # Convert to CSR for efficient use
-    Dx = Dx.tocsr()
-    Dy = Dy.tocsr()
-
-    # Kronecker sum
-    L = sp.kron(Iy, Dx, format="csr") + sp.kron(Dy, Ix, format="csr")
-    return L
\ No newline at end of file
+    return laplacian_matrix((Ny, Nx), (dy, dx), bc=bc, order=order, dtype=dtype)
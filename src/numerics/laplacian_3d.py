@@ -0,0 +1,16 @@
+import numpy as np
+
+from src.numerics.laplacian_nd import laplacian_matrix
+
+
+def make_laplacian_3d(Nx, Ny, Nz, dx, dy, dz, bc="periodic", order=2, dtype=np.float64):
+    """
+    Construct the 3D Laplacian as a Kronecker sum over the three axes.
+
+    The flattened field is indexed with x fastest, i.e. it is an
+    (Nz, Ny, Nx) array in C order. The matrix is cached and shared between calls.
+
+    Returns:
+        L (csr_matrix): Sparse Laplacian matrix of shape (Nx*Ny*Nz, Nx*Ny*Nz)
+    """
+    return laplacian_matrix((Nz, Ny, Nx), (dz, dy, dx), bc=bc, order=order, dtype=dtype)
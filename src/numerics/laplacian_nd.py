@@ -0,0 +1,143 @@
+"""
+laplacian_nd.py
+---------------
+Vectorized construction of finite-difference Laplacians on 1D/2D/3D grids.
+
+The 1D second-derivative matrix is assembled in one shot from COO triplets
+(no per-element Python loops) and higher dimensions are formed as Kronecker
+sums. Results are memoised in an LRU cache keyed on
+(shape, spacing, bc, order, dtype), so repeated runs on the same grid reuse the
+same CSR matrix. Cached matrices are shared: treat them as read-only.
+
+Boundary conditions:
+    "periodic":  N points on [-L/2, L/2), wrapping around.
+    "dirichlet": homogeneous u = 0; the N unknowns are interior nodes and
+                 the boundary nodes -1 and N are eliminated (odd reflection).
+    "neumann":   zero flux; nodes 0 and N-1 lie on the boundary and ghost
+                 values are mirrored about them (even reflection).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import scipy.sparse as sp
+
+BOUNDARY_CONDITIONS = ("periodic", "dirichlet", "neumann")
+
+# Central-difference weights for d²/dx² (times h²) by order of accuracy.
+SECOND_DERIVATIVE_COEFFS = {
+    2: (1.0, -2.0, 1.0),
+    4: (-1.0 / 12, 4.0 / 3, -5.0 / 2, 4.0 / 3, -1.0 / 12),
+    6: (1.0 / 90, -3.0 / 20, 3.0 / 2, -49.0 / 18, 3.0 / 2, -3.0 / 20, 1.0 / 90),
+}
+
+LAPLACIAN_CACHE_SIZE = 32
+
+
+def second_derivative_1d(N, h, bc="periodic", order=2):
+    """
+    Sparse 1D second-derivative matrix of shape (N, N).
+
+    Args:
+        N (int): Number of unknowns.
+        h (float): Grid spacing.
+        bc (str): One of BOUNDARY_CONDITIONS.
+        order (int): Accuracy order, one of 2, 4, 6.
+    Returns:
+        csr_matrix: The (N, N) operator.
+    """
+    if bc not in BOUNDARY_CONDITIONS:
+        raise ValueError(f"Unknown boundary condition: {bc!r} (expected one of {BOUNDARY_CONDITIONS})")
+    if order not in SECOND_DERIVATIVE_COEFFS:
+        raise ValueError(f"Unsupported stencil order: {order} (expected one of {tuple(SECOND_DERIVATIVE_COEFFS)})")
+
+    coeffs = np.asarray(SECOND_DERIVATIVE_COEFFS[order])
+    half = len(coeffs) // 2
+    if bc != "periodic" and N <= half:
+        raise ValueError(f"{bc} order-{order} stencil needs more than {half} points, got N={N}")
+
+    offsets = np.arange(-half, half + 1)
+    rows = np.repeat(np.arange(N), len(offsets))
+    cols = (np.arange(N)[:, None] + offsets).ravel()
+    vals = np.tile(coeffs, N)
+
+    if bc == "periodic":
+        cols %= N
+    else:
+        low, high = cols < 0, cols > N - 1
+        if bc == "dirichlet":
+            # u_{-1} = u_N = 0 and u_{-1-m} = -u_{-1+m}, u_{N+m} = -u_{N-m}
+            keep = (cols != -1) & (cols != N)
+            cols = np.where(low, -2 - cols, np.where(high, 2 * N - cols, cols))
+            vals = np.where(low | high, -vals, vals)
+            rows, cols, vals = rows[keep], cols[keep], vals[keep]
+        else:
+            # u_{-m} = u_m and u_{N-1+m} = u_{N-1-m}
+            cols = np.where(low, -cols, np.where(high, 2 * (N - 1) - cols, cols))
+
+    # Duplicate (row, col) pairs from wrapping/reflection are summed by tocsr().
+    return sp.coo_matrix((vals / h**2, (rows, cols)), shape=(N, N)).tocsr()
+
+
+@lru_cache(maxsize=LAPLACIAN_CACHE_SIZE)
+def _cached_laplacian(shape, spacing, bc, order, dtype):
+    L = None
+    for axis, (n, h) in enumerate(zip(shape, spacing)):
+        D = second_derivative_1d(n, h, bc=bc, order=order)
+        before = int(np.prod(shape[:axis], dtype=np.int64))
+        after = int(np.prod(shape[axis + 1:], dtype=np.int64))
+        term = D
+        if after > 1:
+            term = sp.kron(term, sp.eye(after, format="csr"), format="csr")
+        if before > 1:
+            term = sp.kron(sp.eye(before, format="csr"), term, format="csr")
+        L = term if L is None else L + term
+    # Assembled in float64; single precision only rounds the final weights.
+    return L.tocsr().astype(dtype, copy=False)
+
+
+def laplacian_matrix(shape, spacing, bc="periodic", order=2, dtype=np.float64):
+    """
+    Laplacian on a C-ordered grid of the given ``shape`` (last axis fastest).
+
+    Args:
+        shape (tuple[int]): Grid points per axis.
+        spacing (tuple[float]): Grid spacing per axis.
+        bc (str): Boundary condition applied on every axis.
+        order (int): Stencil accuracy order (2, 4 or 6).
+        dtype: Value type of the matrix (float64 or float32).
+    Returns:
+        csr_matrix: Cached operator of shape (prod(shape), prod(shape)).
+    """
+    shape = tuple(int(n) for n in shape)
+    spacing = tuple(float(h) for h in spacing)
+    if len(shape) != len(spacing):
+        raise ValueError(f"Expected {len(shape)} grid spacings, got {len(spacing)}")
+    return _cached_laplacian(shape, spacing, str(bc), int(order), np.dtype(dtype).str)
+
+
+def clear_laplacian_cache():
+    """Drop all cached Laplacian matrices."""
+    _cached_laplacian.cache_clear()
+
+
+def laplacian_cache_info():
+    """Hit/miss statistics of the Laplacian cache."""
+    return _cached_laplacian.cache_info()
+
+
+def grid_coordinates(N, L, bc="periodic"):
+    """
+    Node coordinates and spacing on [-L/2, L/2] matching the conventions
+    of second_derivative_1d for the given boundary condition.
+
+    Returns:
+        (np.ndarray, float): Coordinates of the N unknowns and the spacing.
+    """
+    if bc == "periodic":
+        return np.linspace(-L / 2, L / 2, N, endpoint=False), L / N
+    if bc == "dirichlet":
+        return np.linspace(-L / 2, L / 2, N + 2)[1:-1], L / (N + 1)
+    if bc == "neumann":
+        return np.linspace(-L / 2, L / 2, N), L / (N - 1)
+    raise ValueError(f"Unknown boundary condition: {bc!r} (expected one of {BOUNDARY_CONDITIONS})")
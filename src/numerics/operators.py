@@ -0,0 +1,89 @@
+"""
+operators.py
+------------
+Backend selection for the Laplacian operator and a helper to apply any
+supported operator into a preallocated buffer.
+
+Backends:
+    "sparse":  assembled scipy CSR matrix (make_laplacian_1d/2d/3d)
+    "stencil": matrix-free slice-based stencil (StencilLaplacian)
+    "spectral": FFT pseudo-spectral operator (SpectralLaplacian), periodic only
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.numerics.laplacian_1d import make_laplacian_1d
+from src.numerics.laplacian_2d import make_laplacian_2d
+from src.numerics.laplacian_3d import make_laplacian_3d
+from src.numerics.spectral import make_spectral_laplacian_1d, make_spectral_laplacian_2d
+from src.numerics.stencil_laplacian import make_stencil_laplacian_1d, make_stencil_laplacian_2d
+from src.utils.profiling import profiler
+
+BACKENDS = ("sparse", "stencil", "spectral")
+
+
+def make_laplacian(dim, N, dx, dy=None, backend="sparse", bc="periodic", order=2, dtype=np.float64):
+    """
+    Build the Laplacian for a 1D grid of N points or a square 2D/3D grid
+    of N points per axis using the requested backend.
+
+    The stencil backend only provides the periodic second-order operator;
+    the spectral backend is periodic and spectrally accurate (``order`` is ignored).
+    ``dtype`` (float64 or float32) is the precision the operator computes in.
+    """
+    dy = dx if dy is None else dy
+    if backend == "sparse":
+        if dim == 1:
+            return make_laplacian_1d(N, dx, bc=bc, order=order, dtype=dtype)
+        if dim == 2:
+            return make_laplacian_2d(N, N, dx, dy, bc=bc, order=order, dtype=dtype)
+        if dim == 3:
+            return make_laplacian_3d(N, N, N, dx, dy, dx, bc=bc, order=order, dtype=dtype)
+    elif backend == "stencil":
+        if bc != "periodic" or order != 2:
+            raise ValueError(f"The stencil backend supports periodic order-2 operators only (got bc={bc!r}, order={order})")
+        if dim == 1:
+            return make_stencil_laplacian_1d(N, dx, dtype=dtype)
+        if dim == 2:
+            return make_stencil_laplacian_2d(N, N, dx, dy, dtype=dtype)
+    elif backend == "spectral":
+        if bc != "periodic":
+            raise ValueError(f"The spectral backend requires periodic boundaries (got bc={bc!r})")
+        if dim == 1:
+            return make_spectral_laplacian_1d(N, dx, dtype=dtype)
+        if dim == 2:
+            return make_spectral_laplacian_2d(N, N, dx, dy, dtype=dtype)
+    else:
+        raise ValueError(f"Unknown numerics backend: {backend!r} (expected one of {BACKENDS})")
+    raise ValueError(f"Unsupported dimension: {dim}")
+
+
+def apply_operator(L_op, u, out=None):
+    """
+    Compute ``L_op @ u``, writing into ``out`` when provided.
+
+    Matrix-free operators fill ``out`` directly; for scipy sparse matrices
+    the product is computed and then copied into ``out``.
+    """
+    profiler.count("matvecs")
+    if out is None:
+        return L_op @ u
+    apply = getattr(L_op, "apply", None)
+    if apply is not None:
+        return apply(u, out=out)
+    out[...] = L_op @ u
+    return out
+
+
+def spectral_radius_bound(L_op):
+    """
+    Upper bound on the spectral radius of ``L_op`` (Gershgorin / max row sum),
+    used for explicit time-step stability checks.
+    """
+    if sp.issparse(L_op):
+        return float(abs(L_op).sum(axis=1).max())
+    spectral_radius = getattr(L_op, "spectral_radius", None)
+    if spectral_radius is not None:
+        return float(spectral_radius())
+    raise TypeError(f"Cannot bound the spectrum of operator of type {type(L_op).__name__}")
@@ -0,0 +1,55 @@
+"""
+precision.py
+------------
+Working precision of a run (``numerics.dtype``).
+
+Single precision halves the memory traffic of every operator application
+and RK stage at the cost of ~7 significant digits. The precision names the
+real type; complex problems (e.g. the Schrödinger form of the NLSE) use the
+complex type of the same width. Reductions that must not lose digits over
+long runs (diagnostics such as mass and L2 norms) accumulate in float64
+regardless of the working precision.
+"""
+
+import numpy as np
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+
+def real_dtype(name="float64"):
+    """The real dtype selected by ``name`` (one of PRECISIONS, or a float dtype)."""
+    dtype = np.dtype(PRECISIONS.get(name, name) if isinstance(name, str) else name)
+    if dtype.kind == "c":
+        dtype = np.empty(0, dtype=dtype).real.dtype
+    if dtype not in (np.dtype(np.float64), np.dtype(np.float32)):
+        raise ValueError(f"Unsupported numerics.dtype: {name!r} (expected one of {tuple(PRECISIONS)})")
+    return dtype
+
+
+def complex_dtype(real):
+    """complex64 for float32, complex128 for float64."""
+    return np.result_type(real_dtype(real), np.complex64)
+
+
+def working_dtype(real, is_complex=False):
+    """Field dtype of a run at precision ``real``."""
+    return complex_dtype(real) if is_complex else real_dtype(real)
+
+
+def cast_precision(array, real):
+    """``array`` converted to precision ``real``, keeping it real or complex."""
+    array = np.asarray(array)
+    return array.astype(working_dtype(real, np.iscomplexobj(array)), copy=False)
+
+
+def flush_subnormals(u):
+    """
+    Zero the entries of ``u`` (in place) whose magnitude is below the smallest
+    normal number of its precision. Arithmetic on subnormals is many times
+    slower on common CPUs and NumPy cannot switch on flush-to-zero, so e.g.
+    the far tails of a Gaussian would otherwise make float32 runs slower than
+    float64 ones.
+    """
+    tiny = np.finfo(u.dtype).tiny
+    u[np.abs(u) < tiny] = 0
+    return u
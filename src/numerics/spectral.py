@@ -0,0 +1,171 @@
+"""
+spectral.py
+-----------
+FFT-based (pseudo-spectral) operators for periodic grids.
+
+On a periodic grid the Laplacian and gradients are diagonal in Fourier
+space, so they are applied as a forward transform, a multiplication by a
+precomputed wavenumber array, and an inverse transform. Real fields use
+``numpy.fft.rfftn``; complex fields (e.g. the NLSE) use ``fftn``.
+
+Grid layout follows the Laplacian constructors: fields are flattened
+C-ordered arrays of ``grid_shape`` with optional trailing (batch) axes.
+"""
+
+import numpy as np
+
+
+def wavenumbers(n, h, real=False):
+    """Angular wavenumbers 2π k / (n h) in FFT (or rFFT) order."""
+    freq = np.fft.rfftfreq(n, d=h) if real else np.fft.fftfreq(n, d=h)
+    return 2.0 * np.pi * freq
+
+
+class SpectralLaplacian:
+    """
+    Spectral Laplacian on a periodic grid, symbol -|k|².
+
+    Acts like the other Laplacian operators (``shape``, ``@``, ``dot``,
+    ``apply(u, out=...)``) and additionally provides the exact heat
+    propagator ``exp_apply(u, s)`` = exp(s ∇²) u, plus ``forward``/``inverse``
+    transforms and ``symbol()`` arrays for exponential integrators.
+    """
+
+    def __init__(self, grid_shape, spacing, dtype=np.float64):
+        self.grid_shape = tuple(int(n) for n in grid_shape)
+        self.spacing = tuple(float(h) for h in spacing)
+        if len(self.spacing) != len(self.grid_shape):
+            raise ValueError(f"Expected {len(self.grid_shape)} grid spacings, got {len(self.spacing)}")
+        n = int(np.prod(self.grid_shape))
+        self.shape = (n, n)
+        self.dtype = np.dtype(dtype)
+        self.axes = tuple(range(len(self.grid_shape)))
+        self._symbols = {}
+
+    def wavenumber_grids(self, real=True):
+        """Broadcastable wavenumber arrays per axis for the (r)FFT layout."""
+        ndim = len(self.grid_shape)
+        grids = []
+        for axis, (n, h) in enumerate(zip(self.grid_shape, self.spacing)):
+            k = wavenumbers(n, h, real=real and axis == ndim - 1)
+            shape = [1] * ndim
+            shape[axis] = k.size
+            grids.append(k.reshape(shape))
+        return grids
+
+    def symbol(self, real=True):
+        """Fourier multiplier -|k|² (cached) in rFFT (real=True) or FFT layout."""
+        sym = self._symbols.get(real)
+        if sym is None:
+            sym = -sum(k**2 for k in self.wavenumber_grids(real=real)).astype(self.dtype)
+            self._symbols[real] = sym
+        return sym
+
+    def spectral_radius(self):
+        return float(np.max(np.abs(self.symbol(real=True))))
+
+    def _grid_view(self, u):
+        u = np.asarray(u)
+        if u.shape[0] != self.shape[0]:
+            raise ValueError(f"Operator of shape {self.shape} cannot act on array of shape {u.shape}")
+        return u.reshape(self.grid_shape + u.shape[1:])
+
+    def broadcast(self, mult, extra_dims):
+        """Append ``extra_dims`` singleton axes so ``mult`` broadcasts over batch axes."""
+        return mult.reshape(mult.shape + (1,) * extra_dims)
+
+    def forward(self, u):
+        """Transform a flattened field; returns (coefficients, is_real)."""
+        v = self._grid_view(u)
+        if np.iscomplexobj(v):
+            return np.fft.fftn(v, axes=self.axes), False
+        return np.fft.rfftn(v, axes=self.axes), True
+
+    def inverse(self, coeffs, real, trailing=(), out=None):
+        """Inverse of ``forward``, flattened back to ``(n,) + trailing``."""
+        if real:
+            v = np.fft.irfftn(coeffs, s=self.grid_shape, axes=self.axes)
+        else:
+            v = np.fft.ifftn(coeffs, axes=self.axes)
+        v = v.reshape((self.shape[0],) + tuple(trailing))
+        if out is None:
+            return v
+        out[...] = v
+        return out
+
+    def multiply(self, u, mult_real, mult_complex=None, out=None):
+        """Apply a Fourier multiplier given for the rFFT (and FFT) layouts."""
+        u = np.asarray(u)
+        coeffs, real = self.forward(u)
+        mult = mult_real if real else mult_complex
+        coeffs *= self.broadcast(mult, u.ndim - 1)
+        return self.inverse(coeffs, real, u.shape[1:], out=out)
+
+    def apply(self, u, out=None):
+        return self.multiply(u, self.symbol(True), self.symbol(False), out=out)
+
+    def __matmul__(self, u):
+        return self.apply(u)
+
+    def dot(self, u):
+        return self.apply(u)
+
+    def exp_apply(self, u, s, out=None):
+        """
+        Exact action of exp(s ∇²) on ``u``; for the heat equation
+        u(t) = exp_apply(u0, alpha * t). ``s`` may also be a vector with one
+        entry per trailing batch member, and complex for complex ``u``
+        (Schrödinger-type propagation).
+        """
+        u = np.asarray(u)
+        coeffs, real = self.forward(u)
+        sym = self.broadcast(self.symbol(real), u.ndim - 1)
+        coeffs *= np.exp(sym * np.asarray(s, dtype=np.result_type(s, float)))
+        return self.inverse(coeffs, real, u.shape[1:], out=out)
+
+
+def make_spectral_laplacian_1d(N, dx, dtype=np.float64):
+    """Spectral counterpart of make_laplacian_1d(N, dx) (periodic only)."""
+    return SpectralLaplacian((N,), (dx,), dtype=dtype)
+
+
+def make_spectral_laplacian_2d(Nx, Ny, dx, dy, dtype=np.float64):
+    """
+    Spectral counterpart of make_laplacian_2d(Nx, Ny, dx, dy); the field is
+    an (Ny, Nx) C-ordered array, as for the Kronecker-sum matrix.
+    """
+    return SpectralLaplacian((Ny, Nx), (dy, dx), dtype=dtype)
+
+
+def make_spectral_gradient_2d(Nx, Ny, dx, dy):
+    """
+    Spectral drop-in for make_gradient_2d: returns a function mapping a
+    flattened field (viewed as (Nx, Ny), axis 0 = x) to the column vectors
+    (∂u/∂x, ∂u/∂y). Uses one forward and two inverse real FFTs; the Nyquist
+    mode of odd derivatives is zeroed.
+    """
+    def derivative_symbols(real):
+        kx = wavenumbers(Nx, dx)[:, None]
+        ky = wavenumbers(Ny, dy, real=real)[None, :]
+        if Nx % 2 == 0:
+            kx[Nx // 2] = 0.0
+        if Ny % 2 == 0:
+            ky[0, -1 if real else Ny // 2] = 0.0
+        return 1j * kx, 1j * ky
+
+    ikx_r, iky_r = derivative_symbols(real=True)
+    ikx_c, iky_c = derivative_symbols(real=False)
+
+    def gradient(u_flat):
+        u = np.asarray(u_flat).reshape(Nx, Ny)
+        if np.iscomplexobj(u):
+            uh = np.fft.fft2(u)
+            dudx = np.fft.ifft2(uh * ikx_c)
+            dudy = np.fft.ifft2(uh * iky_c)
+        else:
+            uh = np.fft.rfft2(u)
+            dudx = np.fft.irfft2(uh * ikx_r, s=(Nx, Ny))
+            dudy = np.fft.irfft2(uh * iky_r, s=(Nx, Ny))
+        return dudx.reshape(-1, 1), dudy.reshape(-1, 1)
+
+    return gradient
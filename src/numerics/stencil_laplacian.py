@@ -0,0 +1,173 @@
+import numpy as np
+
+# Elements per strip processed in one go (~256 KiB of float64), so the
+# intermediate passes of a strip are served from cache.
+BLOCK_ELEMENTS = 32768
+
+
+class StencilLaplacian:
+    """
+    Matrix-free periodic Laplacian using second-order central differences
+    (3-point in 1D, 5-point in 2D) on a C-ordered grid.
+
+    Behaves like the CSR operators from make_laplacian_1d/2d: it has a
+    ``shape``, supports ``L @ u`` and ``L.dot(u)``, and accepts flattened
+    fields of length ``prod(grid_shape)`` with optional trailing axes
+    (e.g. the ``(N, 1)`` columns used in rhs_examples).
+
+    ``apply(u, out=...)`` writes into a caller-supplied buffer using only
+    slice arithmetic, so repeated calls do not allocate. The internal
+    scratch buffer makes a single instance unsafe to share between threads.
+    """
+
+    def __init__(self, grid_shape, spacing, dtype=np.float64):
+        self.grid_shape = tuple(int(n) for n in grid_shape)
+        spacing = tuple(float(h) for h in spacing)
+        if len(spacing) != len(self.grid_shape):
+            raise ValueError(f"Expected {len(self.grid_shape)} grid spacings, got {len(spacing)}")
+        if min(self.grid_shape) < 3:
+            raise ValueError(f"Periodic stencil needs at least 3 points per axis, got {self.grid_shape}")
+        self.spacing = spacing
+        self.inv_h2 = tuple(1.0 / h**2 for h in spacing)
+        n = int(np.prod(self.grid_shape))
+        self.shape = (n, n)
+        self.dtype = np.dtype(dtype)
+        self._scratch = None
+
+    def spectral_radius(self):
+        """Largest |eigenvalue|, reached by the checkerboard mode."""
+        return 4.0 * sum(self.inv_h2)
+
+    def __matmul__(self, u):
+        return self.apply(u)
+
+    def dot(self, u):
+        return self.apply(u)
+
+    def apply(self, u, out=None):
+        """
+        Apply the Laplacian to ``u``. If ``out`` is given it must have the
+        shape of ``u``, be C-contiguous, and must not alias ``u``.
+        """
+        u = np.asarray(u)
+        if u.shape[0] != self.shape[0]:
+            raise ValueError(f"Operator of shape {self.shape} cannot act on array of shape {u.shape}")
+        if out is None:
+            out = np.empty(u.shape, dtype=np.result_type(u.dtype, self.dtype))
+        elif out.shape != u.shape or not out.flags.c_contiguous:
+            raise ValueError("out must be a C-contiguous array with the same shape as u")
+        v = u.reshape(self.grid_shape + u.shape[1:])
+        o = out.reshape(v.shape)
+
+        self._apply_rows(v, o, 0, self.grid_shape[0])
+        return out
+
+    def apply_rows(self, u, out, start, stop):
+        """
+        Fill ``out`` with rows [start, stop) (along grid axis 0) of the
+        Laplacian of ``u``, reading the rows start-1 and stop as periodic
+        halos. ``u`` is a full field (flattened or of ``grid_shape``), ``out``
+        holds only the requested rows. Each row is computed exactly as in
+        ``apply``, so tiles assembled from several calls match it bit for bit.
+        """
+        u = np.asarray(u)
+        v = u.reshape(self.grid_shape + u.shape[1:]) if u.shape[0] == self.shape[0] else u
+        self._apply_rows(v, out.reshape((stop - start,) + v.shape[1:]), start, stop)
+        return out
+
+    def _apply_rows(self, v, o, start, stop):
+        # Strip-mine along axis 0 so the several passes per block stay in cache.
+        row_size = max(1, v[0].size)
+        rows = max(2, min(self.grid_shape[0], BLOCK_ELEMENTS // row_size))
+        for a in range(start, stop, rows):
+            b = min(a + rows, stop)
+            self._apply_block(v, o[a - start:b - start], a, b)
+
+    def _apply_block(self, v, ob, a, b):
+        """
+        Fill ``ob`` (rows [a, b) of the output) with the Laplacian of ``v``.
+
+        Neighbour sums are accumulated unscaled (relative to axis 0) and the
+        centre term and 1/h^2 factor are applied once at the end, which keeps
+        the number of passes over the strip small.
+        """
+        n0 = v.shape[0]
+        vb = v[a:b]
+        c0 = self.inv_h2[0]
+
+        # Axis 0: neighbours of rows a..b-1, wrapping periodically.
+        row = lambda i: v[i % n0:i % n0 + 1]
+        np.add(row(a - 1), row(a + 1), out=ob[:1])
+        if b - a > 1:
+            np.add(row(b - 2), row(b), out=ob[-1:])
+        if b - a > 2:
+            np.add(v[a:b - 2], v[a + 2:b], out=ob[1:-1])
+
+        sb = self._get_scratch(ob)[:b - a] if len(self.grid_shape) > 1 else None
+        for axis in range(1, len(self.grid_shape)):
+            ratio = self.inv_h2[axis] / c0
+            if ratio == 1.0:
+                self._add_neighbours(vb, ob, axis)
+            else:
+                sb[...] = 0.0
+                self._add_neighbours(vb, sb, axis)
+                sb *= ratio
+                ob += sb
+
+        centre = 2.0 * sum(self.inv_h2) / c0
+        if centre == 2.0:
+            ob -= vb
+            ob -= vb
+        else:
+            np.multiply(vb, centre, out=sb)
+            ob -= sb
+        ob *= c0
+
+    def _get_scratch(self, like):
+        if (self._scratch is None or self._scratch.shape[1:] != like.shape[1:]
+                or self._scratch.shape[0] < like.shape[0] or self._scratch.dtype != like.dtype):
+            self._scratch = np.empty(like.shape, dtype=like.dtype)
+        return self._scratch
+
+    @staticmethod
+    def _add_neighbours(v, o, axis):
+        """o += v[i-1] + v[i+1] along ``axis`` with periodic wrap."""
+        def sl(start, stop):
+            index = [slice(None)] * v.ndim
+            index[axis] = slice(start, stop)
+            return tuple(index)
+
+        o[sl(1, -1)] += v[sl(None, -2)]
+        o[sl(1, -1)] += v[sl(2, None)]
+        o[sl(None, 1)] += v[sl(-1, None)]
+        o[sl(None, 1)] += v[sl(1, 2)]
+        o[sl(-1, None)] += v[sl(-2, -1)]
+        o[sl(-1, None)] += v[sl(None, 1)]
+
+    def tocsr(self):
+        """Equivalent assembled sparse matrix (for direct solvers)."""
+        from src.numerics.laplacian_1d import make_laplacian_1d
+        from src.numerics.laplacian_2d import make_laplacian_2d
+
+        if len(self.grid_shape) == 1:
+            return make_laplacian_1d(self.grid_shape[0], self.spacing[0], dtype=self.dtype)
+        if len(self.grid_shape) == 2:
+            Ny, Nx = self.grid_shape
+            dy, dx = self.spacing
+            return make_laplacian_2d(Nx, Ny, dx, dy, dtype=self.dtype)
+        raise NotImplementedError(f"No assembled form for {len(self.grid_shape)}D grids")
+
+
+def make_stencil_laplacian_1d(N, dx, dtype=np.float64):
+    """Matrix-free counterpart of make_laplacian_1d(N, dx)."""
+    return StencilLaplacian((N,), (dx,), dtype=dtype)
+
+
+def make_stencil_laplacian_2d(Nx, Ny, dx, dy, dtype=np.float64):
+    """
+    Matrix-free counterpart of make_laplacian_2d(Nx, Ny, dx, dy).
+
+    Uses the same flattening as the Kronecker-sum matrix: x is the fastest
+    varying index, i.e. the field is viewed as an (Ny, Nx) array.
+    """
+    return StencilLaplacian((Ny, Nx), (dy, dx), dtype=dtype)
@@ -1,12 +1,10 @@
-import numpy as np
+from src.core.engine import integrate
+from src.core.rhs_examples import make_linear_rhs
+from src.core.time_integrators import EulerStepper
 
-def run_heat_solver_1d(u0, laplacian, alpha, dt, steps):
-    """Run forward Euler integration for the 1D heat equation."""
-    u = u0.copy()
-    u_history = [u.copy()]
-
-    for _ in range(steps):
-        u = u + dt * alpha * laplacian @ u
-        u_history.append(u.copy())
 
-    return np.array(u_history)
\ No newline at end of file
+def run_heat_solver_1d(u0, laplacian, alpha, dt, steps, sink=None, save_every=1):
+    """Run forward Euler integration for the 1D heat equation."""
+    frames = integrate(EulerStepper(), make_linear_rhs(laplacian, alpha), u0, dt, steps,
+                       sink=sink, save_every=save_every)
+    return frames.load() if sink is None else frames
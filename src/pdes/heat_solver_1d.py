@@ -1,18 +1,18 @@
-import numpy as np
+from src.core.engine import integrate
+from src.core.rhs_examples import make_linear_rhs
+from src.core.time_integrators import EulerStepper
+from src.utils.diagnostic_manager import DiagnosticManager
 
-def run_heat_solver_1d(u0, laplacian, alpha, dt, steps):
-    u = u0.copy()
-    u_history = [u.copy()]
-    diagnostics = []
 
-    for _ in range(steps):
-        u = u + dt * alpha * laplacian @ u
-        u_history.append(u.copy())
-
-        diagnostics.append({
-            "min": np.min(u),
-            "max": np.max(u),
-            "mean": np.mean(u),
-        })
-
-    return np.array(u_history), diagnostics
\ No newline at end of file
+def run_heat_solver_1d(u0, laplacian, alpha, dt, steps, sink=None, save_every=1):
+    """
+    Forward Euler for the 1D heat equation. Every ``save_every``-th state
+    (plus u0 and the final state) is kept; pass a snapshot ``sink`` to
+    stream them to disk, in which case a lazy reader is returned instead
+    of the history array. The min/max/mean of every step are returned as
+    a list of dicts.
+    """
+    diagnostics = DiagnosticManager(dx=1.0, track=("min", "max", "mean"))
+    frames = integrate(EulerStepper(), make_linear_rhs(laplacian, alpha), u0, dt, steps,
+                       sink=sink, save_every=save_every, diagnostics=diagnostics)
+    return (frames.load() if sink is None else frames), diagnostics.records
@@ -1,24 +1,22 @@
-import numpy as np
+from src.core.engine import integrate
+from src.core.rhs_examples import make_linear_rhs
+from src.core.time_integrators import EulerStepper
+from src.utils.diagnostic_manager import DiagnosticManager
+from src.utils.snapshots import MemorySink, count_snapshots
 
-def run_heat_solver_2d(u0, laplacian, alpha, dt, steps):
+
+def run_heat_solver_2d(u0, laplacian, alpha, dt, steps, sink=None, save_every=1):
+    """
+    Forward Euler for the 2D heat equation; frames have the shape of u0.
+    Every ``save_every``-th state (plus u0 and the final state) is kept;
+    pass a snapshot ``sink`` to stream them to disk, in which case a lazy
+    reader is returned instead of the history array. The min/max/mean of
+    every step are returned as a list of dicts.
+    """
     Nx, Ny = u0.shape
     assert laplacian.shape == (Nx * Ny, Nx * Ny), "Laplacian size mismatch"
-    u = u0.flatten()
-    u_history = [u.copy()]
-    diagnostics = []
-
-    def euler_step(u, dt, laplacian, alpha):
-        return u + dt * alpha * (laplacian @ u)
-
-    for _ in range(steps):
-        u = euler_step(u, dt, laplacian, alpha)
-        u_history.append(u.copy())
-        diagnostics.append({
-            "min": float(u.min()),
-            "max": float(u.max()),
-            "mean": float(u.mean()),
-        })
-
-    u_history = np.array(u_history)            # shape (steps+1, N)
-    u_history = u_history.reshape((steps+1, Nx, Ny))
-    return u_history, diagnostics
\ No newline at end of file
+    history = MemorySink((Nx, Ny), capacity=count_snapshots(steps, save_every)) if sink is None else sink
+    diagnostics = DiagnosticManager(dx=1.0, track=("min", "max", "mean"))
+    frames = integrate(EulerStepper(), make_linear_rhs(laplacian, alpha), u0.reshape(-1), dt, steps,
+                       sink=history, save_every=save_every, diagnostics=diagnostics)
+    return (frames.load() if sink is None else frames), diagnostics.records   # frames: (n_frames, Nx, Ny)
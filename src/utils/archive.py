@@ -0,0 +1,392 @@
+"""
+archive.py
+----------
+Compact snapshot archive (``output.snapshot_format: archive``, ``.snap`` files).
+
+Snapshots are grouped into chunks of ``chunk_frames`` consecutive frames
+that are compressed independently, so reading any frame decodes a single
+chunk. Before compression a frame can be
+
+- downsampled: every ``downsample``-th point along each spatial axis;
+- reduced in precision: "float16", or "quantize8" / "quantize16" (integers
+  spanning each frame's [min, max]); "exact" keeps the values bit for bit;
+
+and every chunk is coded losslessly: each frame is XORed with the previous
+one (exact for floats; slowly changing fields leave mostly zero bits), the
+bytes are shuffled by significance and the result is compressed with zlib
+or lz4 (if installed; "auto" prefers it).
+
+File layout: a magic string followed by records ``tag | length | body``:
+"HEAD" (JSON: frame shapes, codec, grid axes, run metadata such as the
+configuration), one "CHNK" per chunk (JSON with the frame times and
+quantization ranges, then the payload), "TABL" for named tables stored
+alongside (e.g. the diagnostics columns, as npz), and on close an "INDX" of
+record offsets and a trailer pointing at it. A file without the index (an
+interrupted run) is read by walking the records.
+
+``open_archive`` returns a SnapshotReader, so archives can be passed to the
+visualization functions like any other snapshot history; ``reader.x`` holds
+the matching (downsampled) grid coordinates.
+"""
+
+import io
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from src.utils.snapshots import SnapshotReader, SnapshotSink
+
+ARCHIVE_MAGIC = b"PDESNAP1"
+END_MAGIC = b"SNAPEND1"
+PRECISIONS = ("exact", "float16", "quantize8", "quantize16")
+COMPRESSORS = ("auto", "zlib", "lz4", "none")
+_RECORD = struct.Struct("<4sQ")  # tag, body length
+_TRAILER = struct.Struct("<Q8s")  # index record offset, END_MAGIC
+
+
+def _lz4():
+    try:
+        import lz4.frame
+    except ImportError as exc:
+        raise ImportError("Archive compression 'lz4' requires the lz4 package; use compression: zlib") from exc
+    return lz4.frame
+
+
+def resolve_compressor(name="auto"):
+    """The compressor used for ``name``: "auto" is lz4 when installed, else zlib."""
+    if name not in COMPRESSORS:
+        raise ValueError(f"Unknown archive compression: {name!r} (expected one of {COMPRESSORS})")
+    if name == "auto":
+        try:
+            _lz4()
+        except ImportError:
+            return "zlib"
+        return "lz4"
+    if name == "lz4":
+        _lz4()
+    return name
+
+
+def _compress(data, compressor, level):
+    if compressor == "zlib":
+        return zlib.compress(data, level)
+    if compressor == "lz4":
+        return _lz4().compress(data)
+    return data
+
+
+def _decompress(data, compressor):
+    if compressor == "zlib":
+        return zlib.decompress(data)
+    if compressor == "lz4":
+        return _lz4().decompress(data)
+    return data
+
+
+def _real_view(frames):
+    """Complex frames as interleaved real and imaginary parts."""
+    return frames.view(frames.real.dtype) if np.iscomplexobj(frames) else frames
+
+
+def encode_chunk(frames, precision="exact", compressor="zlib", level=6):
+    """
+    Code a (k, ...) stack of frames.
+
+    Returns:
+        (bytes, dict): Payload and the per-chunk metadata needed to decode it.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown archive precision: {precision!r} (expected one of {PRECISIONS})")
+    k = frames.shape[0]
+    values = np.ascontiguousarray(_real_view(np.ascontiguousarray(frames))).reshape(k, -1)
+    meta = {}
+    if precision == "float16":
+        values = values.astype(np.float16)
+    elif precision.startswith("quantize"):
+        bits = int(precision[len("quantize"):])
+        lo, hi = values.min(axis=1, keepdims=True), values.max(axis=1, keepdims=True)
+        scale = np.where(hi > lo, (2**bits - 1) / np.where(hi > lo, hi - lo, 1.0), 0.0)
+        values = np.round((values - lo) * scale).astype(np.uint8 if bits == 8 else np.uint16)
+        meta = {"lo": lo[:, 0].tolist(), "hi": hi[:, 0].tolist()}
+    bits = values.view(np.dtype(f"u{values.itemsize}"))
+    delta = bits.copy()
+    np.bitwise_xor(bits[1:], bits[:-1], out=delta[1:])
+    shuffled = delta.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+    return _compress(shuffled, compressor, level), meta
+
+
+def decode_chunk(payload, meta, k, frame_shape, dtype, precision="exact", compressor="zlib"):
+    """Inverse of ``encode_chunk``: the (k,) + frame_shape frames in ``dtype``."""
+    dtype = np.dtype(dtype)
+    real = np.empty(0, dtype=dtype).real.dtype
+    stored = {"exact": real, "float16": np.dtype(np.float16), "quantize8": np.dtype(np.uint8),
+              "quantize16": np.dtype(np.uint16)}[precision]
+    raw = np.frombuffer(_decompress(payload, compressor), dtype=np.uint8)
+    delta = raw.reshape(stored.itemsize, -1).T.copy().view(np.dtype(f"u{stored.itemsize}")).reshape(k, -1)
+    values = np.bitwise_xor.accumulate(delta, axis=0).view(stored)
+    if precision.startswith("quantize"):
+        bits = int(precision[len("quantize"):])
+        lo, hi = np.array(meta["lo"])[:, None], np.array(meta["hi"])[:, None]
+        values = lo + values * ((hi - lo) / (2**bits - 1))
+    values = np.ascontiguousarray(values.astype(real))
+    return (values.view(dtype) if dtype.kind == "c" else values).reshape((k,) + tuple(frame_shape))
+
+
+class ArchiveSink(SnapshotSink):
+    """
+    Appends frames to a ``.snap`` archive.
+
+    Args:
+        path (str): Output path.
+        frame_shape (tuple): Shape of the frames passed to ``append``.
+        dtype: Dtype of the frames (and of the frames read back).
+        capacity (int, optional): Unused (archives grow chunk by chunk).
+        downsample (int): Keep every n-th point along each spatial axis.
+        precision (str): One of PRECISIONS.
+        compression (str): One of COMPRESSORS.
+        chunk_frames (int): Frames per independently compressed chunk.
+        level (int): zlib compression level.
+        spatial_ndim (int, optional): Leading axes that are spatial (default: all);
+            e.g. ensemble frames (N, n_members) have one.
+        coordinates (np.ndarray, optional): Grid points of each spatial axis (square grids).
+        metadata (dict, optional): JSON-serializable run information (configuration, ...).
+    """
+
+    def __init__(self, path, frame_shape, dtype=np.float64, capacity=None, downsample=1, precision="exact",
+                 compression="auto", chunk_frames=8, level=6, spatial_ndim=None, coordinates=None,
+                 metadata=None):
+        super().__init__(frame_shape, dtype)
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown archive precision: {precision!r} (expected one of {PRECISIONS})")
+        self.path = path
+        self.downsample = max(1, int(downsample))
+        self.precision = precision
+        self.compressor = resolve_compressor(compression)
+        self.chunk_frames = max(1, int(chunk_frames))
+        self.level = int(level)
+        spatial_ndim = len(self.frame_shape) if spatial_ndim is None else int(spatial_ndim)
+        self._select = (slice(None, None, self.downsample),) * spatial_ndim
+        self.stored_shape = np.empty(self.frame_shape, dtype=bool)[self._select].shape
+        self._pending = []
+        self._records = {"chunks": [], "tables": {}}
+        header = {
+            "frame_shape": list(self.stored_shape), "full_shape": list(self.frame_shape),
+            "dtype": self.dtype.str, "spatial_ndim": spatial_ndim, "downsample": self.downsample,
+            "precision": precision, "compression": self.compressor, "chunk_frames": self.chunk_frames,
+            "axes": None if coordinates is None else np.asarray(coordinates)[::self.downsample].tolist(),
+            "metadata": metadata or {},
+        }
+        self._file = open(path, "wb")
+        self._file.write(ARCHIVE_MAGIC)
+        self._write_record(b"HEAD", json.dumps(header, default=str).encode())
+
+    def append(self, u, t):
+        """Store ``u`` (a full frame, or one already downsampled, e.g. recovered on resume) at time ``t``."""
+        if self.closed:
+            raise ValueError("Cannot append to a closed snapshot sink")
+        if self.stored_shape != self.frame_shape and np.size(u) == int(np.prod(self.stored_shape)):
+            frame = np.reshape(u, self.stored_shape)
+        else:
+            frame = np.reshape(u, self.frame_shape)[self._select]
+        # Chunks are written once the next frame arrives (or on flush), when all their times are known.
+        if len(self._pending) == self.chunk_frames:
+            self._write_chunk()
+        self._pending.append(np.array(frame, dtype=self.dtype))
+        self.times.append(float(t))
+
+    def _write_chunk(self):
+        if not self._pending:
+            return
+        k = len(self._pending)
+        times = self.times[-k:]
+        payload, meta = encode_chunk(np.stack(self._pending), self.precision, self.compressor, self.level)
+        meta_bytes = json.dumps(dict(meta, n=k, times=times)).encode()
+        offset = self._write_record(b"CHNK", struct.pack("<I", len(meta_bytes)) + meta_bytes + payload)
+        self._records["chunks"].append([offset, k])
+        self._pending = []
+
+    def _write_record(self, tag, body):
+        offset = self._file.tell()
+        self._file.write(_RECORD.pack(tag, len(body)))
+        self._file.write(body)
+        return offset
+
+    def add_table(self, name, columns):
+        """Store named columns (dict of arrays, e.g. DiagnosticManager.columns()) in the archive."""
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **{key: np.asarray(value) for key, value in columns.items()})
+        name_bytes = name.encode()
+        offset = self._write_record(b"TABL", struct.pack("<I", len(name_bytes)) + name_bytes + buffer.getvalue())
+        self._records["tables"][name] = offset
+
+    def flush(self):
+        """Write the buffered frames as a (possibly short) chunk and sync the file."""
+        self._write_chunk()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _finalize(self):
+        self._write_chunk()
+        offset = self._write_record(b"INDX", json.dumps(self._records).encode())
+        self._file.write(_TRAILER.pack(offset, END_MAGIC))
+        self._file.close()
+
+    def _reader(self):
+        return open_archive(self.path)
+
+
+class ArchiveFrames:
+    """
+    Array-like view of the frames of an archive: indexing decodes only the
+    chunks holding the requested frames (the most recent chunk is cached).
+    """
+
+    def __init__(self, file, header, chunks):
+        self._file = file
+        self.header = header
+        self._chunks = chunks  # [(offset, n_frames)]
+        self._starts = np.cumsum([0] + [n for _, n in chunks])
+        self.dtype = np.dtype(header["dtype"])
+        self.frame_shape = tuple(header["frame_shape"])
+        self._cached = (None, None)
+
+    @property
+    def shape(self):
+        return (int(self._starts[-1]),) + self.frame_shape
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _chunk(self, c):
+        if self._cached[0] != c:
+            offset, k = self._chunks[c]
+            _, length = _read_record_header(self._file, offset)
+            (meta_len,) = struct.unpack("<I", self._file.read(4))
+            meta = json.loads(self._file.read(meta_len))
+            payload = self._file.read(length - 4 - meta_len)
+            frames = decode_chunk(payload, meta, k, self.frame_shape, self.dtype,
+                                  self.header["precision"], self.header["compression"])
+            self._cached = (c, frames)
+        return self._cached[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            n = len(self)
+            if index < 0:
+                index += n
+            if not 0 <= index < n:
+                raise IndexError(f"Frame index out of range (have {n} frames)")
+            c = int(np.searchsorted(self._starts, index, side="right")) - 1
+            return self._chunk(c)[index - self._starts[c]]
+        indices = np.arange(len(self))[index]
+        if np.ndim(indices) == 0:
+            return self[int(indices)]
+        out = np.empty((len(indices),) + self.frame_shape, dtype=self.dtype)
+        for i, frame_index in enumerate(indices):
+            out[i] = self[int(frame_index)]
+        return out
+
+
+def _read_record_header(f, offset):
+    f.seek(offset)
+    data = f.read(_RECORD.size)
+    if len(data) < _RECORD.size:
+        return None, None
+    return _RECORD.unpack(data)
+
+
+def _scan(f):
+    """Record offsets of an archive without an index (e.g. left by an interrupted run)."""
+    records = {"chunks": [], "tables": {}}
+    offset = len(ARCHIVE_MAGIC)
+    size = os.fstat(f.fileno()).st_size
+    while offset + _RECORD.size <= size:
+        tag, length = _read_record_header(f, offset)
+        end = offset + _RECORD.size + length
+        if end > size:
+            break  # truncated record
+        if tag == b"CHNK":
+            (meta_len,) = struct.unpack("<I", f.read(4))
+            records["chunks"].append([offset, json.loads(f.read(meta_len))["n"]])
+        elif tag == b"TABL":
+            (name_len,) = struct.unpack("<I", f.read(4))
+            records["tables"][f.read(name_len).decode()] = offset
+        elif tag not in (b"HEAD", b"INDX"):
+            break
+        offset = end
+    return records
+
+
+class ArchiveReader(SnapshotReader):
+    """
+    SnapshotReader over an archive, plus its ``header``, the run ``metadata``,
+    the stored ``tables`` and the grid coordinates ``x`` of the stored frames
+    (an (x, y) tuple for 2D frames, as the visualization functions expect).
+    """
+
+    def __init__(self, frames, times, file):
+        super().__init__(frames, times, closer=file.close)
+        self.header = frames.header
+        self._file = file
+        self._table_offsets = {}
+
+    @property
+    def metadata(self):
+        return self.header["metadata"]
+
+    @property
+    def x(self):
+        axes = self.header["axes"]
+        if axes is None:
+            return None
+        x = np.asarray(axes)
+        return x if self.header["spatial_ndim"] == 1 else (x,) * self.header["spatial_ndim"]
+
+    @property
+    def tables(self):
+        """Names of the stored tables (see ``table``)."""
+        return tuple(self._table_offsets)
+
+    def table(self, name):
+        """Columns of the stored table ``name`` as a dict of arrays."""
+        if name not in self._table_offsets:
+            raise KeyError(f"No table {name!r} in the archive (have {self.tables})")
+        _, length = _read_record_header(self._file, self._table_offsets[name])
+        (name_len,) = struct.unpack("<I", self._file.read(4))
+        self._file.read(name_len)
+        with np.load(io.BytesIO(self._file.read(length - 4 - name_len))) as data:
+            return {key: data[key] for key in data.files}
+
+
+def open_archive(path):
+    """Open a ``.snap`` archive as a lazy ArchiveReader."""
+    f = open(path, "rb")
+    try:
+        if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+            raise ValueError(f"{path!r} is not a snapshot archive")
+        tag, length = _read_record_header(f, len(ARCHIVE_MAGIC))
+        header = json.loads(f.read(length))
+        records = None
+        size = os.fstat(f.fileno()).st_size
+        if size >= _TRAILER.size:
+            f.seek(size - _TRAILER.size)
+            offset, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+            if magic == END_MAGIC:
+                _, length = _read_record_header(f, offset)
+                records = json.loads(f.read(length))
+        if records is None:
+            records = _scan(f)
+        times = []
+        for offset, k in records["chunks"]:
+            f.seek(offset + _RECORD.size)
+            (meta_len,) = struct.unpack("<I", f.read(4))
+            times.extend(json.loads(f.read(meta_len))["times"])
+    except BaseException:
+        f.close()
+        raise
+    reader = ArchiveReader(ArchiveFrames(f, header, records["chunks"]), times, f)
+    reader._table_offsets = dict(records["tables"])
+    return reader
@@ -1,9 +1,59 @@
-import yaml
+import copy
 import os
 
 def load_config(path="config.yaml"):
     if not os.path.exists(path):
         raise FileNotFoundError(f"Config file not found: {path}")
+    import yaml
+
     with open(path, "r") as f:
         config = yaml.safe_load(f)
-    return config
\ No newline at end of file
+    return config
+
+def set_dotted(config, key, value):
+    """Set ``config["a"]["b"]`` for ``key="a.b"``, creating missing sections."""
+    *sections, leaf = key.split(".")
+    node = config
+    for section in sections:
+        node = node.setdefault(section, {})
+    node[leaf] = value
+
+
+def apply_overrides(config, overrides):
+    """Return a deep copy of ``config`` with dotted-key ``overrides`` applied."""
+    config = copy.deepcopy(config)
+    for key, value in overrides.items():
+        set_dotted(config, key, value)
+    return config
+
+
+# Config sections that can differ between ensemble members, and keys within
+# them that are still shared by the whole batch.
+ENSEMBLE_SECTIONS = ("pde", "initial_condition")
+ENSEMBLE_SHARED = ("pde.source", "initial_condition.from_checkpoint")
+
+
+def expand_ensemble(spec):
+    """
+    Per-member override dicts from an ``ensemble`` config section mapping
+    dotted keys to one value per member; single values (or one-element
+    lists) are shared by all members. Returns [] when there is no ensemble.
+
+    Members share the grid, time stepping and numerics of one batched run, so
+    only ``pde.*`` and ``initial_condition.*`` keys (other than ENSEMBLE_SHARED)
+    are accepted; anything else raises ValueError instead of being ignored.
+    """
+    if not spec:
+        return []
+    unsupported = [key for key in spec
+                   if key.split(".")[0] not in ENSEMBLE_SECTIONS or "." not in key or key in ENSEMBLE_SHARED]
+    if unsupported:
+        raise ValueError(f"Ensemble keys {unsupported} cannot vary per member; only "
+                         f"{', '.join(s + '.*' for s in ENSEMBLE_SECTIONS)} keys can "
+                         f"(except {', '.join(ENSEMBLE_SHARED)})")
+    values = {key: v if isinstance(v, list) else [v] for key, v in spec.items()}
+    sizes = {len(v) for v in values.values()} - {1}
+    if len(sizes) > 1:
+        raise ValueError(f"Ensemble entries have inconsistent lengths: { {k: len(v) for k, v in values.items()} }")
+    n = sizes.pop() if sizes else 1
+    return [{key: v[i if len(v) > 1 else 0] for key, v in values.items()} for i in range(n)]
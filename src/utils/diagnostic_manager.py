@@ -2,79 +2,260 @@
 diagnostic_manager.py
 ---------------------
 Provides the DiagnosticManager class for tracking and saving diagnostic statistics during numerical simulations.
-Supports tracking min, max, mean, mass, and L2 error at each time step, and saving results in YAML or CSV.
+Supports tracking min, max, mean, mass, and L2 error at each time step, and saving results in CSV, NPZ,
+Parquet or as a YAML summary.
+
+Diagnostics are stored column-wise in preallocated NumPy arrays that grow in chunks. All reductions of
+a step are computed in one blocked sweep over the field, so each block is read from memory once and the
+L2 error needs no full-size difference array. Sums (mean, mass, L2 error) accumulate in float64 / complex128
+whatever the precision of the field, so single-precision runs (numerics.dtype: float32) keep accurate
+conservation diagnostics.
 """
 
-import numpy as np
-import yaml
 import csv
 import os
 
+import numpy as np
+
+from src.utils.profiling import profiler
+
+DIAGNOSTICS = ("min", "max", "mean", "mass", "l2_error")
+SAVE_FORMATS = ("csv", "npz", "parquet")
+# Elements per block of the fused reduction sweep (fits comfortably in L2 cache).
+REDUCTION_BLOCK = 16384
+
+
 class DiagnosticManager:
     """
     Manages the collection and saving of diagnostic statistics during simulations.
     Tracks quantities such as min, max, mean, mass, and L2 error for each simulation step.
-    Diagnostics can be saved in YAML or CSV formats.
+    Diagnostics can be saved as CSV, NPZ or Parquet tables, or summarized in YAML.
     """
-    def __init__(self, dx=None, dy=None, u_ref=None, track=("min", "max", "mean", "mass", "l2_error")):
+    def __init__(self, dx=None, dy=None, u_ref=None, track=DIAGNOSTICS, every=1, chunk_size=1024, n_members=None):
         """
         Initialize the DiagnosticManager.
 
         Args:
             dx (float): Grid spacing in x-direction. Required for mass and L2 error.
-            dy (float, optional): Grid spacing in y-direction. Defaults to dx if not provided.
+            dy (float, optional): Grid spacing in y-direction for 2D fields. Leave as None for 1D
+                fields, where the cell size is dx alone.
             u_ref (np.ndarray, optional): Reference solution for L2 error computation.
             track (Iterable[str], optional): Diagnostics to track. Options: 'min', 'max', 'mean', 'mass', 'l2_error'.
+            every (int, optional): Record only every k-th call of track_step.
+            chunk_size (int, optional): Number of rows the column arrays grow by.
+            n_members (int, optional): Ensemble size. Fields are then batches of shape (n_grid, n_members)
+                and every diagnostic becomes a column of n_members values per step.
         Raises:
-            ValueError: If dx is not provided.
+            ValueError: If dx is not provided or an unknown diagnostic is requested.
         """
         if dx is None:
             raise ValueError("dx must be provided for diagnostics involving spatial integration.")
+        unknown = set(track) - set(DIAGNOSTICS)
+        if unknown:
+            raise ValueError(f"Unknown diagnostics {sorted(unknown)} (expected a subset of {DIAGNOSTICS})")
         self.dx = dx
-        self.dy = dy if dy is not None else dx
-        self.u_ref = u_ref
+        self.dy = dy
+        self.cell_volume = dx * (dy if dy is not None else 1.0)
+        self.u_ref = None if u_ref is None else np.ascontiguousarray(u_ref)
         self.track = set(track)
-        self.records = []
+        self.every = max(1, int(every))
+        self.chunk_size = max(1, int(chunk_size))
+        self.n_members = n_members
 
-    def track_step(self, u, t):
+        self.n_calls = 0
+        self.n_rows = 0
+        self._capacity = 0
+        self._columns = {}
+        self._scratch = None
+        # Fixed column order: time, then the tracked diagnostics in canonical order.
+        self._names = ["time"] + [name for name in DIAGNOSTICS if self._tracks(name)]
+
+    def _tracks(self, name):
+        return name in self.track and (name != "l2_error" or self.u_ref is not None)
+
+    def __len__(self):
+        return self.n_rows
+
+    def track_step(self, u, t, **extra):
         """
-        Collects diagnostic statistics at a single time step.
+        Collects diagnostic statistics at a single time step (every ``every``-th call).
 
         Args:
             u (np.ndarray): Solution array at current time step.
             t (float): Current simulation time.
+            **extra: Additional scalar columns to record (e.g. integrator counters).
         Raises:
             ValueError: If u and u_ref shapes mismatch when computing L2 error.
         """
+        self.n_calls += 1
+        if (self.n_calls - 1) % self.every:
+            return
+        self.record(u, t, **extra)
+
+    def record(self, u, t, **extra):
+        """
+        Record the statistics of ``u`` unconditionally, for callers that apply
+        the ``every`` stride themselves (see core.engine.TimeLoop hooks).
+        """
         u = np.asarray(u)
-        
-        if "l2_error" in self.track and self.u_ref is not None:
-            if u.shape != self.u_ref.shape:
-                raise ValueError(f"Shape mismatch: u has shape {u.shape}, but u_ref has shape {self.u_ref.shape}")
+        if self._tracks("l2_error") and u.shape != self.u_ref.shape:
+            raise ValueError(f"Shape mismatch: u has shape {u.shape}, but u_ref has shape {self.u_ref.shape}")
+
+        with profiler.phase("diagnostics"):
+            row = self._next_row()
+            cols = self._columns
+            cols["time"][row] = t
+            for name, value in self._reduce(u).items():
+                cols[name][row] = value
+        for name, value in extra.items():
+            if name not in cols:
+                self._add_column(name, np.shape(value))
+            cols[name][row] = value
+
+    def _reduce(self, u):
+        """
+        Tracked statistics of ``u`` from a single blocked pass. Reductions run
+        down axis 0 of an (n_grid, n_members) view, so a batch yields one
+        value per member (a single field is a batch of one). For complex
+        fields min, max and mean refer to |u| and mass is the norm ∫|u|² dx.
+        Sums accumulate in double precision.
+        """
+        m = self.n_members or 1
+        flat = u.reshape(-1, m)
+        ref = self.u_ref.reshape(-1, m) if self._tracks("l2_error") else None
+        need_extrema = "min" in self.track or "max" in self.track
+        need_sum = "mean" in self.track or "mass" in self.track
+        rows = max(1, REDUCTION_BLOCK // m)
+        is_complex = np.iscomplexobj(flat)
+        lo, hi = np.full(m, np.inf), np.full(m, -np.inf)
+        acc = np.result_type(flat.dtype, np.float64)
+        total, norm, sq = np.zeros(m, dtype=acc), np.zeros(m), np.zeros(m)
+
+        if ref is not None and (self._scratch is None or self._scratch.dtype != flat.dtype
+                                or self._scratch.shape[1] != m):
+            self._scratch = np.empty((min(rows, flat.shape[0]), m), dtype=flat.dtype)
+        for a in range(0, flat.shape[0], rows):
+            block = flat[a:a + rows]
+            values = block
+            if is_complex:
+                if "mass" in self.track:
+                    norm += np.einsum("ij,ij->j", block, block.conj(), dtype=acc).real
+                values = np.abs(block)
+            if need_extrema:
+                np.minimum(lo, values.min(axis=0), out=lo)
+                np.maximum(hi, values.max(axis=0), out=hi)
+            if need_sum:
+                total += values.sum(axis=0, dtype=total.dtype)
+            if ref is not None:
+                diff = self._scratch[:block.shape[0]]
+                np.subtract(block, ref[a:a + rows], out=diff)
+                sq += np.einsum("ij,ij->j", diff, diff.conj(), dtype=acc).real
 
-        entry = {"time": t}
+        stats = {}
         if "min" in self.track:
-            entry["min"] = float(np.min(u))
+            stats["min"] = lo
         if "max" in self.track:
-            entry["max"] = float(np.max(u))
+            stats["max"] = hi
         if "mean" in self.track:
-            entry["mean"] = float(np.mean(u))
+            stats["mean"] = total.real / flat.shape[0]
         if "mass" in self.track:
-            entry["mass"] = float(np.sum(u) * self.dx * self.dy)
-        if "l2_error" in self.track and self.u_ref is not None:
-            diff = u - self.u_ref
-            entry["l2_error"] = float(np.sqrt(np.sum(diff**2) * self.dx * self.dy))
-        self.records.append(entry)
+            stats["mass"] = (norm if is_complex else total) * self.cell_volume
+        if ref is not None:
+            stats["l2_error"] = np.sqrt(sq * self.cell_volume)
+        if self.n_members is None:
+            stats = {name: value[0] for name, value in stats.items()}
+        return stats
+
+    def _next_row(self):
+        if self.n_rows == self._capacity:
+            self._capacity += self.chunk_size
+            for name in self._names:
+                if name not in self._columns:
+                    shape = () if name == "time" or self.n_members is None else (self.n_members,)
+                    self._columns[name] = np.full((self._capacity,) + shape, np.nan)
+                else:
+                    self._columns[name] = _grow(self._columns[name], self._capacity)
+        self.n_rows += 1
+        return self.n_rows - 1
+
+    def _add_column(self, name, shape=()):
+        self._names.append(name)
+        self._columns[name] = np.full((self._capacity,) + tuple(shape), np.nan)
+
+    def columns(self):
+        """
+        Recorded diagnostics as a dict of column name -> array (views, no copy).
+        Per-member columns have shape (n_records, n_members).
+        """
+        return {name: self._columns[name][:self.n_rows] for name in self._names}
+
+    def flat_columns(self):
+        """Like ``columns`` but with per-member columns split into ``name_<i>`` 1D columns."""
+        flat = {}
+        for name, col in self.columns().items():
+            if col.ndim == 1:
+                flat[name] = col
+            else:
+                flat.update({f"{name}_{i}": col[:, i] for i in range(col.shape[1])})
+        return flat
+
+    def state_dict(self):
+        """Recorded columns and call counter, for checkpoints (see ``load_state``)."""
+        state = {f"col/{name}": col for name, col in self.columns().items()}
+        state.update(names=np.array(self._names), n_calls=self.n_calls)
+        return state
+
+    def load_state(self, state):
+        """Replace the recorded diagnostics with those of a ``state_dict``."""
+        self._names = [str(name) for name in state["names"]]
+        self.n_calls = int(state["n_calls"])
+        self.n_rows = len(state["col/time"])
+        self._capacity = self.chunk_size * (self.n_rows // self.chunk_size + 1)
+        self._columns = {name: _grow(np.asarray(state[f"col/{name}"], dtype=float), self._capacity)
+                         for name in self._names}
+
+    @property
+    def records(self):
+        """Recorded diagnostics as a list of per-step dicts (built on demand)."""
+        cols = self.flat_columns()
+        return [{name: float(col[i]) for name, col in cols.items()} for i in range(self.n_rows)]
+
+    def summary(self):
+        """Number of records plus the final value and range of every column (per member for batches)."""
+        out = {"n_records": self.n_rows, "every": self.every}
+        for name, col in self.columns().items():
+            if len(col):
+                stats = {"final": col[-1], "min": np.nanmin(col, axis=0), "max": np.nanmax(col, axis=0)}
+                out[name] = {k: v.tolist() if np.ndim(v) else float(v) for k, v in stats.items()}
+        return out
+
+    def save(self, path, fmt=None):
+        """
+        Save the diagnostics table, inferring the format from the file extension unless given.
+
+        Args:
+            path (str): Output path.
+            fmt (str, optional): One of 'csv', 'npz', 'parquet'.
+        """
+        fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+        savers = {"csv": self.save_csv, "npz": self.save_npz, "parquet": self.save_parquet}
+        if fmt not in savers:
+            raise ValueError(f"Unknown diagnostics format: {fmt!r} (expected one of {SAVE_FORMATS})")
+        with profiler.phase(f"save_{fmt}"):
+            savers[fmt](path)
 
     def save_yaml(self, path):
         """
-        Save all collected diagnostics to a YAML file.
+        Save a summary of the collected diagnostics (see ``summary``) to a YAML file.
+        The full table is written by save_csv / save_npz / save_parquet.
 
         Args:
             path (str): File path for saving diagnostics.
         """
-        with open(path, "w") as f:
-            yaml.dump(self.records, f)
+        import yaml
+
+        with profiler.phase("save_yaml"), open(path, "w") as f:
+            yaml.safe_dump(self.summary(), f, sort_keys=False)
 
     def save_csv(self, path):
         """
@@ -83,10 +264,38 @@ class DiagnosticManager:
         Args:
             path (str): File path for saving diagnostics.
         """
-        if not self.records:
+        if not self.n_rows:
             return
-        keys = self.records[0].keys()
+        cols = self.flat_columns()
         with open(path, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(self.records)
\ No newline at end of file
+            csv.writer(f).writerow(cols.keys())
+            np.savetxt(f, np.column_stack(list(cols.values())), delimiter=",", fmt="%.17g")
+
+    def save_npz(self, path):
+        """
+        Save all collected diagnostics as one array per column in an NPZ file.
+
+        Args:
+            path (str): File path for saving diagnostics.
+        """
+        np.savez(path, **self.columns())
+
+    def save_parquet(self, path):
+        """
+        Save all collected diagnostics to a Parquet file (requires pyarrow).
+
+        Args:
+            path (str): File path for saving diagnostics.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Saving diagnostics as Parquet requires the pyarrow package") from exc
+        pq.write_table(pa.table(self.flat_columns()), path)
+
+
+def _grow(column, capacity):
+    grown = np.full((capacity,) + column.shape[1:], np.nan)
+    grown[:len(column)] = column
+    return grown
@@ -1,14 +1,18 @@
 import os
-import yaml
 import csv
+
+import numpy as np
+
+# pyplot and yaml are imported inside the functions that need them, so
+# importing this module stays cheap.
+
 def compute_l2_error(u_final, u_ref, dx, dy=1.0):
     """Compute the L2 error between two arrays."""
     return np.sqrt(np.sum((u_final - u_ref) ** 2) * dx * dy)
 
-import matplotlib.pyplot as plt
-import numpy as np
-
 def plot_mass_evolution(u_history, dx, dy, title="Mass over time"):
+    import matplotlib.pyplot as plt
+
     mass = [np.sum(u) * dx * dy for u in u_history]
     plt.plot(mass)
     plt.xlabel("Time step")
@@ -19,6 +23,8 @@ def plot_mass_evolution(u_history, dx, dy, title="Mass over time"):
     plt.show()
 
 def plot_l2_error(u_history, reference, dx, dy, title="L² Error over Time"):
+    import matplotlib.pyplot as plt
+
     errors = [
         np.sqrt(np.sum((u.reshape(reference.shape) - reference)**2) * dx * dy)
         for u in u_history
@@ -47,6 +53,8 @@ def save_diagnostics_summary(u_final, u_ref, dx, dy, path):
         "mean": float(np.mean(u_final)),
     }
 
+    import yaml
+
     with open(os.path.join(path, "diagnostics.yaml"), "w") as f:
         yaml.dump(diagnostics, f)
 
@@ -0,0 +1,122 @@
+"""
+live.py
+-------
+Run a simulation in a background thread and stream its progress, e.g. to
+an interactive front end (mock_gui.py).
+
+``LiveRun`` starts ``run_simulation`` on a daemon thread with an observer
+that publishes a ``LiveUpdate`` (step, time, a copy of the field and the
+latest diagnostics row) every ``every`` steps. Updates go through a bounded
+queue; when the consumer falls behind the oldest pending update is dropped,
+so the solver never waits for the display and the consumer always gets the
+freshest state. The diagnostics rows of all published steps are also kept in
+``history`` for plotting curves. ``cancel()`` stops the run at the next
+published step.
+"""
+
+import queue
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+LiveUpdate = namedtuple("LiveUpdate", "step t u diagnostics")
+
+
+class RunCancelled(Exception):
+    """Raised inside the solver thread to stop a cancelled run."""
+
+
+class LiveRun:
+    """
+    Background simulation publishing progress every ``every`` steps.
+
+    Args:
+        cfg (dict): Configuration passed to ``run_simulation``.
+        every (int): Publish after every ``every``-th step.
+        maxsize (int): Capacity of the update queue.
+        runner (callable, optional): ``runner(cfg, observers=...)``; defaults to
+            ``main.run_simulation``.
+    """
+
+    def __init__(self, cfg, every=10, maxsize=8, runner=None):
+        self.cfg = cfg
+        self.every = max(1, int(every))
+        self.updates = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.history = []
+        self.result = None
+        self.error = None
+        self._runner = runner
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-run", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _publish(self, step, t, u, diagnostics):
+        if self._cancel.is_set():
+            raise RunCancelled
+        row = {}
+        if diagnostics is not None and len(diagnostics):
+            row = {name: np.array(col[-1]) for name, col in diagnostics.columns().items()}
+        self.history.append(row)
+        update = LiveUpdate(step, t, np.array(u), row)
+        while True:
+            try:
+                self.updates.put_nowait(update)
+                return
+            except queue.Full:
+                try:
+                    self.updates.get_nowait()  # drop the stalest update
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        runner = self._runner
+        if runner is None:
+            from main import run_simulation as runner
+        try:
+            self.result = runner(self.cfg, observers=[(self.every, self._publish)])
+        except RunCancelled:
+            pass
+        except Exception as exc:
+            self.error = exc
+
+    def poll(self):
+        """All pending updates (oldest first), without blocking."""
+        pending = []
+        while True:
+            try:
+                pending.append(self.updates.get_nowait())
+            except queue.Empty:
+                return pending
+
+    def latest(self, timeout=None):
+        """The newest pending update, waiting up to ``timeout`` seconds for one; None if there is none."""
+        pending = self.poll()
+        if not pending and timeout:
+            try:
+                pending = [self.updates.get(timeout=timeout)] + self.poll()
+            except queue.Empty:
+                pass
+        return pending[-1] if pending else None
+
+    def cancel(self):
+        """Ask the solver to stop at its next published step."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self._thread.ident is not None and not self._thread.is_alive()
+
+    def join(self, timeout=None):
+        """Wait for the run to finish; re-raises a solver error."""
+        self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
@@ -0,0 +1,131 @@
+"""
+output_pipeline.py
+------------------
+Background output stage, so that snapshot/checkpoint writes, animation
+frames, plots and diagnostics files overlap the solve instead of running
+between (or after) the time steps.
+
+Work is submitted to named lanes. Each lane is a worker thread with a
+bounded queue: tasks of one lane run in submission order (snapshots before
+the checkpoint that records their times), different lanes run
+concurrently. ``submit`` blocks while a lane has ``max_pending`` queued
+tasks, so a solver that outpaces the disk waits instead of piling up frame
+copies (the wait is reported as the "output_wait" profiler phase). NumPy,
+zlib and PIL release the GIL for the heavy parts, so threads suffice.
+
+A failing task stops its lane; the error is re-raised in the producer on
+the next ``submit`` or on ``close``. ``close`` always runs the queued tasks
+and joins the workers, so an exception or Ctrl-C in the solver still leaves
+complete files for everything produced before it. With ``background=False``
+tasks run inline (same results, serial timing).
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from src.utils.profiling import profiler
+
+
+def detach(state):
+    """Copy of a flat state dict whose arrays no longer alias the live solver state."""
+    if state is None:
+        return None
+    return {key: np.array(value) if isinstance(value, np.ndarray) else value for key, value in state.items()}
+
+
+class OutputPipeline:
+    """
+    Ordered background lanes for output tasks.
+
+    Args:
+        max_pending (int): Queued tasks per lane before ``submit`` blocks.
+        background (bool): Run tasks on worker threads (False: inline).
+    """
+
+    def __init__(self, max_pending=8, background=True):
+        self.max_pending = max(1, int(max_pending))
+        self.background = background
+        self._lanes = {}
+        self._error = None
+        self.closed = False
+
+    def _lane(self, name):
+        if name not in self._lanes:
+            tasks = queue.Queue(maxsize=self.max_pending)
+            thread = threading.Thread(target=self._run, args=(name, tasks), name=f"output-{name}", daemon=True)
+            thread.start()
+            self._lanes[name] = (tasks, thread)
+        return self._lanes[name][0]
+
+    def _run(self, name, tasks):
+        failed = False
+        while True:
+            task = tasks.get()
+            try:
+                if task is None:
+                    return
+                if not failed:
+                    func, args, kwargs = task
+                    func(*args, **kwargs)
+            except BaseException as exc:  # re-raised in the producer thread
+                failed = True
+                if self._error is None:
+                    self._error = (name, exc)
+            finally:
+                tasks.task_done()
+
+    def _raise(self):
+        if self._error is not None:
+            name, exc = self._error
+            raise RuntimeError(f"Background output task failed (lane {name!r})") from exc
+
+    def submit(self, lane, func, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` on lane ``lane`` after the tasks submitted
+        to it before. Arguments are handed over: pass copies of arrays the
+        solver keeps modifying.
+        """
+        if self.closed:
+            raise ValueError("Cannot submit to a closed output pipeline")
+        self._raise()
+        if not self.background:
+            func(*args, **kwargs)
+            return
+        tasks = self._lane(lane)
+        try:
+            tasks.put_nowait((func, args, kwargs))
+        except queue.Full:
+            start = time.perf_counter()
+            tasks.put((func, args, kwargs))
+            profiler.add_time("output_wait", time.perf_counter() - start)
+
+    def flush(self, lane=None):
+        """Wait until the queued tasks of ``lane`` (default: all lanes) have run."""
+        for name, (tasks, _) in list(self._lanes.items()):
+            if lane is None or name == lane:
+                tasks.join()
+        self._raise()
+
+    def close(self, raise_errors=True):
+        """
+        Run the queued tasks, stop the workers and re-raise the first task error
+        (unless ``raise_errors`` is False, e.g. while another exception unwinds).
+        """
+        if not self.closed:
+            self.closed = True
+            for tasks, _ in self._lanes.values():
+                tasks.put(None)
+            for _, thread in self._lanes.values():
+                thread.join()
+            self._lanes = {}
+        if raise_errors:
+            self._raise()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(raise_errors=exc_type is None)
@@ -0,0 +1,190 @@
+"""
+profiling.py
+------------
+Lightweight instrumentation: a registry of named phase timers and event
+counters shared by the solver stack, plus an opt-in profiling session that
+can also capture cProfile statistics and tracemalloc allocations.
+
+Instrumented code uses the module-level ``profiler``:
+
+    with profiler.phase("step"):
+        stepper.step(...)
+    profiler.count("rhs_evals", 4)
+
+While the profiler is disabled (the default), ``phase`` returns a shared
+no-op context manager and ``count`` returns immediately, so the cost is one
+attribute check per call. Enabled updates take a lock: phases and counters
+are also recorded from the output pipeline's worker threads.
+
+``profile_session(folder)`` enables the profiler for a block and writes a
+timing breakdown to ``folder/profile.txt`` and ``folder/profile.json``.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_NULL_PHASE = contextlib.nullcontext()
+
+# Derived throughput figures: name -> (counter, phase it is divided by).
+RATES = {
+    "steps_per_s": ("steps", "step"),
+    "rhs_evals_per_s": ("rhs_evals", "step"),
+}
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """
+    Registry of accumulated phase times (total seconds and number of calls)
+    and integer counters. Updates and reports are safe across threads.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timings = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    def phase(self, name):
+        """Context manager adding the wall time of its block to phase ``name``."""
+        return _Phase(self, name) if self.enabled else _NULL_PHASE
+
+    def add_time(self, name, seconds):
+        """Add ``seconds`` to phase ``name`` (for spans that do not fit a with-block)."""
+        if self.enabled:
+            with self._lock:
+                entry = self.timings.setdefault(name, [0.0, 0])
+                entry[0] += seconds
+                entry[1] += 1
+
+    def count(self, name, n=1):
+        """Increase counter ``name`` by ``n``."""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, wall_time=None):
+        """Phases (sorted by total time), counters and derived rates as a JSON-ready dict."""
+        with self._lock:
+            timings = {name: tuple(entry) for name, entry in self.timings.items()}
+            counters = dict(self.counters)
+        phases = {name: {"total_s": total, "calls": calls, "mean_s": total / calls if calls else 0.0}
+                  for name, (total, calls) in sorted(timings.items(), key=lambda kv: -kv[1][0])}
+        if wall_time:
+            for stats in phases.values():
+                stats["share"] = stats["total_s"] / wall_time
+        rates = {}
+        for rate, (counter, phase) in RATES.items():
+            if counter in counters and timings.get(phase, (0.0,))[0] > 0:
+                rates[rate] = counters[counter] / timings[phase][0]
+        return {"wall_time_s": wall_time, "phases": phases, "counters": counters, "rates": rates}
+
+
+profiler = Profiler()
+
+
+def format_report(report):
+    """Plain-text table of a ``Profiler.report`` dict."""
+    lines = []
+    if report.get("wall_time_s"):
+        lines.append(f"wall time: {report['wall_time_s']:.4f} s")
+    lines.append(f"{'phase':<20} {'total [s]':>10} {'calls':>8} {'mean [ms]':>10} {'share':>7}")
+    for name, stats in report["phases"].items():
+        share = f"{100 * stats['share']:6.1f}%" if "share" in stats else ""
+        lines.append(f"{name:<20} {stats['total_s']:>10.4f} {stats['calls']:>8} "
+                     f"{1e3 * stats['mean_s']:>10.4f} {share:>7}")
+    if report["counters"]:
+        lines.append("")
+        lines.extend(f"{name:<20} {value:>14,}" for name, value in sorted(report["counters"].items()))
+    if report["rates"]:
+        lines.append("")
+        lines.extend(f"{name:<20} {value:>14,.1f}" for name, value in report["rates"].items())
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile_session(folder, cprofile=False, memory=False, top=20, log=print):
+    """
+    Profile the enclosed block and write ``profile.txt`` / ``profile.json`` to ``folder``.
+
+    Args:
+        folder (str): Output folder.
+        cprofile (bool): Also run cProfile; statistics go to ``profile.pstats``
+            and the ``top`` functions by cumulative time to the text report.
+        memory (bool): Trace allocations with tracemalloc; the peak and the
+            ``top`` allocation sites are reported.
+        top (int): Number of functions / allocation sites to list.
+        log (callable): Receives the text report.
+    """
+    profiler.reset()
+    profiler.enable()
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+    if cprofile:
+        import cProfile
+        cprof = cProfile.Profile()
+        cprof.enable()
+    start = time.perf_counter()
+    try:
+        yield profiler
+    finally:
+        wall = time.perf_counter() - start
+        if cprofile:
+            cprof.disable()
+        profiler.disable()
+        report = profiler.report(wall)
+        text = format_report(report)
+
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            sites = snapshot.statistics("lineno")[:top]
+            report["memory"] = {"current_bytes": current, "peak_bytes": peak,
+                                "top": [{"site": str(s.traceback), "bytes": s.size, "count": s.count} for s in sites]}
+            text += f"\n\ntracemalloc: current {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB\n"
+            text += "\n".join(f"{s.size / 2**20:>10.2f} MiB  {s.traceback}" for s in sites)
+
+        os.makedirs(folder, exist_ok=True)
+        if cprofile:
+            import io
+            import pstats
+            cprof.dump_stats(os.path.join(folder, "profile.pstats"))
+            buffer = io.StringIO()
+            pstats.Stats(cprof, stream=buffer).sort_stats("cumulative").print_stats(top)
+            text += "\n\ncProfile (cumulative):\n" + buffer.getvalue()
+
+        with open(os.path.join(folder, "profile.txt"), "w") as f:
+            f.write(text + "\n")
+        with open(os.path.join(folder, "profile.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        log(text)
@@ -0,0 +1,163 @@
+"""
+result_cache.py
+---------------
+Persistent, content-addressed cache of simulation results.
+
+An entry is keyed by a hash of the physics-relevant parts of the
+configuration (``CACHE_SECTIONS``) plus the settings that decide which
+snapshots a run stores (``output.save_every``, ``output.snapshot_format``;
+other output settings do not matter) and holds the final field, all stored
+snapshots with their times, and the recorded diagnostics, so that a hit can
+reproduce every output of the run. Runs storing more than ``max_frames``
+snapshots are not cached. Each entry is one ``<key>.npz`` file in the cache
+folder, written atomically. The total size is capped at ``max_bytes``: a
+result larger than the cap on its own is not stored, otherwise the least
+recently used entries (by file modification time, refreshed on every hit)
+are evicted first.
+"""
+
+import os
+
+import numpy as np
+
+from src.utils.checkpoint import config_hash, load_checkpoint, save_checkpoint
+
+# Config sections that determine the stored result.
+CACHE_SECTIONS = ("dimension", "grid", "pde", "integrator", "time", "initial_condition", "numerics",
+                  "ensemble", "diagnostics", "amr")
+# Keys within those sections that do not change the result.
+CACHE_EXCLUDE = ("time.checkpoint_every", "numerics.threads", "numerics.tiles", "numerics.tile_mode",
+                 "diagnostics.format", "diagnostics.save_yaml")
+
+
+def result_key(cfg):
+    """Cache key of ``cfg``: hash of its CACHE_SECTIONS and of the snapshot stride and format."""
+    physics = {section: cfg.get(section) for section in CACHE_SECTIONS}
+    out_cfg = cfg.get("output", {})
+    physics["snapshots"] = {"save_every": max(1, int(out_cfg.get("save_every", 1))),
+                            "format": out_cfg.get("snapshot_format", "npy")}
+    return config_hash(physics, exclude=CACHE_EXCLUDE)
+
+
+def is_cacheable(cfg):
+    """
+    Warm starts depend on a checkpoint file outside the config and are never
+    cached, nor are runs whose snapshots are stored lossy or downsampled
+    (``output.archive``), which would otherwise be served to exact runs.
+    """
+    if cfg.get("initial_condition", {}).get("from_checkpoint"):
+        return False
+    out_cfg = cfg.get("output", {})
+    archive = out_cfg.get("archive", {}) if out_cfg.get("snapshot_format") == "archive" else {}
+    return archive.get("precision", "exact") == "exact" and int(archive.get("downsample", 1)) == 1
+
+
+class ResultCache:
+    """
+    Folder of cached results with a size cap and LRU eviction.
+
+    Args:
+        folder (str): Cache directory (created on demand).
+        max_bytes (int): Size cap of all entries together.
+        max_frames (int): Longest snapshot history that is cached.
+    """
+
+    def __init__(self, folder, max_bytes=512 * 2**20, max_frames=1000):
+        self.folder = folder
+        self.max_bytes = int(max_bytes)
+        self.max_frames = max(2, int(max_frames))
+
+    def key(self, cfg):
+        return result_key(cfg)
+
+    def path(self, key):
+        return os.path.join(self.folder, f"{key}.npz")
+
+    def get(self, key):
+        """
+        The entry stored under ``key``, or None.
+
+        Returns:
+            dict: ``u`` (final field), ``frames``, ``times`` and ``diagnostics``
+            (a DiagnosticManager state dict).
+        """
+        path = self.path(key)
+        try:
+            entry = load_checkpoint(path)
+        except (OSError, ValueError, KeyError):
+            return None  # missing, evicted meanwhile or unreadable
+        os.utime(path)  # most recently used
+        snapshot = entry.get("snapshot", {})
+        return {"u": entry["u"], "frames": snapshot["frames"], "times": np.atleast_1d(snapshot["times"]),
+                "t": entry["t"], "diagnostics": entry.get("diagnostics", {})}
+
+    def put(self, key, u, frames, times, diagnostics=None):
+        """
+        Store a result; ``frames`` / ``times`` are all stored snapshots (each shaped
+        like ``u``). Evicts old entries beyond the size cap.
+
+        Returns:
+            bool: False (nothing stored) if there are more than ``max_frames`` snapshots
+            or the entry would not fit within ``max_bytes``.
+        """
+        times = np.asarray(times, dtype=float)
+        u = np.asarray(u)
+        # The final field plus the frames, checked before the frames are loaded.
+        if len(times) > self.max_frames or (len(times) + 1) * u.nbytes > self.max_bytes:
+            return False
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.path(key)
+        save_checkpoint(path, u, len(times), float(times[-1]), key,
+                        snapshot={"frames": np.stack([np.asarray(frame) for frame in frames]), "times": times},
+                        diagnostics=diagnostics)
+        self.evict()
+        return os.path.exists(path)
+
+    def entries(self):
+        """(path, size, mtime) of every entry, least recently used first."""
+        if not os.path.isdir(self.folder):
+            return []
+        found = []
+        for name in os.listdir(self.folder):
+            if name.endswith(".npz"):
+                path = os.path.join(self.folder, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((path, st.st_size, st.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def evict(self):
+        """Remove least recently used entries until the total size is within ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
+
+    def info(self):
+        entries = self.entries()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+
+def open_result_cache(cfg, root="."):
+    """
+    ResultCache for the ``cache`` config section, or None unless ``cache.enabled``.
+    Relative folders are resolved against ``root``.
+    """
+    cache_cfg = cfg.get("cache") or {}
+    if not cache_cfg.get("enabled", False):
+        return None
+    folder = os.path.join(root, cache_cfg.get("folder", os.path.join(".cache", "results")))
+    return ResultCache(folder, max_bytes=float(cache_cfg.get("max_mb", 512)) * 2**20,
+                       max_frames=cache_cfg.get("max_frames", 1000))
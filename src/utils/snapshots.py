@@ -0,0 +1,392 @@
+"""
+snapshots.py
+------------
+Snapshot sinks that stream solution frames to disk instead of keeping a
+Python list of copies, and lazy readers to iterate over the stored frames.
+
+Formats:
+    "memory": frames kept in RAM (small runs, tests)
+    "npy":    ``.npy`` file written through ``np.lib.format.open_memmap``;
+              the array grows by doubling and is trimmed on close, so the
+              result loads with a plain ``np.load``. Times go to a
+              ``<name>_times.npy`` sidecar.
+    "hdf5":   resizable chunked dataset (requires h5py)
+    "zarr":   chunked zarr array (requires zarr)
+    "archive": compressed ``.snap`` archive, optionally downsampled and
+              lossy (see src/utils/archive.py)
+
+All sinks share ``append(u, t)``, ``close()`` and ``reader()``; readers
+support ``len``, indexing, iteration one frame at a time, ``times`` and
+``load()`` for the full array.
+"""
+
+import io
+import os
+import shutil
+
+import numpy as np
+
+SNAPSHOT_FORMATS = ("memory", "npy", "hdf5", "zarr", "archive")
+SNAPSHOT_EXTENSIONS = {"npy": ".npy", "hdf5": ".h5", "zarr": ".zarr", "archive": ".snap"}
+
+
+class SnapshotReader:
+    """
+    Sequence view over stored frames. ``frames`` is any array-like indexed
+    along axis 0 (ndarray, memmap, h5py/zarr dataset); frames are only read
+    when accessed.
+    """
+
+    def __init__(self, frames, times, closer=None):
+        self._frames = frames
+        self.times = np.asarray(times, dtype=float)
+        self._closer = closer
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            n = len(self)
+            if index < 0:
+                index += n
+            if not 0 <= index < n:
+                raise IndexError(f"Snapshot index out of range (have {n} frames)")
+            return np.asarray(self._frames[index])
+        return np.asarray(self._frames[:len(self)][index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.load()
+        return data if dtype is None else data.astype(dtype)
+
+    @property
+    def frame_shape(self):
+        return self[0].shape if len(self) else ()
+
+    def load(self):
+        """All frames as one in-memory array of shape (n_frames,) + frame_shape."""
+        return np.asarray(self._frames[:len(self)])
+
+    def max(self):
+        """Largest value over all frames, reading one frame at a time."""
+        return max(float(np.max(f)) for f in self)
+
+    def min(self):
+        """Smallest value over all frames, reading one frame at a time."""
+        return min(float(np.min(f)) for f in self)
+
+    def close(self):
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotSink:
+    """
+    Base class for frame sinks.
+
+    Args:
+        frame_shape (tuple): Shape each frame is stored with.
+        dtype: Storage dtype (defaults to float64).
+    """
+
+    def __init__(self, frame_shape, dtype=np.float64):
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.times = []
+        self.closed = False
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, u, t):
+        """Store a copy of ``u`` (reshaped to ``frame_shape``) taken at time ``t``."""
+        if self.closed:
+            raise ValueError("Cannot append to a closed snapshot sink")
+        frame = np.reshape(u, self.frame_shape)
+        self._write(len(self.times), frame)
+        self.times.append(float(t))
+
+    def close(self):
+        if not self.closed:
+            self._finalize()
+            self.closed = True
+
+    def flush(self):
+        """Make the frames appended so far durable on disk (no-op for in-memory sinks)."""
+
+    def reader(self):
+        """Close the sink (if still open) and return a lazy reader over its frames."""
+        self.close()
+        return self._reader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _finalize(self):
+        pass
+
+
+class MemorySink(SnapshotSink):
+    """
+    Keeps frames in one preallocated in-memory array (grown by doubling),
+    so the history is never duplicated by a final ``np.array(list)``.
+    """
+
+    def __init__(self, frame_shape, dtype=np.float64, capacity=None):
+        super().__init__(frame_shape, dtype)
+        self.frames = np.empty((max(1, int(capacity or 16)),) + self.frame_shape, dtype=self.dtype)
+
+    def _write(self, index, frame):
+        if index >= self.frames.shape[0]:
+            grown = np.empty((2 * self.frames.shape[0],) + self.frame_shape, dtype=self.dtype)
+            grown[:index] = self.frames[:index]
+            self.frames = grown
+        self.frames[index] = frame
+
+    def _reader(self):
+        return SnapshotReader(self.frames[:len(self.times)], self.times)
+
+
+class NpySink(SnapshotSink):
+    """
+    Streams frames into a ``.npy`` file through a memory map.
+
+    Args:
+        path (str): Output ``.npy`` path.
+        frame_shape (tuple): Shape of one frame.
+        dtype: Storage dtype.
+        capacity (int, optional): Expected number of frames; the file grows
+            by doubling if more are appended.
+        flush_every (int): Flush the memory map to disk every this many frames.
+    """
+
+    def __init__(self, path, frame_shape, dtype=np.float64, capacity=None, flush_every=64):
+        super().__init__(frame_shape, dtype)
+        self.path = path
+        self.times_path = times_path(path)
+        self.flush_every = max(1, int(flush_every))
+        self._data = self._open(max(1, int(capacity or 16)))
+
+    def _open(self, capacity):
+        return np.lib.format.open_memmap(self.path, mode="w+", dtype=self.dtype,
+                                         shape=(capacity,) + self.frame_shape)
+
+    def _grow(self):
+        old = self._data
+        tmp_path = self.path + ".grow"
+        os.replace(self.path, tmp_path)
+        self._data = self._open(2 * old.shape[0])
+        self._data[:old.shape[0]] = old
+        del old
+        os.remove(tmp_path)
+
+    def _write(self, index, frame):
+        if index >= self._data.shape[0]:
+            self._grow()
+        self._data[index] = frame
+        if (index + 1) % self.flush_every == 0:
+            self._data.flush()
+
+    def flush(self):
+        self._data.flush()
+
+    def _finalize(self):
+        n = len(self.times)
+        capacity = self._data.shape[0]
+        self._data.flush()
+        offset = self._data.offset
+        del self._data
+        if n < capacity:
+            _truncate_npy(self.path, offset, (n,) + self.frame_shape, self.dtype)
+        np.save(self.times_path, np.asarray(self.times, dtype=float))
+
+    def _reader(self):
+        return open_snapshots(self.path)
+
+
+def _truncate_npy(path, data_offset, shape, dtype):
+    """Shrink an ``.npy`` file in place to ``shape`` along its leading axis."""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+    if header.tell() == data_offset:
+        with open(path, "r+b") as f:
+            f.write(header.getvalue())
+            f.truncate(data_offset + int(np.prod(shape)) * dtype.itemsize)
+        return
+    # The shorter shape changed the padded header length: copy into a fresh file.
+    src = np.load(path, mmap_mode="r")
+    tmp_path = path + ".trim"
+    dst = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+    dst[...] = src[:shape[0]]
+    dst.flush()
+    del src, dst
+    os.replace(tmp_path, path)
+
+
+class HDF5Sink(SnapshotSink):
+    """Appends frames to a resizable, one-frame-per-chunk HDF5 dataset."""
+
+    def __init__(self, path, frame_shape, dtype=np.float64, capacity=None, dataset="u"):
+        super().__init__(frame_shape, dtype)
+        h5py = _require("h5py", "hdf5")
+        self.path = path
+        self.dataset = dataset
+        self._file = h5py.File(path, "w")
+        self._data = self._file.create_dataset(
+            dataset, shape=(int(capacity or 0),) + self.frame_shape, maxshape=(None,) + self.frame_shape,
+            chunks=(1,) + self.frame_shape, dtype=self.dtype)
+
+    def _write(self, index, frame):
+        if index >= self._data.shape[0]:
+            self._data.resize(max(2 * self._data.shape[0], index + 1), axis=0)
+        self._data[index] = frame
+
+    def flush(self):
+        self._file.flush()
+
+    def _finalize(self):
+        self._data.resize(len(self.times), axis=0)
+        self._file.create_dataset("t", data=np.asarray(self.times, dtype=float))
+        self._file.close()
+
+    def _reader(self):
+        return open_snapshots(self.path)
+
+
+class ZarrSink(SnapshotSink):
+    """Appends frames to a chunked zarr array; times are kept in its attributes."""
+
+    def __init__(self, path, frame_shape, dtype=np.float64, capacity=None):
+        super().__init__(frame_shape, dtype)
+        zarr = _require("zarr", "zarr")
+        self.path = path
+        self._data = zarr.open_array(path, mode="w", shape=(0,) + self.frame_shape,
+                                     chunks=(1,) + self.frame_shape, dtype=self.dtype)
+
+    def _write(self, index, frame):
+        self._data.append(frame[None])
+
+    def _finalize(self):
+        self._data.attrs["t"] = list(self.times)
+
+    def _reader(self):
+        return open_snapshots(self.path)
+
+
+def _require(module, fmt):
+    try:
+        return __import__(module)
+    except ImportError as exc:
+        raise ImportError(f"Snapshot format {fmt!r} requires the {module} package") from exc
+
+
+def times_path(path):
+    """Sidecar file holding the frame times of an ``.npy`` snapshot file."""
+    root, _ = os.path.splitext(path)
+    return root + "_times.npy"
+
+
+def make_snapshot_sink(fmt, path, frame_shape, dtype=np.float64, capacity=None, **options):
+    """
+    Create a snapshot sink.
+
+    Args:
+        fmt (str): One of SNAPSHOT_FORMATS.
+        path (str): Output path without extension (ignored for "memory").
+        frame_shape (tuple): Shape of one stored frame.
+        dtype: Storage dtype.
+        capacity (int, optional): Expected number of frames (preallocation hint).
+        **options: Format-specific settings (ArchiveSink: downsample, precision, ...).
+    Returns:
+        SnapshotSink
+    """
+    if fmt == "memory":
+        return MemorySink(frame_shape, dtype, capacity=capacity)
+    path = snapshot_path(fmt, path)
+    if fmt == "archive":
+        from src.utils.archive import ArchiveSink
+        return ArchiveSink(path, frame_shape, dtype=dtype, capacity=capacity, **options)
+    sink_cls = {"npy": NpySink, "hdf5": HDF5Sink, "zarr": ZarrSink}[fmt]
+    return sink_cls(path, frame_shape, dtype=dtype, capacity=capacity)
+
+
+def snapshot_path(fmt, path):
+    """File path a sink of format ``fmt`` writes for ``path`` (adds the format's extension)."""
+    if fmt not in SNAPSHOT_EXTENSIONS:
+        raise ValueError(f"Unknown snapshot format: {fmt!r} (expected one of {SNAPSHOT_FORMATS})")
+    root, ext = os.path.splitext(path)
+    return root + SNAPSHOT_EXTENSIONS[fmt] if ext != SNAPSHOT_EXTENSIONS[fmt] else path
+
+
+def recover_snapshots(fmt, path, times):
+    """
+    Frames of an interrupted run, so a resumed run can copy them into a new sink.
+
+    The file a sink of format ``fmt`` wrote for ``path`` is moved aside (it is
+    still open-ended: never trimmed or closed) and the first ``len(times)``
+    frames are returned as a reader that deletes the file when closed.
+    Returns None if there is nothing on disk (e.g. the "memory" format).
+    """
+    if fmt == "memory":
+        return None
+    path = snapshot_path(fmt, path)
+    if not os.path.exists(path):
+        return None
+    root, ext = os.path.splitext(path)
+    stash = root + ".resume" + ext
+    os.replace(path, stash)
+    reader = open_snapshots(stash)
+
+    def closer(close=reader.close):
+        close()
+        if os.path.isdir(stash):
+            shutil.rmtree(stash)
+        else:
+            os.remove(stash)
+
+    return SnapshotReader(reader._frames, times[:min(len(times), len(reader))], closer=closer)
+
+
+def open_snapshots(path):
+    """Open snapshots written by NpySink, HDF5Sink, ZarrSink or ArchiveSink as a lazy SnapshotReader."""
+    ext = os.path.splitext(path.rstrip("/"))[1]
+    if ext == ".npy":
+        frames = np.load(path, mmap_mode="r")
+        tp = times_path(path)
+        times = np.load(tp) if os.path.exists(tp) else np.arange(len(frames), dtype=float)
+        return SnapshotReader(frames, times)
+    if ext in (".h5", ".hdf5"):
+        h5py = _require("h5py", "hdf5")
+        f = h5py.File(path, "r")
+        # "t" is only written on close; a file left by an interrupted run has none.
+        times = f["t"][...] if "t" in f else np.arange(f["u"].shape[0], dtype=float)
+        return SnapshotReader(f["u"], times, closer=f.close)
+    if ext == ".zarr":
+        zarr = _require("zarr", "zarr")
+        data = zarr.open_array(path, mode="r")
+        return SnapshotReader(data, data.attrs.get("t", range(data.shape[0])))
+    if ext == ".snap":
+        from src.utils.archive import open_archive
+        return open_archive(path)
+    raise ValueError(f"Cannot infer snapshot format from {path!r}")
+
+
+def count_snapshots(steps, save_every):
+    """Number of frames stored for ``steps`` steps at stride ``save_every`` (incl. u0 and the final state)."""
+    save_every = max(1, int(save_every))
+    return 1 + steps // save_every + (1 if steps % save_every else 0)
@@ -1,23 +1,20 @@
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import os
 
-def animate_heat_solution(x, u_history, dt=0.001, save_path="figures/heat_diffusion.gif"):
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-    line, = ax.plot(x, u_history[0], color='blue')
-    ax.set_xlim(x[0], x[-1])
-    ax.set_ylim(0, 1.1 * u_history.max())
-    ax.set_xlabel("x")
-    ax.set_ylabel("u(x, t)")
-    ax.set_title("Heat Diffusion Over Time")
+from src.visualization.render import render_animation
 
-    def update(frame):
-        line.set_ydata(u_history[frame])
-        ax.set_title(f"Heat Diffusion at t = {frame * dt:.3f}")
-        return line,
+def animate_heat_solution(x, u_history, dt=0.001, save_path="figures/heat_diffusion.gif", max_frames=100, fps=20):
+    """
+    Animate a solution history. ``u_history`` may be an array, a list of
+    frames or a SnapshotReader; only the (at most ``max_frames``) frames that
+    are rendered are read, and the frame times of a reader are used for the
+    titles instead of ``frame * dt``. ``x`` is the 1D grid, or an (x, y)
+    tuple for 2D frames, which are drawn as colormapped images. Ensemble
+    frames of shape (N, n_members) are drawn as one line per member.
 
-    ani = animation.FuncAnimation(fig, update, frames=len(u_history), interval=50)
-    ani.save(save_path, writer="pillow", fps=20)
-    plt.close()
\ No newline at end of file
+    Frames are rasterized with NumPy onto a single matplotlib-drawn
+    background (see render.py) rather than redrawn by matplotlib.
+    """
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    dim = 2 if isinstance(x, tuple) else 1
+    fmt = "png" if not save_path.endswith(".gif") else "gif"
+    render_animation(u_history, save_path, x, dim=dim, max_frames=max_frames, dt=dt, fmt=fmt, fps=fps)
@@ -28,8 +28,13 @@ def plot_initial_vs_final(u0, u1, x, y, titles=("Initial", "Final"), cmap="virid
     plt.show()
 
 def animate_2d(u_history, x, y, interval=40, filename="figures/heat_2D.mp4", cmap="viridis"):
-    if not os.path.exists("figures"):
-        os.makedirs("figures")
+    """
+    Animate 2D frames with matplotlib. MP4 output needs ffmpeg; without it
+    the animation is written as a GIF next to the requested file. For long
+    histories prefer render.render_animation, which skips per-frame redraws.
+    """
+    if filename:
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
 
     fig, ax = plt.subplots()
     img = ax.imshow(u_history[0], extent=[x.min(), x.max(), y.min(), y.max()], origin="lower", cmap=cmap)
@@ -41,7 +46,13 @@ def animate_2d(u_history, x, y, interval=40, filename="figures/heat_2D.mp4", cma
     anim = animation.FuncAnimation(fig, update, frames=len(u_history), interval=interval, blit=True)
 
     if filename:
-        anim.save(filename, writer="ffmpeg")
+        if filename.endswith(".gif"):
+            writer = "pillow"
+        elif animation.writers.is_available("ffmpeg"):
+            writer = "ffmpeg"
+        else:
+            writer, filename = "pillow", os.path.splitext(filename)[0] + ".gif"
+        anim.save(filename, writer=writer, fps=max(1, round(1000 / interval)))
         plt.close(fig)
     else:
         plt.show()
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""
+render.py
+---------
+Fast animation rendering without per-frame matplotlib redraws.
+
+The figure decoration (axes, labels, colorbar) is drawn by matplotlib once.
+Each frame is then rasterized directly into the axes area of a copy of that
+background with NumPy: 2D fields through a uint8 colormap lookup table,
+1D profiles as vectorized polylines. Frames are subsampled to a target
+count, and the RGB buffers are encoded (GIF or PNG sequence) by a
+background thread, so rendering can run alongside the solver.
+
+Typical use while a solver produces frames:
+
+    with StreamingAnimation(path, x, u0, expected_frames=n) as anim:
+        ...
+        anim.add(u, t)
+"""
+
+import os
+import queue
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+ANIMATION_FORMATS = ("gif", "png")
+
+
+def frame_indices(n_frames, max_frames):
+    """Evenly spaced indices of at most ``max_frames`` frames, always including the first and last."""
+    if n_frames <= max_frames:
+        return np.arange(n_frames)
+    return np.unique(np.round(np.linspace(0, n_frames - 1, max(2, max_frames))).astype(int))
+
+
+@lru_cache(maxsize=16)
+def colormap_lut(name="viridis", n=256):
+    """(n, 3) uint8 lookup table sampled from a matplotlib colormap."""
+    import matplotlib
+
+    cmap = matplotlib.colormaps[name].resampled(n)
+    return (cmap(np.arange(n))[:, :3] * 255 + 0.5).astype(np.uint8)
+
+
+def colorize(frame, vmin, vmax, lut, out=None):
+    """Map a 2D array to RGB uint8 through ``lut``, clipping to [vmin, vmax]."""
+    n = lut.shape[0]
+    scale = (n - 1) / (vmax - vmin) if vmax > vmin else 0.0
+    idx = np.subtract(frame, vmin, dtype=np.float32)
+    idx *= scale
+    np.clip(idx, 0, n - 1, out=idx)
+    return np.take(lut, idx.astype(np.intp), axis=0, out=out)
+
+
+class FrameCanvas:
+    """
+    Static figure background plus the pixel box of its axes.
+
+    Args:
+        x (np.ndarray or tuple): Grid points (1D) or (x, y) axes (2D).
+        value_range (tuple): (vmin, vmax) for the y-axis (1D) or color scale (2D).
+        dim (int): 1 for line plots, 2 for images.
+        indexing (str): Layout of 2D frames, "ij" ((Nx, Ny), as main) or "xy" ((Ny, Nx)).
+        cmap (str): Matplotlib colormap name for 2D frames.
+        size (tuple, optional): Figure size in inches; dpi: resolution.
+    """
+    line_colors = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                   "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf")
+
+    def __init__(self, x, value_range, dim=1, indexing="ij", cmap="viridis",
+                 size=None, dpi=100):
+        import matplotlib
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.dim = dim
+        self.indexing = indexing
+        self.vmin, self.vmax = map(float, value_range)
+        fig = Figure(figsize=size or ((8, 4) if dim == 1 else (6, 5)), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        if dim == 1:
+            self.x = np.asarray(x, dtype=float)
+            ax.set_xlim(self.x[0], self.x[-1])
+            ax.set_ylim(self.vmin, self.vmax)
+            ax.set_xlabel("x")
+            ax.set_ylabel("u(x, t)")
+            ax.grid(True, alpha=0.3)
+        else:
+            xs, ys = (np.asarray(a, dtype=float) for a in x)
+            ax.set_xlim(xs.min(), xs.max())
+            ax.set_ylim(ys.min(), ys.max())
+            ax.set_xlabel("x")
+            ax.set_ylabel("y")
+            ax.set_aspect("equal")
+            sm = matplotlib.cm.ScalarMappable(norm=matplotlib.colors.Normalize(self.vmin, self.vmax), cmap=cmap)
+            fig.colorbar(sm, ax=ax)
+            self.lut = colormap_lut(cmap, 192)   # leaves palette room for the background
+        ax.set_title(" ")
+        fig.canvas.draw()
+
+        self.background = np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+        height = self.background.shape[0]
+        x0, y0, x1, y1 = ax.get_window_extent().extents
+        self.rows = slice(int(np.ceil(height - y1)), int(np.floor(height - y0)))
+        self.cols = slice(int(np.ceil(x0)), int(np.floor(x1)))
+        self.title_anchor = (0.5 * (x0 + x1), max(0.0, height - y1 - 6))
+        self.box_shape = (self.rows.stop - self.rows.start, self.cols.stop - self.cols.start)
+
+        h, w = self.box_shape
+        if dim == 1:
+            px = np.linspace(self.x[0], self.x[-1], w)
+            self._j = np.clip(np.searchsorted(self.x, px) - 1, 0, len(self.x) - 2)
+            self._frac = (px - self.x[self._j]) / (self.x[self._j + 1] - self.x[self._j])
+            self._row_grid = np.arange(h)[:, None]
+            self._colors = np.array([tuple(int(c[i:i + 2], 16) for i in (1, 3, 5))
+                                     for c in self.line_colors], dtype=np.uint8)
+        else:
+            self._src_rows = self._src_cols = None
+
+    def palette(self):
+        """
+        Fixed 256-color GIF palette: the frame colors (line colors or the
+        colormap LUT), black for labels, and the background quantized into
+        the remaining entries. Frames then quantize with a cheap lookup.
+        """
+        from PIL import Image
+
+        extra = self._colors if self.dim == 1 else self.lut
+        extra = np.vstack([extra, [[0, 0, 0]]]).astype(np.uint8)
+        bg = Image.fromarray(self.background).quantize(colors=256 - len(extra), method=Image.Quantize.MEDIANCUT)
+        bg_colors = np.asarray(bg.getpalette()[:3 * (256 - len(extra))], dtype=np.uint8)
+        pal = Image.new("P", (1, 1))
+        pal.putpalette(np.concatenate([extra.ravel(), bg_colors]).tolist())
+        return pal
+
+    def render(self, frame, out=None):
+        """Return the full RGB image (uint8, H x W x 3) for one frame."""
+        if out is None:
+            out = self.background.copy()
+        else:
+            np.copyto(out, self.background)
+        box = out[self.rows, self.cols]
+        if self.dim == 1:
+            self._draw_lines(np.asarray(frame).reshape(len(self.x), -1), box)
+        else:
+            self._draw_image(np.asarray(frame), box)
+        return out
+
+    def _draw_lines(self, u, box):
+        h, w = self.box_shape
+        scale = (h - 1) / (self.vmax - self.vmin)
+        for k in range(u.shape[1]):
+            col = u[:, k]
+            y = col[self._j] + self._frac * (col[self._j + 1] - col[self._j])
+            r = np.clip((self.vmax - y) * scale, -1, h)
+            # Vertical span joining each pixel column to its neighbour: a connected 2 px wide line.
+            r_next = np.append(r[1:], r[-1])
+            lo = np.floor(np.minimum(r, r_next)) - 0.5
+            hi = np.ceil(np.maximum(r, r_next)) + 0.5
+            mask = (self._row_grid >= lo) & (self._row_grid <= hi)
+            box[mask] = self._colors[k % len(self._colors)]
+
+    def _draw_image(self, frame, box):
+        if frame.ndim == 3:
+            frame = frame[..., 0]    # ensemble batch: show the first member
+        if frame.ndim == 1:
+            n = int(round(np.sqrt(frame.size)))
+            frame = frame.reshape(n, n)
+        if self._src_rows is None or self._src_shape != frame.shape:
+            # Nearest-neighbour maps from axes pixels to frame cells (row 0 at the top).
+            img_h, img_w = frame.shape[::-1] if self.indexing == "ij" else frame.shape
+            h, w = self.box_shape
+            self._src_rows = ((img_h - 1) - (np.arange(h) * img_h) // h)[:, None]
+            self._src_cols = ((np.arange(w) * img_w) // w)[None, :]
+            self._src_shape = frame.shape
+        image = frame.T if self.indexing == "ij" else frame
+        colorize(image[self._src_rows, self._src_cols], self.vmin, self.vmax, self.lut, out=box)
+
+
+class FrameWriter:
+    """
+    Background-thread encoder for RGB uint8 frames.
+
+    GIF frames are quantized (to ``palette`` if given) as they arrive and written on
+    ``close``; PNG frames are written to ``<path>/frame_00000.png``, ... as
+    they arrive. ``put`` blocks once ``max_pending`` frames are queued.
+    """
+
+    def __init__(self, path, fmt="gif", fps=20, max_pending=8, palette=None):
+        if fmt not in ANIMATION_FORMATS:
+            raise ValueError(f"Unknown animation format: {fmt!r} (expected one of {ANIMATION_FORMATS})")
+        self.path = path
+        self.fmt = fmt
+        self.fps = fps
+        self.palette = palette
+        self.n_frames = 0
+        self._frames = []
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        if fmt == "png":
+            os.makedirs(path, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, rgb, label=None, anchor=None):
+        """Queue an RGB frame (the array is handed over, not copied)."""
+        if self._error is not None:
+            raise RuntimeError("Frame writer failed") from self._error
+        self._queue.put((rgb, label, anchor))
+
+    def _run(self):
+        from PIL import Image, ImageDraw
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                rgb, label, anchor = item
+                image = Image.fromarray(rgb)
+                if label:
+                    ImageDraw.Draw(image).text(anchor or (rgb.shape[1] / 2, 4), label, fill=(0, 0, 0), anchor="md")
+                if self.fmt == "png":
+                    image.save(os.path.join(self.path, f"frame_{self.n_frames:05d}.png"), compress_level=1)
+                elif self.palette is not None:
+                    self._frames.append(image.quantize(palette=self.palette, dither=Image.Dither.NONE))
+                else:
+                    self._frames.append(image.quantize(colors=255, method=Image.Quantize.FASTOCTREE))
+                self.n_frames += 1
+            except Exception as exc:  # re-raised in the producer thread
+                self._error = exc
+
+    def close(self):
+        """Wait for queued frames and finish the file."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._error is not None:
+            raise RuntimeError("Frame writer failed") from self._error
+        if self.fmt == "gif" and self._frames:
+            first, *rest = self._frames
+            first.save(self.path, save_all=True, append_images=rest,
+                       duration=int(round(1000 / self.fps)), loop=0, optimize=False)
+            self._frames = []
+
+
+class StreamingAnimation:
+    """
+    Renders frames as the solver produces them, keeping about ``max_frames``
+    evenly spaced ones out of ``expected_frames``.
+
+    Args:
+        path (str): Output GIF file, or folder for a PNG sequence.
+        x: Grid points (1D) or (x, y) axes (2D).
+        u0 (np.ndarray): First frame; sets the value range unless ``value_range`` is given.
+        expected_frames (int): Number of times ``add`` will be called (for subsampling).
+        max_frames (int): Target number of rendered frames.
+        dim (int): Spatial dimension of the frames.
+        fmt (str): "gif" or "png".
+        fps (int): Frame rate of the GIF.
+        value_range (tuple, optional): Fixed (vmin, vmax).
+        cmap (str): Colormap for 2D frames.
+        indexing (str): Layout of 2D frames ("ij" or "xy").
+    """
+
+    def __init__(self, path, x, u0, expected_frames, max_frames=100, dim=1, fmt="gif", fps=20,
+                 value_range=None, cmap="viridis", indexing="ij", title="Heat Diffusion"):
+        u0 = np.asarray(u0)
+        if value_range is None:
+            lo, hi = float(np.min(u0)), float(np.max(u0))
+            value_range = (min(0.0, lo), 1.1 * hi if hi > 0 else hi + 1.0) if dim == 1 else (lo, hi)
+        self.canvas = FrameCanvas(x, value_range, dim=dim, indexing=indexing, cmap=cmap)
+        self.writer = FrameWriter(path, fmt=fmt, fps=fps, palette=self.canvas.palette() if fmt == "gif" else None)
+        self.title = title
+        self.keep = set(frame_indices(max(1, expected_frames), max_frames).tolist())
+        self.n_seen = 0
+        self.last_rendered = None
+
+    def add(self, u, t, force=False):
+        """Offer the next frame; it is rendered if it falls on the subsampling grid (or ``force``)."""
+        index = self.n_seen
+        self.n_seen += 1
+        if force or index in self.keep:
+            self.writer.put(self.canvas.render(u), f"{self.title} at t = {t:.3f}", self.canvas.title_anchor)
+            self.last_rendered = index
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render_animation(frames, path, x, dim=1, max_frames=100, times=None, dt=None, **kwargs):
+    """
+    Render stored frames (array, list or SnapshotReader) to a GIF or PNG
+    sequence, reading only the subsampled frames.
+    """
+    n = len(frames)
+    times = getattr(frames, "times", None) if times is None else times
+    indices = frame_indices(n, max_frames)
+    anim = StreamingAnimation(path, x, frames[0], expected_frames=len(indices), max_frames=len(indices),
+                              dim=dim, **kwargs)
+    with anim:
+        for i in indices:
+            t = times[i] if times is not None else i * (dt or 1.0)
+            anim.add(frames[i], t)
+    return indices
@@ -0,0 +1,263 @@
+"""
+sweep.py
+--------
+Parameter sweeps around ``run_simulation``.
+
+A sweep file names a base config and the parameters to vary (dotted config
+keys), sampled on a full grid or by Latin hypercube:
+
+    base_config: config.yaml
+    output_root: sweeps/alpha_width
+    sampling: grid            # grid | lhs
+    samples: 16               # lhs only
+    seed: 0                   # lhs only
+    workers: 4
+    blas_threads: 1
+    warm_start: runs/base/checkpoint.npz   # optional: initial field of every run
+    parameters:
+      pde.alpha: [0.5, 1.0, 2.0]            # grid: list of values
+      initial_condition.width: [0.25, 0.5]  # lhs: [low, high] or {low, high, log}
+    overrides:                # applied to every run
+      output.save_animation: false
+
+Runs are distributed over a ProcessPoolExecutor. Each run writes to its own
+folder ``<output_root>/<run_id>`` and records ``result.json`` there; runs
+that already have a successful result are skipped, so an interrupted sweep
+resumes where it stopped. The final diagnostics of all runs are collected
+into ``<output_root>/results.csv``. Runs with ``time.checkpoint_every`` set
+also continue from their last checkpoint instead of restarting, and
+``warm_start`` starts every run from the field of an earlier checkpoint
+(e.g. an equilibrated state) instead of the configured initial condition.
+
+Worker processes stay alive across runs, so the Laplacian and factorization
+caches of one run are reused by later runs on the same grid. BLAS/OpenMP
+pools are pinned to ``blas_threads`` threads per worker to avoid
+oversubscribing the machine.
+
+Usage:
+    python sweep.py sweep.yaml [--workers 8] [--no-resume]
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import yaml
+
+from src.utils.config_loader import apply_overrides, load_config
+
+BLAS_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                    "BLIS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+SAMPLING_METHODS = ("grid", "lhs")
+
+
+def grid_samples(parameters):
+    """Cartesian product of the value lists in ``parameters``."""
+    keys = list(parameters)
+    return [dict(zip(keys, values)) for values in itertools.product(*(parameters[k] for k in keys))]
+
+
+def lhs_samples(parameters, n, seed=None):
+    """
+    Latin-hypercube samples: each parameter range is split into ``n`` equal
+    strata and every stratum is used exactly once.
+
+    A range is ``[low, high]`` or ``{low, high, log}``; integer bounds give
+    integer samples (e.g. grid.N).
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for key, spec in parameters.items():
+        if isinstance(spec, dict):
+            low, high, log = spec["low"], spec["high"], spec.get("log", False)
+        else:
+            (low, high), log = spec, False
+        u = (rng.permutation(n) + rng.random(n)) / n
+        if log:
+            values = np.exp(np.log(low) + u * (np.log(high) - np.log(low)))
+        else:
+            values = low + u * (high - low)
+        if isinstance(low, int) and isinstance(high, int):
+            columns[key] = [int(round(v)) for v in values]
+        else:
+            columns[key] = [float(v) for v in values]
+    return [{key: columns[key][i] for key in parameters} for i in range(n)]
+
+
+def expand_sweep(spec):
+    """Parameter dicts of all runs described by a sweep spec."""
+    sampling = spec.get("sampling", "grid")
+    parameters = spec.get("parameters", {})
+    if sampling == "grid":
+        return grid_samples(parameters)
+    if sampling == "lhs":
+        return lhs_samples(parameters, int(spec["samples"]), seed=spec.get("seed"))
+    raise ValueError(f"Unknown sampling method: {sampling!r} (expected one of {SAMPLING_METHODS})")
+
+
+def run_id(index, params):
+    """Folder name of a run: position in the sweep plus a short hash of its parameters."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:8]
+    return f"run_{index:04d}_{digest}"
+
+
+def load_result(folder):
+    path = os.path.join(folder, "result.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _pin_worker_threads(n_threads):
+    """Process-pool initializer: limit BLAS/OpenMP pools that are already loaded."""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(n_threads)
+
+
+def run_one(cfg, params, folder, resume=True):
+    """
+    Run one simulation of the sweep (in a worker process) and record its
+    result in ``folder/result.json``. With ``resume``, a checkpoint left in
+    ``folder`` by an interrupted attempt is continued.
+    """
+    from main import run_simulation
+
+    os.makedirs(folder, exist_ok=True)
+    cfg = apply_overrides(cfg, {
+        "output.folder": os.path.abspath(folder),
+        "output.save_diagnostics": True,
+        "diagnostics.save_yaml": True,
+    })
+    result = {"params": params, "status": "ok", "error": None}
+    start = time.perf_counter()
+    try:
+        run_simulation(cfg, resume=resume)
+        with open(os.path.join(folder, "diagnostics_summary.yaml")) as f:
+            summary = yaml.safe_load(f)
+        result["final"] = {name: stats["final"] for name, stats in summary.items() if isinstance(stats, dict)}
+    except Exception as exc:  # recorded and retried on resume
+        result.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+    result["wall_time"] = time.perf_counter() - start
+    _write_json(os.path.join(folder, "result.json"), result)
+    return result
+
+
+def collect_results(output_root, run_ids):
+    """Gather ``result.json`` of the given runs into ``results.csv``; returns the rows."""
+    rows = []
+    for rid in run_ids:
+        result = load_result(os.path.join(output_root, rid))
+        if result is None:
+            continue
+        row = {"run_id": rid, "status": result["status"], "wall_time": result.get("wall_time")}
+        row.update(result["params"])
+        row.update({f"final_{k}": v for k, v in (result.get("final") or {}).items()})
+        row["error"] = result.get("error")
+        rows.append(row)
+
+    fields = []
+    for row in rows:
+        fields.extend(k for k in row if k not in fields)
+    with open(os.path.join(output_root, "results.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def run_sweep(spec, workers=None, resume=True, log=print):
+    """
+    Execute a sweep spec (dict, see module docstring).
+
+    Args:
+        spec (dict): Sweep description.
+        workers (int, optional): Number of worker processes (default: spec or CPU count).
+        resume (bool): Skip runs that already have a successful result.json.
+        log (callable): Progress output.
+    Returns:
+        list[dict]: Rows of the results table.
+    """
+    base_dir = spec.get("_base_dir", ".")
+    base_cfg = load_config(os.path.join(base_dir, spec.get("base_config", "config.yaml")))
+    base_cfg = apply_overrides(base_cfg, spec.get("overrides", {}))
+    if spec.get("warm_start"):
+        base_cfg = apply_overrides(base_cfg, {
+            "initial_condition.from_checkpoint": os.path.abspath(os.path.join(base_dir, spec["warm_start"]))})
+    output_root = os.path.abspath(os.path.join(base_dir, spec.get("output_root", "sweeps")))
+    os.makedirs(output_root, exist_ok=True)
+
+    runs = [(run_id(i, params), params) for i, params in enumerate(expand_sweep(spec))]
+    with open(os.path.join(output_root, "sweep.yaml"), "w") as f:
+        yaml.safe_dump({k: v for k, v in spec.items() if not k.startswith("_")}, f, sort_keys=False)
+
+    pending = []
+    for rid, params in runs:
+        done = load_result(os.path.join(output_root, rid)) if resume else None
+        if done is None or done["status"] != "ok":
+            pending.append((rid, params))
+    log(f"{len(runs)} runs, {len(runs) - len(pending)} already done, {len(pending)} to run")
+
+    workers = workers or spec.get("workers") or os.cpu_count() or 1
+    blas_threads = int(spec.get("blas_threads", 1))
+    # Spawned workers read the thread limits from the environment before loading BLAS.
+    saved_env = {var: os.environ.get(var) for var in BLAS_THREAD_VARS}
+    os.environ.update({var: str(blas_threads) for var in BLAS_THREAD_VARS})
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, max(1, len(pending))),
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_pin_worker_threads, initargs=(blas_threads,)) as pool:
+            futures = {pool.submit(run_one, apply_overrides(base_cfg, params), params,
+                                   os.path.join(output_root, rid), resume): rid
+                       for rid, params in pending}
+            try:
+                for n, future in enumerate(as_completed(futures), 1):
+                    result = future.result()
+                    log(f"[{n}/{len(pending)}] {futures[future]} {result['status']} "
+                        f"({result['wall_time']:.2f}s)" + (f": {result['error']}" if result["error"] else ""))
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        for var, value in saved_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+        rows = collect_results(output_root, [rid for rid, _ in runs])
+        log(f"Results table: {os.path.join(output_root, 'results.csv')}")
+    return rows
+
+
+def load_sweep(path):
+    with open(path) as f:
+        spec = yaml.safe_load(f)
+    spec["_base_dir"] = os.path.dirname(os.path.abspath(path))
+    return spec
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a parameter sweep")
+    parser.add_argument("sweep", type=str, help="Path to sweep file")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--no-resume", action="store_true", help="Re-run runs that already have results")
+    args = parser.parse_args()
+
+    run_sweep(load_sweep(args.sweep), workers=args.workers, resume=not args.no_resume)
@@ -0,0 +1,45 @@
+import contextlib
+import os
+
+import pytest
+from src.utils.config_loader import apply_overrides, load_config
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+# A small, quiet 1D run: tests override only what they exercise.
+TEST_RUN = {"dimension": 1, "grid.N": 32, "time.dt": 1e-3, "time.steps": 40, "output.save_every": 3,
+            "output.save_animation": False, "output.plot_profile": False, "diagnostics.format": "npz"}
+
+
+@pytest.fixture
+def make_cfg():
+    """``make_cfg(folder, **overrides)``: config.yaml with TEST_RUN and ``overrides`` applied, writing to ``folder``."""
+    base = load_config(CONFIG_PATH)
+
+    def make(folder, **overrides):
+        return apply_overrides(base, {**TEST_RUN, "output.folder": str(folder), **overrides})
+
+    return make
+
+
+@pytest.fixture
+def interrupt_at(monkeypatch):
+    """
+    ``with interrupt_at(stepper_cls, n):`` a KeyboardInterrupt is raised from the
+    ``n``-th ``stepper_cls.step`` call inside the block (which must be interrupted).
+    """
+    @contextlib.contextmanager
+    def interrupt(stepper_cls, n):
+        step, calls = stepper_cls.step, []
+
+        def failing_step(self, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == n:
+                raise KeyboardInterrupt
+            return step(self, *args, **kwargs)
+
+        with monkeypatch.context() as m:
+            m.setattr(stepper_cls, "step", failing_step)
+            with pytest.raises(KeyboardInterrupt):
+                yield
+
+    return interrupt
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.amr import FACES, AMRStepper, BlockMesh, prolong, restrict
+from src.core.engine import Grid, build_model
+from src.numerics.laplacian_nd import grid_coordinates
+
+N, L = 64, 10.0
+X0, H = grid_coordinates(N, L)
+
+
+def blob(X, Y):
+    return np.exp(-(X**2 + Y**2) / 0.1)
+
+
+def make_stepper(**options):
+    model = build_model("heat", {"alpha": 1.0}, Grid((N, N), (H, H), "periodic", "sparse", 2))
+    options = {"initial": blob, "origin": X0[0], "block_size": 8, "max_level": 2, **options}
+    stepper = AMRStepper(model, **options)
+    X, Y = np.meshgrid(X0, X0, indexing="ij")
+    return stepper, stepper.load(blob(X, Y).reshape(-1))
+
+
+def assert_balanced(mesh):
+    for key in mesh.leaves:
+        for axis, side in FACES:
+            kind, other = mesh.neighbour(key, axis, side)
+            assert all(k in mesh.leaves for k in (other if kind == "fine" else (other,)))
+
+
+def test_transfer_operators_are_conservative():
+    padded = np.random.default_rng(0).standard_normal((10, 10))
+    fine = prolong(padded)
+    assert np.allclose(restrict(fine), padded[1:-1, 1:-1])
+    linear = np.add.outer(np.arange(10.0), 2 * np.arange(10.0))
+    assert np.allclose(prolong(linear)[::2, ::2], linear[1:-1, 1:-1] - 0.25 - 0.5)  # exact for linear data
+
+
+def test_refinement_follows_the_feature_and_conserves_mass():
+    stepper, u = make_stepper()
+    mesh = stepper.mesh
+    assert mesh.finest_level == 2 and mesh.n_cells < (4 * N) ** 2 / 5
+    assert_balanced(mesh)
+    assert u.sum() * H**2 == pytest.approx(mesh.mass(), rel=1e-14)
+    mass = mesh.mass()
+    for k in range(40):
+        u = stepper.step(u, None, k * 5e-3, 5e-3)
+    assert_balanced(mesh)
+    assert mesh.mass() == pytest.approx(mass, rel=1e-13)
+    assert u.sum() * H**2 == pytest.approx(mass, rel=1e-13)
+    # The blob has spread: smooth blocks are merged again.
+    refined, coarsened = mesh.regrid(1.0, 0.5)
+    assert refined == 0 and coarsened > 0 and mesh.mass() == pytest.approx(mass, rel=1e-13)
+
+
+def test_amr_approaches_the_fine_grid_solution():
+    stepper, u = make_stepper()
+    T = 0.05
+    for k in range(10):
+        u = stepper.step(u, None, k * T / 10, T / 10)
+    # Exact solution of the semi-discrete problem on the uniform grid of the finest level.
+    n_fine = 4 * N
+    centres = X0[0] - H / 2 + (np.arange(n_fine) + 0.5) * H / 4
+    Xf, Yf = np.meshgrid(centres, centres, indexing="ij")
+    fine = build_model("heat", {"alpha": 1.0}, Grid((n_fine, n_fine), (H / 4, H / 4), "periodic", "spectral", 2))
+    ref = restrict(fine.propagate(blob(Xf, Yf).reshape(-1), T).reshape(n_fine, n_fine), 4)
+    coarse = build_model("heat", {"alpha": 1.0}, Grid((N, N), (H, H), "periodic", "spectral", 2))
+    X, Y = np.meshgrid(X0, X0, indexing="ij")
+    coarse_error = np.max(np.abs(coarse.propagate(blob(X, Y).reshape(-1), T).reshape(N, N) - ref))
+    assert np.max(np.abs(u.reshape(N, N) - ref)) < coarse_error / 10
+
+
+def test_checkpoint_state_round_trip():
+    stepper, u = make_stepper(indicator="curvature")
+    for k in range(3):
+        u = stepper.step(u, None, k * 1e-2, 1e-2)
+    restored, _ = make_stepper(indicator="curvature")
+    restored.load_state(stepper.state_dict(), u)
+    a, b = stepper.step(u, None, 0.03, 1e-2), restored.step(u, None, 0.03, 1e-2)
+    assert np.array_equal(a, b)
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError, match="must divide grid.N"):
+        BlockMesh(60, 0.1, block_size=16)
+    with pytest.raises(ValueError, match="multiple of 2\\*\\*max_level"):
+        BlockMesh(64, 0.1, block_size=8, max_level=4)
+    nlse = build_model("nlse", {"alpha": 1.0, "beta": 1.0}, Grid((N, N), (H, H), "periodic", "sparse", 2))
+    with pytest.raises(ValueError, match="heat equation"):
+        AMRStepper(nlse)
+
+
+AMR_RUN = {"dimension": 2, "time.dt": 2e-3, "time.steps": 20, "initial_condition.width": 0.3,
+           "output.save_every": 5, "amr": {"enabled": True, "block_size": 8, "max_level": 2}}
+
+
+def test_main_with_amr(tmp_path, make_cfg):
+    cfg = make_cfg(tmp_path, **AMR_RUN)
+    history = run_simulation(cfg)
+    assert len(history) == 5
+    with np.load(tmp_path / "diagnostics_tracked.npz") as diagnostics:
+        mass = diagnostics["mass"]
+        assert np.allclose(mass, mass[0], rtol=1e-13, atol=0)
+        assert diagnostics["amr_finest_level"][-1] == 2
+
+
+def test_main_with_amr_ignores_adaptive_methods(tmp_path, make_cfg):
+    fixed = run_simulation(make_cfg(tmp_path / "rk4", **AMR_RUN, **{"integrator.method": "rk4"}))
+    adaptive = run_simulation(make_cfg(tmp_path / "rk45", **AMR_RUN, **{"integrator.method": "rk45"}))
+    assert np.array_equal(adaptive.times, fixed.times) and np.array_equal(adaptive.load(), fixed.load())
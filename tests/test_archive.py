@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.time_integrators import RK4Stepper
+from src.utils.archive import ArchiveFrames, decode_chunk, encode_chunk, open_archive
+from src.utils.result_cache import is_cacheable
+from src.utils.snapshots import make_snapshot_sink, open_snapshots
+from src.visualization.render import render_animation
+
+
+ARCHIVE = {"output.snapshot_format": "archive"}
+
+
+def heat_frames(n=21, N=48, dtype=float):
+    x = np.linspace(-5, 5, N)
+    X, Y = np.meshgrid(x, x, indexing="ij")
+    return x, np.array([np.exp(-(X**2 + Y**2) / (1 + 0.2 * k)) for k in range(n)]).astype(dtype)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.complex128])
+def test_lossless_round_trip_and_random_access(tmp_path, dtype):
+    _, frames = heat_frames(dtype=dtype)
+    frames = frames * (1 + 1j) if np.iscomplexobj(frames) else frames
+    sink = make_snapshot_sink("archive", str(tmp_path / "snap"), frames.shape[1:], dtype=dtype,
+                              chunk_frames=4, compression="zlib")
+    for k, frame in enumerate(frames):
+        sink.append(frame, 0.1 * k)
+    sink.close()
+    with open_snapshots(str(tmp_path / "snap.snap")) as reader:
+        assert len(reader) == 21 and reader.frame_shape == (48, 48) and reader[0].dtype == dtype
+        assert np.array_equal(reader[13], frames[13]) and np.array_equal(reader[-1], frames[-1])
+        assert np.array_equal(reader[2:19:5], frames[2:19:5])
+        assert np.array_equal(reader.load(), frames)
+        assert np.allclose(reader.times, 0.1 * np.arange(21))
+    # A smooth history compresses well below its raw size.
+    assert (tmp_path / "snap.snap").stat().st_size < frames.nbytes / 2
+
+
+def test_frame_access_decodes_one_chunk(tmp_path, monkeypatch):
+    _, frames = heat_frames()
+    with make_snapshot_sink("archive", str(tmp_path / "snap"), (48, 48), chunk_frames=5) as sink:
+        for k, frame in enumerate(frames):
+            sink.append(frame, k)
+    decoded = []
+    monkeypatch.setattr(ArchiveFrames, "_chunk", lambda self, c, chunk=ArchiveFrames._chunk: decoded.append(c)
+                        or chunk(self, c))
+    with open_archive(str(tmp_path / "snap.snap")) as reader:
+        assert np.array_equal(reader[17], frames[17])
+    assert decoded == [3]
+
+
+@pytest.mark.parametrize("precision, tol", [("float16", 1e-3), ("quantize16", 2e-5), ("quantize8", 4e-3)])
+def test_lossy_precision_bounds(precision, tol):
+    _, frames = heat_frames(n=6)
+    payload, meta = encode_chunk(frames, precision)
+    decoded = decode_chunk(payload, meta, 6, frames.shape[1:], frames.dtype, precision)
+    assert decoded.dtype == frames.dtype and np.max(np.abs(decoded - frames)) < tol
+    assert len(payload) < len(encode_chunk(frames)[0])
+    with pytest.raises(ValueError, match="Unknown archive precision"):
+        encode_chunk(frames, "bfloat16")
+
+
+def test_downsampled_archive_renders_with_its_grid(tmp_path):
+    x, frames = heat_frames(n=8, N=49)
+    sink = make_snapshot_sink("archive", str(tmp_path / "snap"), (49, 49), downsample=4, precision="float16",
+                              coordinates=x, spatial_ndim=2, metadata={"run": "test"})
+    for k, frame in enumerate(frames):
+        sink.append(frame, k)
+    with sink.reader() as reader:
+        assert reader.frame_shape == (13, 13) and reader.metadata == {"run": "test"}
+        assert np.array_equal(reader.x[0], x[::4])
+        assert np.allclose(reader[5], frames[5, ::4, ::4], atol=1e-3)
+        render_animation(reader, str(tmp_path / "png"), reader.x, dim=2, max_frames=3, fmt="png")
+    assert len(list((tmp_path / "png").iterdir())) == 3
+
+
+def test_unfinished_archive_is_readable(tmp_path):
+    _, frames = heat_frames(n=10)
+    sink = make_snapshot_sink("archive", str(tmp_path / "snap"), (48, 48), chunk_frames=4)
+    for k, frame in enumerate(frames):
+        sink.append(frame, k)
+    sink.flush()  # e.g. at a checkpoint; the run then dies without writing the index
+    with open_archive(str(tmp_path / "snap.snap")) as reader:
+        assert len(reader) == 10 and np.array_equal(reader.load(), frames)
+    sink.close()
+
+
+def test_main_stores_config_and_diagnostics(tmp_path, make_cfg):
+    cfg = make_cfg(tmp_path, **ARCHIVE, **{"output.archive": {"precision": "quantize16", "chunk_frames": 4}})
+    assert not is_cacheable(cfg) and is_cacheable(make_cfg(tmp_path, **ARCHIVE))
+    history = run_simulation(cfg)
+    with np.load(tmp_path / "diagnostics_tracked.npz") as diagnostics:
+        assert len(history) == 15 and history.metadata["config"]["grid"]["N"] == 32
+        assert np.array_equal(history.x, np.asarray(history.header["axes"]))
+        assert history.tables == ("diagnostics",)
+        stored = history.table("diagnostics")
+        assert set(stored) == set(diagnostics.files)
+        assert np.array_equal(stored["mass"], diagnostics["mass"])
+    history.close()
+
+
+def test_resume_continues_the_archive(tmp_path, interrupt_at, make_cfg):
+    overrides = {**ARCHIVE, "time.checkpoint_every": 10}
+    reference = run_simulation(make_cfg(tmp_path / "full", **overrides))
+    cfg = make_cfg(tmp_path / "resumed", **overrides)
+    with interrupt_at(RK4Stepper, 26):
+        run_simulation(cfg)
+    resumed = run_simulation(cfg, resume=True)
+    assert np.array_equal(resumed.times, reference.times)
+    assert np.array_equal(resumed.load(), reference.load())
@@ -0,0 +1,16 @@
+from benchmarks.suite import BENCHMARKS, compare_results, run_suite
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"results": {"a": {"best": 1.0}, "b": {"best": 1.0}, "c": {"best": 1.0}}}
+    current = {"results": {"a": {"best": 1.2}, "b": {"best": 1.5}, "c": {"best": 0.5}, "new": {"best": 1.0}}}
+    status = {row["name"]: row["status"] for row in compare_results(current, baseline, threshold=0.25)}
+    assert status == {"a": "ok", "b": "regression", "c": "improvement"}
+
+
+def test_suite_runs_and_records_results():
+    assert "laplacian_setup_1d[N=4096]" in BENCHMARKS
+    doc = run_suite("laplacian_setup_1d[N=4096]", repeat=2, min_time=0.01, log=lambda *_: None)
+    result = doc["results"]["laplacian_setup_1d[N=4096]"]
+    assert result["repeat"] == 2 and 0 < result["best"] <= result["median"]
+    assert doc["meta"]["numpy"]
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.implicit_integrators import BDF2Stepper
+from src.core.time_integrators import DormandPrince45, RK4Stepper
+from src.utils.checkpoint import config_hash, load_checkpoint, save_checkpoint
+from src.utils.config_loader import apply_overrides
+
+
+def interrupted_then_resumed(cfg, interrupt_at, stepper_cls, fail_at):
+    with interrupt_at(stepper_cls, fail_at):
+        run_simulation(cfg)
+    return run_simulation(cfg, resume=True), np.load(os.path.join(cfg["output"]["folder"], "diagnostics_tracked.npz"))
+
+
+@pytest.mark.parametrize("method, stepper_cls, every, fail_at, snapshot_format", [
+    ("rk4", RK4Stepper, 10, 26, "npy"),
+    ("rk45", DormandPrince45, 2, 6, "npy"),
+    ("bdf2", BDF2Stepper, 10, 26, "hdf5"),  # two-step history; hdf5 recovery of the stored frames
+])
+def test_resume_continues_exactly(tmp_path, interrupt_at, make_cfg, method, stepper_cls, every, fail_at,
+                                  snapshot_format):
+    overrides = {"integrator.method": method, "time.checkpoint_every": every,
+                 "output.snapshot_format": snapshot_format}
+    reference = run_simulation(make_cfg(tmp_path / "full", **overrides))
+    ref_diag = np.load(tmp_path / "full" / "diagnostics_tracked.npz")
+    resumed, diag = interrupted_then_resumed(make_cfg(tmp_path / "resumed", **overrides), interrupt_at,
+                                             stepper_cls, fail_at)
+
+    assert np.array_equal(resumed.times, reference.times)
+    assert np.array_equal(resumed.load(), reference.load())
+    assert set(diag.files) == set(ref_diag.files)
+    for name in ("time", "mass", "min", "l2_error"):
+        assert np.array_equal(diag[name], ref_diag[name])
+
+
+def test_checkpoint_round_trip_and_config_hash(tmp_path, make_cfg):
+    path = str(tmp_path / "checkpoint.npz")
+    save_checkpoint(path, np.arange(4.0), 7, 0.07, "abc", stepper={"dt_next": 0.01, "dt_last": None})
+    state = load_checkpoint(path)
+    assert state["step"] == 7 and state["config_hash"] == "abc"
+    assert state["stepper"] == {"dt_next": 0.01}
+
+    cfg = make_cfg(tmp_path, **{"time.checkpoint_every": 10})
+    assert config_hash(cfg) == config_hash(apply_overrides(cfg, {"output.folder": "elsewhere",
+                                                                 "time.checkpoint_every": 5}))
+    assert config_hash(cfg) != config_hash(apply_overrides(cfg, {"pde.alpha": 2.0}))
+    with pytest.raises(ValueError):
+        run_simulation(apply_overrides(cfg, {"time.steps": 10}))  # writes a checkpoint at step 10
+        run_simulation(apply_overrides(cfg, {"time.steps": 10, "pde.alpha": 2.0}), resume=True)
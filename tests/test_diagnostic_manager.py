@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from src.utils.diagnostic_manager import DiagnosticManager
+
+
+def test_fused_reductions_match_numpy():
+    rng = np.random.default_rng(1)
+    u_ref = rng.random(50_000)                 # spans several reduction blocks
+    dm = DiagnosticManager(dx=0.1, dy=0.2, u_ref=u_ref, chunk_size=3)
+    fields = [u_ref + 0.01 * k * rng.standard_normal(u_ref.size) for k in range(7)]
+    for k, u in enumerate(fields):
+        dm.track_step(u, 0.5 * k, nfev=k)
+    cols = dm.columns()
+    assert len(dm) == 7 and list(cols) == ["time", "min", "max", "mean", "mass", "l2_error", "nfev"]
+    assert np.allclose(cols["min"], [u.min() for u in fields])
+    assert np.allclose(cols["max"], [u.max() for u in fields])
+    assert np.allclose(cols["mass"], [u.sum() * 0.02 for u in fields])
+    assert np.allclose(cols["l2_error"], [np.sqrt(np.sum((u - u_ref) ** 2) * 0.02) for u in fields])
+    assert np.array_equal(cols["nfev"], np.arange(7))
+
+
+def test_every_and_1d_cell_volume():
+    dm = DiagnosticManager(dx=0.5, track=("mass",), every=3)
+    for k in range(10):
+        dm.track_step(np.ones(4), float(k))
+    assert np.array_equal(dm.columns()["time"], [0.0, 3.0, 6.0, 9.0])
+    assert np.allclose(dm.columns()["mass"], 2.0)   # sum(u) * dx, no dy in 1D
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npz"])
+def test_save_roundtrip(tmp_path, fmt):
+    dm = DiagnosticManager(dx=1.0, track=("min", "max"))
+    for k in range(5):
+        dm.track_step(np.arange(3.0) + k, k)
+    path = str(tmp_path / f"diag.{fmt}")
+    dm.save(path)
+    if fmt == "csv":
+        table = np.genfromtxt(path, delimiter=",", names=True)
+        assert np.array_equal(table["max"], np.arange(5) + 2)
+    else:
+        assert np.array_equal(np.load(path)["min"], np.arange(5))
+    dm.save_yaml(str(tmp_path / "summary.yaml"))
+    assert dm.summary()["max"]["final"] == 6.0
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.direct_solvers import expm_action, null_weights, steady_state
+from src.core.engine import Grid, TimeLoop, build_model, make_stepper
+from src.core.pde_systems import LinearPDESystem2D
+from src.numerics.laplacian_nd import grid_coordinates, laplacian_matrix
+from src.numerics.multigrid import MultigridPreconditioner, coarsens
+
+
+def zero_mean_source(shape, bc, seed=0):
+    f = np.random.default_rng(seed).standard_normal(int(np.prod(shape)))
+    w = null_weights(shape, bc)
+    return f if w is None else f - np.dot(w, f) / np.sum(w)
+
+
+@pytest.mark.parametrize("alpha", [0.5, 0.5j, np.array([0.3, 1.0])])
+def test_expm_action_matches_the_exponential_of_the_stencil(alpha):
+    N, L = 64, 10.0
+    x, dx = grid_coordinates(N, L)
+    u0 = np.exp(-x**2)
+    if np.ndim(alpha):
+        u0 = np.column_stack([u0, np.roll(u0, 5)])
+    # The spectral symbol of the second-order stencil is -4 sin²(k dx / 2) / dx².
+    k = 2 * np.pi * np.fft.fftfreq(N, d=dx)
+    symbol = -4 * np.sin(k * dx / 2) ** 2 / dx**2
+    stencil = np.real_if_close(np.fft.ifft(np.exp(2.0 * np.multiply.outer(symbol, np.atleast_1d(alpha)))
+                                           * np.fft.fft(u0.reshape(N, -1), axis=0), axis=0)).reshape(u0.shape)
+    approx = expm_action(laplacian_matrix((N,), (dx,)), u0, 2.0, alpha)
+    assert np.allclose(approx, stencil, atol=1e-9)
+
+
+def test_affine_late_time_reaches_the_steady_state():
+    N = 33
+    x, dx = grid_coordinates(N, 4.0, "dirichlet")
+    A = laplacian_matrix((N,), (dx,), bc="dirichlet")
+    f = np.exp(-x**2)
+    late = expm_action(A, np.zeros(N), 50.0, 0.5, source=f)
+    assert np.allclose(late, steady_state(A, f, alpha=0.5, bc="dirichlet"), atol=1e-9)
+    # Against RK4 at a short time
+    model = build_model("heat", {"alpha": 0.5, "source": f}, Grid((N,), (dx,), "dirichlet", "sparse", 2))
+    loop = TimeLoop(make_stepper("rk4", model), model.rhs, np.zeros(N))
+    loop.run(1e-3, 200)
+    assert np.allclose(expm_action(A, np.zeros(N), 0.2, 0.5, source=f), loop.u, atol=1e-9)
+
+
+@pytest.mark.parametrize("bc, N", [("periodic", 32), ("dirichlet", 31), ("neumann", 33)])
+def test_steady_solvers_agree_and_keep_the_mean(bc, N):
+    shape = (N, N)
+    A = laplacian_matrix(shape, (0.2, 0.2), bc=bc)
+    f = zero_mean_source(shape, bc)
+    u0 = np.random.default_rng(1).standard_normal(N * N)
+    solutions = [steady_state(A, f, u0, 0.7, shape, bc, solver=s) for s in ("direct", "cg", "mg")]
+    for u in solutions:
+        assert np.allclose(0.7 * (A @ u), -f, atol=1e-7)
+        assert np.allclose(u, solutions[0], atol=1e-8)
+    w = null_weights(shape, bc)
+    if w is not None:
+        assert np.dot(w, solutions[0]) == pytest.approx(np.dot(w, u0))
+
+
+def test_multigrid_coarsening():
+    assert coarsens((64, 64)) and coarsens((65, 65), "neumann") and not coarsens((101, 101))
+    A = laplacian_matrix((64, 64), (0.1, 0.1))
+    assert MultigridPreconditioner(-A, (64, 64)).n_levels == 4  # 64² → 32² → 16² → 8²
+    with pytest.raises(ValueError, match="cannot coarsen"):
+        MultigridPreconditioner(-laplacian_matrix((101, 101), (0.1, 0.1)), (101, 101))
+    with pytest.raises(ValueError, match="Unknown steady-state solver"):
+        steady_state(A, solver="gmres")
+
+
+def test_source_with_nonzero_mean_has_no_steady_state():
+    A = laplacian_matrix((32,), (0.2,))
+    with pytest.raises(ValueError, match="nonzero mean"):
+        steady_state(A, np.ones(32))
+    system = LinearPDESystem2D(laplacian_matrix((16, 16), (0.2, 0.2), bc="dirichlet"), alpha=1.0)
+    assert np.all(system.steady_state((16, 16), np.ones(256), bc="dirichlet") > 0)
+
+
+def test_linear_steppers_reject_nonlinear_models():
+    model = build_model("nlse", {"alpha": 1.0, "beta": 1.0}, Grid((32,), (0.2,), "periodic", "sparse", 2))
+    for method in ("expm", "steady"):
+        with pytest.raises(ValueError, match="only solves linear PDEs"):
+            make_stepper(method, model)
+
+
+def test_runs_with_a_source(tmp_path, make_cfg):
+    source = {"pde.source": {"center": 1.0, "width": 0.5, "amplitude": 1.0, "zero_mean": True},
+              "grid.N": 64, "output.save_every": 10}
+    ref = run_simulation(make_cfg(tmp_path / "rk4", **source))
+    expm = run_simulation(make_cfg(tmp_path / "expm", **source, **{"integrator.method": "expm"}))
+    assert np.allclose(expm[-1], ref[-1], atol=1e-7)
+    steady = run_simulation(make_cfg(tmp_path / "steady", **source, **{"integrator.method": "steady",
+                                                                     "time.steps": 1}))
+    late = run_simulation(make_cfg(tmp_path / "late", **source, **{"integrator.method": "expm",
+                                                                   "time.dt": 100.0, "time.steps": 1}))
+    assert np.allclose(steady[-1], late[-1], atol=1e-7)
+    assert np.sum(steady[-1]) == pytest.approx(np.sum(ref[0]))
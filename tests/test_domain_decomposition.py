@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from src.core.domain_decomposition import TiledRK4Stepper, tile_bounds
+from src.core.rhs_examples import make_linear_rhs
+from src.core.time_integrators import RK4Stepper
+from src.numerics.stencil_laplacian import StencilLaplacian
+
+DT, STEPS = 1e-3, 10
+
+
+def serial(u0, grid_shape, spacing, alpha):
+    rhs = make_linear_rhs(StencilLaplacian(grid_shape, spacing), alpha)
+    u, stepper = u0.copy(), RK4Stepper()
+    for i in range(STEPS):
+        stepper.step(u, rhs, i * DT, DT, out=u)
+    return u
+
+
+def test_tile_bounds_cover_rows():
+    bounds = tile_bounds(10, 3)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    assert max(b - a for a, b in bounds) - min(b - a for a, b in bounds) <= 1
+
+
+@pytest.mark.parametrize("mode", ["threads", "processes"])
+@pytest.mark.parametrize("grid_shape, tiles", [((24, 20), 1), ((24, 20), 3), ((13, 8, 6), 4)])
+def test_tiled_rk4_matches_serial_bit_for_bit(mode, grid_shape, tiles):
+    spacing = tuple(0.1 + 0.05 * i for i in range(len(grid_shape)))
+    u0 = np.random.default_rng(0).random(int(np.prod(grid_shape)))
+    with TiledRK4Stepper(grid_shape, spacing, alpha=0.7, tiles=tiles, mode=mode) as stepper:
+        u = stepper.load(u0)
+        for i in range(STEPS):
+            stepper.step(u, None, i * DT, DT, out=u)
+        assert np.array_equal(u, serial(u0, grid_shape, spacing, 0.7))
+
+
+def test_tiled_rk4_ensemble_and_copy_semantics():
+    alpha = np.array([0.2, 0.5, 1.0])
+    u0 = np.random.default_rng(1).random((16 * 16, 3))
+    with TiledRK4Stepper((16, 16), (0.1, 0.1), alpha=alpha, tiles=2, mode="threads", batch_shape=(3,)) as stepper:
+        u = u0
+        for i in range(STEPS):
+            u = stepper.step(u, None, i * DT, DT)   # copies in and out
+    assert np.array_equal(u, serial(u0, (16, 16), (0.1, 0.1), alpha))
+    with pytest.raises(ValueError):
+        stepper.advance(DT)
+
+
+def test_process_tiles_after_numba_threads_exit_cleanly():
+    # Forked workers of a parent already running numba threads used to hang the interpreter at exit.
+    pytest.importorskip("numba")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import numpy as np; from src.numerics.kernels import make_kernel_rhs\n"
+            "from src.core.domain_decomposition import TiledRK4Stepper\n"
+            "make_kernel_rhs('heat', (64, 64), (0.1, 0.1), backend='numba')(np.ones(64 * 64), 0.0)\n"
+            "with TiledRK4Stepper((16, 16), (0.1, 0.1), tiles=2) as s:\n"
+            "    s.advance(1e-3, 5)\n"
+            "print('ok')")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.path.join(root, "src")]))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0 and result.stdout.strip() == "ok", result.stderr
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.engine import (INTEGRATORS, PDE_TYPES, Grid, TimeLoop, build_model, make_stepper,
+                             member_params)
+from src.core.rhs_examples import make_burgers_rhs, make_nlse_rhs
+from src.core.time_integrators import RK4Stepper
+from src.numerics.gradient_2d import make_gradient_2d
+from src.utils.diagnostic_manager import DiagnosticManager
+
+GRID_1D = Grid((32,), (0.2,), "periodic", "sparse", 2)
+GRID_2D = Grid((16, 16), (0.3, 0.3), "periodic", "sparse", 2)
+
+
+def test_registries():
+    assert {"heat", "nlse", "burgers"} <= set(PDE_TYPES)
+    assert {"euler", "rk4", "rk45", "rk23", "bdf2", "imex", "exact", "etdrk4"} <= set(INTEGRATORS)
+    with pytest.raises(ValueError, match="Unknown PDE type"):
+        build_model("wave", {}, GRID_1D)
+    with pytest.raises(ValueError, match="Unsupported integrator"):
+        make_stepper("leapfrog", build_model("heat", {}, GRID_1D))
+
+
+def test_models_match_rhs_builders():
+    u = np.random.default_rng(0).standard_normal(16 * 16)
+    nlse = build_model("nlse", {"alpha": 0.7, "beta": 2.0}, GRID_2D)
+    assert np.allclose(nlse.rhs(u, 0.0), make_nlse_rhs(nlse.L_op, alpha=0.7, beta=2.0)(u, 0.0))
+    burgers = build_model("burgers", {"nu": 0.05}, GRID_2D)
+    expected = make_burgers_rhs(burgers.L_op, make_gradient_2d(16, 16, 0.3, 0.3), nu=0.05)(u, 0.0)
+    assert np.allclose(burgers.rhs(u, 0.0), expected)
+    with pytest.raises(ValueError, match="two-dimensional"):
+        build_model("burgers", {}, GRID_1D)
+
+
+def test_complex_coefficients_and_member_params():
+    model = build_model("nlse", {"alpha": "0.5j", "beta": "-1j"}, GRID_1D)
+    assert model.dtype == np.complex128 and model.coeff == 0.5j
+    params = member_params([{"type": "heat", "alpha": 0.5}, {"type": "heat", "alpha": 2.0}])
+    assert np.array_equal(params["alpha"], [0.5, 2.0])
+    with pytest.raises(ValueError, match="share pde.type"):
+        member_params([{"type": "heat"}, {"type": "nlse"}])
+
+
+def test_time_loop_hooks_fire_at_their_strides():
+    model = build_model("heat", {"alpha": 1.0}, GRID_1D)
+    u = np.exp(-np.linspace(-3, 3, 32) ** 2)
+    reference = u.copy()
+    loop = TimeLoop(RK4Stepper(), model.rhs, u)
+    fired = {"a": [], "b": []}
+    loop.every(3, lambda step, t: fired["a"].append(step))
+    loop.every(4, lambda step, t: fired["b"].append(round(t, 12)))
+    loop.every(0, lambda step, t: pytest.fail("disabled hook fired"))
+    loop.run(1e-3, 10)
+    assert fired == {"a": [3, 6, 9], "b": [0.004, 0.008]}
+    assert loop.step == 10 and np.isclose(loop.t, 0.01)
+
+    stepper = RK4Stepper()
+    for step in range(10):
+        stepper.step(reference, model.rhs, step * 1e-3, 1e-3, out=reference)
+    assert np.array_equal(u, reference)
+
+
+def test_exact_propagator_jumps_from_the_first_state():
+    grid = GRID_1D._replace(backend="spectral")
+    model = build_model("heat", {"alpha": 0.5}, grid)
+    u0 = np.exp(-np.linspace(-3, 3, 32) ** 2)
+    loop = TimeLoop(make_stepper("exact", model), None, u0.copy())
+    loop.run(0.01, 5)
+    assert np.allclose(loop.u, model.propagate(u0, 0.05))
+    with pytest.raises(ValueError, match="linear"):
+        make_stepper("exact", build_model("nlse", {}, grid))
+
+
+def test_complex_diagnostics_use_the_modulus():
+    u = np.exp(1j * np.linspace(0, 3, 10)) * np.linspace(1, 2, 10)
+    manager = DiagnosticManager(dx=0.5, track=("min", "max", "mean", "mass"))
+    manager.record(u, 0.0)
+    cols = manager.columns()
+    assert np.isclose(cols["min"][0], 1.0) and np.isclose(cols["max"][0], 2.0)
+    assert np.isclose(cols["mass"][0], 0.5 * np.sum(np.abs(u) ** 2))
+
+
+@pytest.mark.parametrize("overrides", [
+    {"pde.type": "nlse", "pde.alpha": "0.5j", "pde.beta": "-1j"},
+    {"pde.type": "nlse", "pde.alpha": "0.5j", "pde.beta": "-1j",
+     "integrator.method": "split_step", "numerics.backend": "spectral"},
+    {"pde.type": "burgers", "dimension": 2, "grid.N": 16, "integrator.method": "imex"},
+])
+def test_cli_pde_types_run(tmp_path, make_cfg, overrides):
+    history = run_simulation(make_cfg(tmp_path, **overrides))
+    assert len(history) == 15 and np.all(np.isfinite(history[-1]))
+    if overrides["pde.type"] == "nlse":
+        # The Schrödinger form conserves the norm ∫|u|² dx.
+        mass = np.load(tmp_path / "diagnostics_tracked.npz")["mass"]
+        assert np.allclose(mass, mass[0], rtol=1e-6)
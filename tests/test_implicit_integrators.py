@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from scipy.sparse.linalg import expm_multiply
+from src.core.implicit_integrators import (BackwardEulerStepper, BDF2Stepper, CrankNicolsonStepper,
+                                           IMEXStepper, clear_factorization_cache,
+                                           factorization_cache_info)
+from src.core.rhs_examples import make_nlse_nonlinear_rhs, make_nlse_rhs
+from src.core.time_integrators import RK4Stepper
+from src.numerics.laplacian_1d import make_laplacian_1d
+
+N, L_DOMAIN, ALPHA, T_END = 64, 10.0, 0.5, 0.4
+
+
+def setup_heat():
+    dx = L_DOMAIN / N
+    x = np.linspace(-L_DOMAIN / 2, L_DOMAIN / 2, N, endpoint=False)
+    return make_laplacian_1d(N, dx), np.exp(-x**2)
+
+
+def run(stepper, rhs, u0, steps):
+    u = u0.copy()
+    dt = T_END / steps
+    for i in range(steps):
+        stepper.step(u, rhs, i * dt, dt, out=u)
+    return u
+
+
+@pytest.mark.parametrize("cls, order", [(BackwardEulerStepper, 1), (CrankNicolsonStepper, 2),
+                                        (BDF2Stepper, 2), (IMEXStepper, 2)])
+def test_heat_convergence_order(cls, order):
+    L, u0 = setup_heat()
+    exact = expm_multiply(ALPHA * T_END * L, u0)
+    errors = [np.max(np.abs(run(cls(L, alpha=ALPHA), None, u0, steps) - exact)) for steps in (20, 40)]
+    assert np.log2(errors[0] / errors[1]) > order - 0.2
+
+
+def test_imex_nlse_matches_explicit_reference():
+    L, u0 = setup_heat()
+    u0 = 0.5 * u0
+    reference = run(RK4Stepper(), make_nlse_rhs(L, alpha=ALPHA, beta=1.0), u0, 4000)
+    imex = run(IMEXStepper(L, alpha=ALPHA), make_nlse_nonlinear_rhs(beta=1.0), u0, 200)
+    assert np.max(np.abs(imex - reference)) < 1e-4
+
+
+def test_large_steps_stay_stable_and_reuse_factorization():
+    clear_factorization_cache()
+    L, u0 = setup_heat()
+    u = run(BackwardEulerStepper(L, alpha=ALPHA), None, u0, 2)   # dt ~ 3000x explicit limit
+    assert np.all(np.isfinite(u)) and u.max() <= u0.max()
+    run(BackwardEulerStepper(L, alpha=ALPHA), None, u0, 2)
+    info = factorization_cache_info()
+    assert info["misses"] == 1 and info["hits"] == 3
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from src.numerics.kernels import HAVE_NUMBA, make_kernel_rhs, resolve_kernel_backend
+
+needs_numba = pytest.mark.skipif(not HAVE_NUMBA, reason="numba not installed")
+PARAMS = dict(alpha=0.7, beta=1.3, nu=0.05)
+
+
+def _field(shape, complex_=False, seed=0):
+    rng = np.random.default_rng(seed)
+    u = rng.standard_normal(shape)
+    return u + 1j * rng.standard_normal(shape) if complex_ else u
+
+
+@needs_numba
+@pytest.mark.parametrize("pde, grid_shape, complex_", [
+    ("heat", (64,), False), ("heat", (24, 32), False),
+    ("nlse", (64,), True), ("nlse", (24, 32), False), ("nlse", (24, 32), True),
+    ("burgers", (24, 32), False),
+])
+def test_numba_kernels_match_numpy(pde, grid_shape, complex_):
+    spacing = (0.1, 0.15)[:len(grid_shape)]
+    u = _field(int(np.prod(grid_shape)), complex_)
+    ref = np.asarray(make_kernel_rhs(pde, grid_shape, spacing, "numpy", **PARAMS)(u, 0.0)).ravel()
+    fused = make_kernel_rhs(pde, grid_shape, spacing, "numba", **PARAMS)
+    out = np.empty_like(ref)
+    assert fused(u, 0.0, out=out) is out
+    assert np.allclose(out, ref, rtol=1e-12, atol=1e-10)
+
+
+@needs_numba
+def test_numba_kernel_handles_ensemble_batches():
+    alpha = np.array([0.5, 1.0, 2.0])
+    u = _field((24 * 32, 3))
+    ref = make_kernel_rhs("heat", (24, 32), (0.1, 0.1), "numpy", alpha=alpha)(u, 0.0)
+    fused = make_kernel_rhs("heat", (24, 32), (0.1, 0.1), "numba", alpha=alpha)(u, 0.0)
+    assert np.allclose(fused, ref, atol=1e-10)
+
+
+def test_resolve_kernel_backend():
+    assert resolve_kernel_backend("numpy") == "numpy"
+    assert resolve_kernel_backend("auto") == ("numba" if HAVE_NUMBA else "numpy")
+    with pytest.raises(ValueError):
+        resolve_kernel_backend("cuda")
+    with pytest.raises(ValueError):
+        make_kernel_rhs("burgers", (64,), (0.1,))
@@ -1,5 +1,5 @@
 import numpy as np
-from numerics.laplacian_1d import make_laplacian_1d
+from src.numerics.laplacian_1d import make_laplacian_1d
 
 def test_laplacian_annihilates_constant():
     N = 10
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from src.numerics.laplacian_1d import make_laplacian_1d
+from src.numerics.laplacian_2d import make_laplacian_2d
+from src.numerics.laplacian_3d import make_laplacian_3d
+from src.numerics.laplacian_nd import grid_coordinates, laplacian_cache_info
+
+
+def reference_periodic_1d(N, dx):
+    D = -2.0 * np.eye(N) + np.roll(np.eye(N), 1, axis=1) + np.roll(np.eye(N), -1, axis=1)
+    return D / dx**2
+
+
+def test_periodic_matches_dense_reference():
+    Nx, Ny, dx, dy = 6, 5, 0.4, 0.7
+    Dx, Dy = reference_periodic_1d(Nx, dx), reference_periodic_1d(Ny, dy)
+    expected = np.kron(np.eye(Ny), Dx) + np.kron(Dy, np.eye(Nx))
+    assert np.allclose(make_laplacian_1d(Nx, dx).toarray(), Dx)
+    assert np.allclose(make_laplacian_2d(Nx, Ny, dx, dy).toarray(), expected)
+
+
+@pytest.mark.parametrize("bc", ["periodic", "dirichlet", "neumann"])
+@pytest.mark.parametrize("order", [2, 4, 6])
+def test_convergence_order(bc, order):
+    errors = []
+    for N in (32, 64):
+        x, dx = grid_coordinates(N, 2 * np.pi, bc)
+        f = np.cos(x) if bc == "neumann" else np.sin(x)
+        errors.append(np.max(np.abs(make_laplacian_1d(N, dx, bc=bc, order=order) @ f + f)))
+    assert np.log2(errors[0] / errors[1]) > order - 0.3
+
+
+def test_3d_annihilates_constant_and_is_cached():
+    L = make_laplacian_3d(6, 5, 4, 0.1, 0.2, 0.3, order=4)
+    assert L.shape == (120, 120)
+    assert np.allclose(L @ np.ones(120), 0.0)
+    hits = laplacian_cache_info().hits
+    assert make_laplacian_3d(6, 5, 4, 0.1, 0.2, 0.3, order=4) is L
+    assert laplacian_cache_info().hits == hits + 1
@@ -0,0 +1,33 @@
+import time
+
+import numpy as np
+from main import run_simulation
+from src.utils.live import LiveRun
+
+
+QUIET = {"output.save_diagnostics": False}
+
+
+def test_live_run_streams_updates(tmp_path, make_cfg):
+    run = LiveRun(make_cfg(tmp_path / "live", **QUIET), every=10, maxsize=100).start()
+    history = run.join(timeout=60)
+    updates = run.poll()
+    assert [u.step for u in updates] == [10, 20, 30, 40]
+    assert len(run.history) == 4 and "mass" in run.history[-1]
+    reference = run_simulation(make_cfg(tmp_path / "ref", **QUIET))
+    assert np.array_equal(updates[-1].u, reference[-1]) and np.array_equal(history[-1], reference[-1])
+
+
+def test_slow_consumer_gets_the_freshest_updates(tmp_path, make_cfg):
+    run = LiveRun(make_cfg(tmp_path, **QUIET), every=1, maxsize=2).start()
+    run.join(timeout=60)
+    assert [u.step for u in run.poll()] == [39, 40]
+
+
+def test_cancel_stops_the_run(tmp_path, make_cfg):
+    run = LiveRun(make_cfg(tmp_path, **QUIET, **{"time.steps": 10**7, "output.save_every": 10**6}), every=5).start()
+    assert run.latest(timeout=30) is not None
+    run.cancel()
+    start = time.perf_counter()
+    assert run.join(timeout=30) is None
+    assert run.done and run.cancelled and time.perf_counter() - start < 5
@@ -0,0 +1,85 @@
+import threading
+
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.time_integrators import RK4Stepper
+from src.utils.output_pipeline import OutputPipeline, detach
+
+
+ANIMATED = {"output.save_animation": True, "output.animation": {"max_frames": 5}}
+
+
+def output_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("output-")]
+
+
+def test_lanes_keep_order_and_run_concurrently():
+    release, log = threading.Event(), []
+    with OutputPipeline(max_pending=4) as pipeline:
+        pipeline.submit("slow", release.wait)
+        pipeline.submit("slow", log.append, "slow")
+        for i in range(3):
+            pipeline.submit("fast", log.append, i)
+        pipeline.flush("fast")
+        assert log == [0, 1, 2]  # not held up by the blocked lane
+        release.set()
+    assert log == [0, 1, 2, "slow"] and not output_threads()
+
+
+def test_submit_blocks_when_a_lane_is_full():
+    release, done = threading.Event(), threading.Event()
+    pipeline = OutputPipeline(max_pending=2)
+    pipeline.submit("io", release.wait)
+
+    def producer():
+        for _ in range(4):
+            pipeline.submit("io", lambda: None)
+        done.set()
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    assert not done.wait(0.2)
+    release.set()
+    thread.join()
+    assert done.is_set()
+    pipeline.close()
+
+
+def test_task_errors_reach_the_producer():
+    pipeline = OutputPipeline()
+    pipeline.submit("io", lambda: 1 / 0)
+    with pytest.raises(RuntimeError, match="lane 'io'") as info:
+        pipeline.flush()
+    assert isinstance(info.value.__cause__, ZeroDivisionError)
+    with pytest.raises(RuntimeError):
+        pipeline.submit("other", print)
+    pipeline.close(raise_errors=False)
+    with pytest.raises(ValueError, match="closed"):
+        pipeline.submit("io", print)
+
+
+def test_detach_copies_arrays():
+    state = {"a": np.zeros(3), "n": 2}
+    copy = detach(state)
+    state["a"][:] = 1
+    assert np.array_equal(copy["a"], np.zeros(3)) and copy["n"] == 2 and detach(None) is None
+
+
+def test_background_output_matches_serial(tmp_path, make_cfg):
+    serial = run_simulation(make_cfg(tmp_path / "serial", **ANIMATED, **{"output.background_io": False}))
+    background = run_simulation(make_cfg(tmp_path / "background", **ANIMATED, **{"output.max_pending": 1}))
+    assert np.array_equal(background.times, serial.times)
+    assert np.array_equal(background.load(), serial.load())
+    for name in ("diagnostics_tracked.npz", "heat_diffusion.gif"):
+        assert (tmp_path / "background" / name).read_bytes() == (tmp_path / "serial" / name).read_bytes()
+
+
+def test_interrupted_run_flushes_and_joins(tmp_path, interrupt_at, make_cfg):
+    cfg = make_cfg(tmp_path, **ANIMATED, **{"time.checkpoint_every": 10})
+    with interrupt_at(RK4Stepper, 35):
+        run_simulation(cfg)
+    assert not output_threads()
+    with np.load(tmp_path / "checkpoint.npz") as checkpoint:
+        # The checkpoint queued at step 30 was written, with the snapshots it refers to.
+        assert int(checkpoint["step"]) == 30 and len(checkpoint["snapshot/times"]) == 11
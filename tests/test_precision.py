@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from benchmarks.bench_precision import compare_precisions
+from main import run_simulation
+from src.core.engine import Grid, build_model, make_stepper
+from src.numerics.operators import make_laplacian
+from src.numerics.precision import flush_subnormals, real_dtype, working_dtype
+from src.utils.diagnostic_manager import DiagnosticManager
+
+
+def test_dtype_names():
+    assert real_dtype("float32") == np.float32 and real_dtype(np.complex128) == np.float64
+    assert working_dtype("float32", is_complex=True) == np.complex64
+    with pytest.raises(ValueError, match="numerics.dtype"):
+        real_dtype("float16")
+    u = np.array([1.0, 1e-40, -1e-39, 0.5], dtype=np.float32)
+    assert np.array_equal(flush_subnormals(u), [1.0, 0.0, 0.0, 0.5])
+
+
+@pytest.mark.parametrize("backend", ["sparse", "stencil", "spectral"])
+def test_operators_compute_in_single_precision(backend):
+    L32 = make_laplacian(2, 16, 0.3, backend=backend, dtype=np.float32)
+    L64 = make_laplacian(2, 16, 0.3, backend=backend)
+    u = np.random.default_rng(0).standard_normal(16 * 16)
+    assert L32.dtype == np.float32 and (L32 @ u.astype(np.float32)).dtype == np.float32
+    assert np.allclose(L32 @ u.astype(np.float32), L64 @ u, rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.parametrize("pde, params, method", [
+    ("heat", {"alpha": 0.5}, "rk45"),
+    ("heat", {"alpha": 0.5}, "crank_nicolson"),
+    ("nlse", {"alpha": "0.5j", "beta": "-1j"}, "etdrk4"),
+])
+def test_steppers_keep_the_working_precision(pde, params, method):
+    grid = Grid((32,), (0.2,), "periodic", "spectral" if method == "etdrk4" else "sparse", 2, "float32")
+    model = build_model(pde, params, grid)
+    assert model.dtype == (np.complex64 if pde == "nlse" else np.float32)
+    stepper = make_stepper(method, model)
+    u = np.exp(-np.linspace(-3, 3, 32) ** 2).astype(model.dtype)
+    assert stepper.step(u, model.rhs_for(stepper), 0.0, 1e-3).dtype == model.dtype
+
+
+def test_diagnostics_accumulate_in_double_precision():
+    u = np.full(2**20, 0.1, dtype=np.float32)
+    manager = DiagnosticManager(dx=1.0, u_ref=np.zeros_like(u), track=("mean", "mass", "l2_error"))
+    manager.record(u, 0.0)
+    cols = manager.columns()
+    exact = u.astype(np.float64)
+    assert cols["mass"][0] == pytest.approx(exact.sum(), rel=1e-12)
+    assert cols["l2_error"][0] == pytest.approx(np.sqrt(np.dot(exact, exact)), rel=1e-12)
+
+
+def test_float32_run_matches_float64(tmp_path, make_cfg):
+    run = {"grid.N": 64, "time.steps": 30, "output.save_every": 10}
+    ref = run_simulation(make_cfg(tmp_path / "f64", **run))
+    single = run_simulation(make_cfg(tmp_path / "f32", **run, **{"numerics.dtype": "float32"}))
+    assert single[-1].dtype == np.float32
+    assert np.allclose(single[-1], ref[-1], rtol=0, atol=1e-5)
+
+
+def test_precision_report():
+    row = compare_precisions("nlse", N=256, steps=20)
+    assert row["rel_error"] < 1e-5 and row["mass_drift"]["float64"] < 1e-10
+    assert set(row["seconds"]) == {"float64", "float32"}
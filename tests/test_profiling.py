@@ -0,0 +1,50 @@
+import json
+import threading
+
+import numpy as np
+from src.core.rhs_examples import make_linear_rhs
+from src.core.time_integrators import RK4Stepper
+from src.numerics.laplacian_1d import make_laplacian_1d
+from src.utils.profiling import Profiler, profile_session, profiler
+
+
+def test_disabled_profiler_records_nothing():
+    p = Profiler()
+    with p.phase("step"):
+        p.count("rhs_evals", 4)
+    assert p.phase("a") is p.phase("b")          # shared no-op context
+    assert p.timings == {} and p.counters == {}
+
+
+def test_updates_from_threads_are_not_lost():
+    p = Profiler()
+    p.enable()
+
+    def worker():
+        for _ in range(20000):
+            p.add_time("io", 1.0)
+            p.count("frames")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert p.timings["io"] == [80000.0, 80000] and p.counters["frames"] == 80000
+
+
+def test_session_reports_phases_counters_and_rates(tmp_path):
+    rhs = make_linear_rhs(make_laplacian_1d(64, 0.1), alpha=1.0)
+    u, stepper = np.random.default_rng(0).random(64), RK4Stepper()
+    with profile_session(str(tmp_path), memory=True, log=lambda *_: None):
+        for i in range(5):
+            with profiler.phase("step"):
+                stepper.step(u, rhs, 0.0, 1e-4, out=u)
+            profiler.count("steps")
+    assert not profiler.enabled
+
+    report = json.load(open(tmp_path / "profile.json"))
+    assert report["phases"]["step"]["calls"] == 5
+    assert report["counters"] == {"rhs_evals": 20, "matvecs": 20, "steps": 5}
+    assert report["rates"]["steps_per_s"] > 0 and report["memory"]["peak_bytes"] > 0
+    assert "step" in open(tmp_path / "profile.txt").read()
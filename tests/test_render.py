@@ -0,0 +1,30 @@
+import matplotlib
+import numpy as np
+from PIL import Image
+from src.visualization.render import colorize, colormap_lut, frame_indices, render_animation
+
+
+def test_frame_indices_keep_endpoints():
+    assert np.array_equal(frame_indices(5, 10), np.arange(5))
+    idx = frame_indices(501, 100)
+    assert idx[0] == 0 and idx[-1] == 500 and len(idx) == 100 and np.all(np.diff(idx) > 0)
+
+
+def test_colorize_matches_matplotlib_colormap():
+    frame = np.linspace(-1.0, 3.0, 12).reshape(3, 4)
+    rgb = colorize(frame, 0.0, 2.0, colormap_lut("viridis"))
+    expected = matplotlib.colormaps["viridis"](np.clip(frame / 2.0, 0, 1))[..., :3] * 255
+    assert rgb.dtype == np.uint8 and rgb.shape == (3, 4, 3)
+    assert np.max(np.abs(rgb - expected)) <= 3
+
+
+def test_render_animation_subsamples_and_writes(tmp_path):
+    x = np.linspace(-5, 5, 33)
+    frames = np.array([np.exp(-x**2 / (1 + 0.1 * k)) for k in range(40)])
+    idx = render_animation(frames, str(tmp_path / "a.gif"), x, max_frames=8, dt=0.1)
+    assert len(idx) == 8 and Image.open(tmp_path / "a.gif").n_frames == 8
+
+    X, Y = np.meshgrid(x, x, indexing="ij")
+    frames_2d = np.array([np.exp(-(X**2 + Y**2) / (1 + 0.1 * k)) for k in range(10)])
+    render_animation(frames_2d, str(tmp_path / "png"), (x, x), dim=2, max_frames=3, fmt="png")
+    assert sorted(p.name for p in (tmp_path / "png").iterdir()) == [f"frame_0000{i}.png" for i in range(3)]
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+from main import run_simulation
+from src.core.time_integrators import RK4Stepper
+from src.utils.config_loader import apply_overrides
+from src.utils.result_cache import ResultCache, result_key
+
+
+def with_cache(cache_folder):
+    """Overrides for a run that uses the result cache in ``cache_folder``."""
+    return {"time.steps": 30, "output.save_every": 2, "cache.enabled": True, "cache.folder": str(cache_folder)}
+
+
+def test_key_ignores_output_settings_except_the_stored_snapshots(make_cfg):
+    cfg = make_cfg("a", **with_cache("c"))
+    assert result_key(cfg) == result_key(apply_overrides(cfg, {"output.folder": "b", "output.save_animation": True,
+                                                               "time.checkpoint_every": 7}))
+    assert result_key(cfg) != result_key(apply_overrides(cfg, {"pde.alpha": 2.0}))
+    assert result_key(cfg) != result_key(apply_overrides(cfg, {"output.save_every": 5}))
+    assert result_key(cfg) != result_key(apply_overrides(cfg, {"output.snapshot_format": "memory"}))
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    frames = np.zeros((3, 100))
+    cache.put("a", frames[-1], frames, [0.0, 1.0, 2.0])
+    cache.max_bytes = os.path.getsize(cache.path("a")) + 1
+    cache.put("b", frames[-1], frames, [0.0, 1.0, 2.0])
+    assert cache.get("a") is None  # evicted: the cap leaves room for the newest entry only
+    assert cache.get("b")["frames"].shape == (3, 100)
+
+    cache.max_bytes = 2 * os.path.getsize(cache.path("b"))
+    cache.put("c", frames[-1], frames, [0.0, 1.0, 2.0])
+    os.utime(cache.path("b"), (0, 0))
+    cache.get("b")  # a hit makes "b" the most recently used entry
+    cache.put("d", frames[-1], frames, [0.0, 1.0, 2.0])
+    assert sorted(os.path.basename(p) for p, _, _ in cache.entries()) == ["b.npz", "d.npz"]
+
+
+def test_size_cap_holds(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1000)
+    frames = np.zeros((50, 500))
+    assert not cache.put("big", frames[-1], frames, np.arange(50.0))
+    assert cache.entries() == []
+    small = np.zeros((2, 10))
+    cache.max_bytes = len(small) * small[0].nbytes + small[0].nbytes  # fits the data, not the file overhead
+    assert not cache.put("small", small[-1], small, [0.0, 1.0])
+    assert cache.info()["bytes"] <= cache.max_bytes
+
+
+def test_second_run_is_served_from_cache(tmp_path, monkeypatch, make_cfg):
+    cfg = make_cfg(tmp_path / "run1", **with_cache(tmp_path / "cache"))
+    first = run_simulation(cfg)
+    diagnostics = dict(np.load(tmp_path / "run1" / "diagnostics_tracked.npz"))
+
+    def no_solving(*args, **kwargs):
+        pytest.fail("a cached configuration was solved again")
+
+    monkeypatch.setattr(RK4Stepper, "step", no_solving)
+    cached = run_simulation(apply_overrides(cfg, {"output.folder": str(tmp_path / "run2")}))
+    # A hit stores and returns the same snapshots as the run that filled the cache.
+    assert np.array_equal(cached.times, first.times) and np.array_equal(cached.load(), first.load())
+    assert np.array_equal(np.load(tmp_path / "run2" / "snapshots.npy"), first.load())
+    replayed = np.load(tmp_path / "run2" / "diagnostics_tracked.npz")
+    for name, column in diagnostics.items():
+        assert np.array_equal(replayed[name], column)
+
+
+def test_long_histories_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path), max_frames=2)
+    frames = np.zeros((3, 10))
+    assert not cache.put("a", frames[-1], frames, [0.0, 1.0, 2.0]) and cache.get("a") is None
+    assert cache.put("b", frames[-1], frames[:2], [0.0, 1.0]) and len(cache.get("b")["frames"]) == 2
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from src.numerics.laplacian_1d import make_laplacian_1d
+from src.pdes.heat_solver_1d import run_heat_solver_1d
+from src.utils.snapshots import count_snapshots, make_snapshot_sink, open_snapshots
+
+
+@pytest.mark.parametrize("fmt", ["memory", "npy", "hdf5"])
+@pytest.mark.parametrize("capacity", [None, 4, 100])
+def test_sink_roundtrip(tmp_path, fmt, capacity):
+    if fmt == "hdf5":
+        pytest.importorskip("h5py")
+    sink = make_snapshot_sink(fmt, str(tmp_path / "snap"), (3, 5), capacity=capacity)
+    frames = np.random.default_rng(0).random((23, 15))
+    for i, frame in enumerate(frames):
+        sink.append(frame, 0.1 * i)
+    with sink.reader() as reader:
+        assert len(reader) == 23 and reader.frame_shape == (3, 5)
+        assert np.array_equal(reader[-1], frames[-1].reshape(3, 5))
+        assert np.array_equal(reader.load(), frames.reshape(23, 3, 5))
+        assert np.allclose(reader.times, 0.1 * np.arange(23))
+        assert reader.max() == frames.max()
+
+
+def test_npy_file_loads_without_reader(tmp_path):
+    sink = make_snapshot_sink("npy", str(tmp_path / "snap"), (8,), capacity=64)
+    for i in range(5):
+        sink.append(np.full(8, i), i)
+    sink.close()
+    assert np.load(tmp_path / "snap.npy").shape == (5, 8)
+    assert len(open_snapshots(str(tmp_path / "snap.npy"))) == 5
+
+
+def test_save_every_keeps_first_and_last(tmp_path):
+    N, dx = 32, 0.1
+    u0 = np.exp(-np.linspace(-2, 2, N) ** 2)
+    L = make_laplacian_1d(N, dx)
+    full, _ = run_heat_solver_1d(u0, L, 1.0, 1e-3, 10)
+    sink = make_snapshot_sink("npy", str(tmp_path / "heat"), (N,))
+    strided, _ = run_heat_solver_1d(u0, L, 1.0, 1e-3, 10, sink=sink, save_every=4)
+    assert len(strided) == count_snapshots(10, 4) == 4
+    assert np.allclose(strided.times, [0.0, 0.004, 0.008, 0.010])
+    assert np.array_equal(strided.load(), full[[0, 4, 8, 10]])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from src.core.exponential_integrators import ETDRK4Stepper, ExactHeatStepper, SplitStepStepper
+from src.core.rhs_examples import make_nlse_nonlinear_rhs, make_nlse_rhs
+from src.core.time_integrators import RK4Stepper
+from src.numerics.gradient_2d import make_gradient_2d
+from src.numerics.spectral import (make_spectral_gradient_2d, make_spectral_laplacian_1d,
+                                   make_spectral_laplacian_2d)
+
+N, L_DOMAIN, ALPHA = 64, 2 * np.pi, 0.5
+
+
+def test_laplacian_exact_on_fourier_modes():
+    dx = L_DOMAIN / N
+    x = np.arange(N) * dx
+    X, Y = np.meshgrid(x, x)                      # (Ny, Nx) layout
+    u = np.sin(3 * X) * np.cos(2 * Y)
+    L = make_spectral_laplacian_2d(N, N, dx, dx)
+    assert np.allclose(L @ u.ravel(), -13 * u.ravel(), atol=1e-10)
+    assert np.allclose(L @ (u + 1j * u).ravel(), -13 * (u + 1j * u).ravel(), atol=1e-10)
+
+
+def test_exact_heat_stepper_decays_modes_exactly():
+    dx = L_DOMAIN / N
+    x = np.arange(N) * dx
+    u0 = np.sin(x) + 0.5 * np.cos(4 * x)
+    stepper = ExactHeatStepper(make_spectral_laplacian_1d(N, dx), alpha=ALPHA)
+    u = stepper.step(u0, None, 0.0, 0.7)
+    expected = np.exp(-ALPHA * 0.7) * np.sin(x) + 0.5 * np.exp(-16 * ALPHA * 0.7) * np.cos(4 * x)
+    assert np.allclose(u, expected, atol=1e-12)
+
+
+def test_spectral_gradient_matches_analytic():
+    dx = L_DOMAIN / N
+    x = np.arange(N) * dx
+    X, Y = np.meshgrid(x, x, indexing="ij")       # (Nx, Ny) layout, as make_gradient_2d
+    u = np.sin(X) * np.cos(2 * Y)
+    gx, gy = make_spectral_gradient_2d(N, N, dx, dx)(u.ravel())
+    assert np.allclose(gx.ravel(), (np.cos(X) * np.cos(2 * Y)).ravel(), atol=1e-10)
+    assert np.allclose(gy.ravel(), (-2 * np.sin(X) * np.sin(2 * Y)).ravel(), atol=1e-10)
+    fx, fy = make_gradient_2d(N, N, dx, dx)(u.ravel())
+    assert np.max(np.abs(fx - gx)) < 2e-2 and np.max(np.abs(fy - gy)) < 2e-2
+
+
+@pytest.mark.parametrize("cls, tol", [(ETDRK4Stepper, 1e-8), (SplitStepStepper, 1e-4)])
+def test_nlse_matches_rk4_reference(cls, tol):
+    dx = L_DOMAIN / N
+    x = np.arange(N) * dx
+    u0 = (0.5 * np.exp(-4 * (x - np.pi) ** 2)).astype(complex)
+    L = make_spectral_laplacian_1d(N, dx)
+    T, steps = 0.2, 100
+
+    def run(stepper, rhs, n):
+        u, dt = u0.copy(), T / n
+        for i in range(n):
+            stepper.step(u, rhs, i * dt, dt, out=u)
+        return u
+
+    reference = run(RK4Stepper(), make_nlse_rhs(L, alpha=ALPHA, beta=1.0), 4000)
+    u = run(cls(L, alpha=ALPHA), make_nlse_nonlinear_rhs(beta=1.0), steps)
+    assert np.max(np.abs(u - reference)) < tol
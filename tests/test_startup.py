@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds for a fresh interpreter to import main (measured ~0.2 s; ~0.75 s
+# when main still imported pyplot at module load).
+STARTUP_BUDGET_S = 1.0
+HEAVY_MODULES = ("matplotlib", "yaml", "numba", "h5py", "zarr", "PIL")
+
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "src")]))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    return time.perf_counter() - start, result.stdout.strip()
+
+
+def test_import_main_is_fast_and_light():
+    code = f"import sys, main; print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    timings = []
+    for _ in range(3):
+        elapsed, loaded = run_python(code)
+        timings.append(elapsed)
+        assert loaded == "[]"
+    assert min(timings) < STARTUP_BUDGET_S, f"importing main took {min(timings):.2f} s"
+
+
+def test_headless_run_skips_plotting(tmp_path):
+    code = f"""
+import sys, main
+from src.utils.config_loader import apply_overrides, load_config
+cfg = apply_overrides(load_config("config.yaml"), {{
+    "dimension": 1, "time.steps": 5, "output.folder": {str(tmp_path)!r}, "output.save_animation": False,
+    "output.plot_profile": False, "diagnostics.save_yaml": False}})
+main.main(cfg)
+print(sorted(m for m in ("matplotlib", "numba", "h5py", "PIL") if m in sys.modules))
+"""
+    assert run_python(code)[1] == "[]"
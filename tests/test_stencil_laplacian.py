@@ -0,0 +1,33 @@
+import numpy as np
+from src.numerics.laplacian_1d import make_laplacian_1d
+from src.numerics.laplacian_2d import make_laplacian_2d
+from src.numerics.stencil_laplacian import make_stencil_laplacian_1d, make_stencil_laplacian_2d
+from src.core.rhs_examples import make_nlse_rhs
+
+
+def test_stencil_matches_csr_1d():
+    N, dx = 37, 0.3
+    u = np.random.default_rng(0).standard_normal(N)
+    L_csr = make_laplacian_1d(N, dx)
+    L_st = make_stencil_laplacian_1d(N, dx)
+    out = np.empty_like(u)
+    L_st.apply(u, out=out)
+    assert np.allclose(out, L_csr @ u)
+
+
+def test_stencil_matches_csr_2d_rectangular():
+    Nx, Ny, dx, dy = 12, 7, 0.5, 0.25
+    u = np.random.default_rng(1).standard_normal(Nx * Ny)
+    L_csr = make_laplacian_2d(Nx, Ny, dx, dy)
+    L_st = make_stencil_laplacian_2d(Nx, Ny, dx, dy)
+    assert L_st.shape == L_csr.shape
+    assert np.allclose(L_st @ u, L_csr @ u)
+    assert np.allclose(L_st @ u[:, None], (L_csr @ u)[:, None])
+
+
+def test_stencil_accepted_by_rhs_builders():
+    N, dx = 16, 0.5
+    u = np.random.default_rng(2).standard_normal(N * N)
+    rhs_csr = make_nlse_rhs(make_laplacian_2d(N, N, dx, dx), alpha=0.5, beta=2.0)
+    rhs_st = make_nlse_rhs(make_stencil_laplacian_2d(N, N, dx, dx), alpha=0.5, beta=2.0)
+    assert np.allclose(rhs_st(u, 0.0), rhs_csr(u, 0.0))
@@ -0,0 +1,28 @@
+import json
+import os
+
+import numpy as np
+from sweep import collect_results, grid_samples, lhs_samples, run_id, run_one
+
+
+def test_grid_and_lhs_sampling():
+    grid = grid_samples({"pde.alpha": [0.5, 1.0], "grid.N": [32, 64, 128]})
+    assert len(grid) == 6 and {"pde.alpha": 1.0, "grid.N": 64} in grid
+
+    samples = lhs_samples({"pde.alpha": [0.0, 1.0], "grid.N": [32, 160]}, 8, seed=0)
+    alphas = np.array([s["pde.alpha"] for s in samples])
+    assert np.array_equal(np.sort(np.floor(alphas * 8)), np.arange(8))   # one sample per stratum
+    assert all(isinstance(s["grid.N"], int) and 32 <= s["grid.N"] <= 160 for s in samples)
+
+
+def test_run_one_writes_result_and_table(tmp_path, make_cfg):
+    params = {"pde.alpha": 0.5}
+    rid = run_id(0, params)
+    cfg = make_cfg(tmp_path / rid, **params, **{"time.steps": 5})
+    result = run_one(cfg, params, str(tmp_path / rid))
+    assert result["status"] == "ok", result["error"]
+    assert json.load(open(tmp_path / rid / "result.json"))["params"] == params
+
+    rows = collect_results(str(tmp_path), [rid, run_id(1, {"pde.alpha": 1.0})])
+    assert len(rows) == 1 and rows[0]["pde.alpha"] == 0.5
+    assert os.path.exists(tmp_path / "results.csv")
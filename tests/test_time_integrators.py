@@ -0,0 +1,82 @@
+import tracemalloc
+
+import numpy as np
+from src.core.pde_systems import LinearPDESystem1D, LinearPDESystem2D
+from src.core.time_integrators import (BogackiShampine23, DormandPrince45, EulerStepper, RK4Stepper,
+                                      euler_step, rk4_step)
+from src.numerics.laplacian_1d import make_laplacian_1d
+from src.numerics.stencil_laplacian import make_stencil_laplacian_2d
+
+
+def reference_rk4(u, rhs, t, dt):
+    k1 = rhs(u, t)
+    k2 = rhs(u + 0.5 * dt * k1, t + 0.5 * dt)
+    k3 = rhs(u + 0.5 * dt * k2, t + 0.5 * dt)
+    k4 = rhs(u + dt * k3, t + dt)
+    return u + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def test_rk4_stepper_matches_reference_with_legacy_rhs():
+    L = make_laplacian_1d(32, 0.2)
+    rhs = lambda u, t: 0.7 * (L @ u) + np.sin(t)
+    u = np.random.default_rng(0).standard_normal(32)
+    expected = reference_rk4(u, rhs, 0.3, 1e-3)
+    assert np.array_equal(rk4_step(u, rhs, 0.3, 1e-3), expected)
+
+    stepper = RK4Stepper()
+    stepper.step(u, rhs, 0.3, 1e-3, out=u)
+    assert np.array_equal(u, expected)
+
+
+def test_euler_stepper_in_place():
+    u = np.linspace(0.0, 1.0, 8)
+    expected = euler_step(u, lambda v, t: -v, 0.0, 0.1)
+    EulerStepper().step(u, lambda v, t, out=None: np.negative(v, out=out), 0.0, 0.1, out=u)
+    assert np.array_equal(u, expected)
+
+
+def test_rk4_stepper_does_not_allocate_after_warmup():
+    N = 256
+    system = LinearPDESystem2D(make_stencil_laplacian_2d(N, N, 0.1, 0.1), alpha=0.5)
+    u = np.random.default_rng(1).standard_normal(N * N)
+    stepper = RK4Stepper()
+    stepper.step(u, system.rhs_func, 0.0, 1e-4, out=u)
+
+    tracemalloc.start()
+    for i in range(10):
+        stepper.step(u, system.rhs_func, i * 1e-4, 1e-4, out=u)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < u.nbytes
+
+
+def integrate_adaptive(stepper, rhs, u, t_end, dt):
+    t = 0.0
+    while t < t_end:
+        stepper.step(u, rhs, t, min(dt, t_end - t), out=u)
+        t += stepper.dt_last
+        dt = stepper.dt_next
+    return u
+
+
+def test_adaptive_pairs_meet_tolerance_on_decay():
+    lam = np.array([-1.0, -3.0, -10.0])
+    rhs = lambda u, t, out=None: np.multiply(lam, u, out=out)
+    for stepper in (DormandPrince45(rtol=1e-8, atol=1e-10), BogackiShampine23(rtol=1e-6, atol=1e-9)):
+        u = integrate_adaptive(stepper, rhs, np.ones(3), 1.0, 1e-3)
+        assert np.allclose(u, np.exp(lam), rtol=1e-4)
+        assert stepper.n_accept > 0
+        assert stepper.nfev > stepper.n_accept
+
+
+def test_adaptive_rejects_oversized_step_and_grows_for_smooth_diffusion():
+    L = make_laplacian_1d(64, 10.0 / 64)
+    rhs = LinearPDESystem1D(L, alpha=1.0).rhs_func
+    x = np.linspace(-5, 5, 64, endpoint=False)
+    stepper = DormandPrince45(rtol=1e-9, atol=1e-12)
+    u = np.exp(-x**2 / 0.1)
+    stepper.step(u, rhs, 0.0, 1.0, out=u)
+    assert stepper.n_reject > 0
+    first_dt = stepper.dt_last
+    integrate_adaptive(stepper, rhs, u, 2.0, stepper.dt_next)
+    assert stepper.dt_last > 5 * first_dt